@@ -47,3 +47,24 @@ class Automata:
             for tr in tr_list:
                 if tr.targetState == old_name:
                     tr.targetState = new_name
+
+    @classmethod
+    def from_description(cls, data):
+        '''
+        build an automaton from a saved description: {'states': [{'name', 'is_start', 'is_accept', ...}],
+        'transitions': [{'source', 'target', 'vectors'}]}. 'vectors' is a list of symbol vectors,
+        or a single vector in saves made from the backend.
+        '''
+        automata = cls()
+        for st in data.get('states', []):
+            automata.add_state(st['name'], is_accept=st.get('is_accept', False))
+            if st.get('is_start'):
+                automata.set_start_state(st['name'])
+        for tr in data.get('transitions', []):
+            vectors = tr['vectors']
+            if vectors and not isinstance(vectors[0], (list, tuple)):
+                vectors = [vectors]
+            for vec in vectors:
+                automata.alphabet.update(vec)
+                automata.add_transition(Transition(tr['source'], SymbolVector(list(vec)), tr['target']))
+        return automata
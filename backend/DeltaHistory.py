@@ -0,0 +1,219 @@
+from array import array
+
+
+class DeltaHistory:
+    '''
+    list-like run history stored as deltas.
+    a snapshot is [state, pos_1, ..., pos_k]. the first snapshot (and any snapshot that is not
+    reachable by a single transition) is stored explicitly; every other snapshot is stored as the
+    index of a move (target state, advance mask) in an interned table, applied to the previous one.
+    every KEYFRAME_INTERVAL-th snapshot is kept as a keyframe, so indexing rebuilds at most
+    KEYFRAME_INTERVAL - 1 moves: O(1) amortized random access.
+    indexing returns fresh lists; replace the last snapshot with history[-1] = snap.
+    '''
+    KEYFRAME_INTERVAL = 64
+    EXPLICIT = -1
+
+    def __init__(self, snapshots=()):
+        self._table = []            # move index -> (target state, advance mask)
+        self._table_index = {}      # (target state, advance mask) -> move index
+        self._moves = array('l')    # per snapshot: move index or EXPLICIT
+        self._explicit = {}         # snapshot index -> tuple, for EXPLICIT entries
+        self._keyframes = []        # tuple snapshot at every KEYFRAME_INTERVAL-th index
+        self._last = None           # last snapshot (list), so appending a move is O(k)
+        for snap in snapshots:
+            self.append(snap)
+
+    @staticmethod
+    def advance_mask(symbols_vector):
+        '''
+        tapes advanced by a matching transition: every symbol but the '#' wildcard consumes one.
+        '''
+        return tuple(1 if sv != '#' else 0 for sv in symbols_vector)
+
+    def append(self, snap):
+        '''
+        append an explicit snapshot.
+        '''
+        self._push(self.EXPLICIT, list(snap))
+
+    def append_move(self, state, mask):
+        '''
+        append the snapshot reached from the last one by moving to state and advancing the tapes in mask.
+        '''
+        if self._last is None:
+            raise IndexError("append_move on an empty history, append a base snapshot first")
+        key = (state, tuple(mask))
+        move = self._table_index.get(key)
+        if move is None:
+            move = self._table_index[key] = len(self._table)
+            self._table.append(key)
+        self._push(move, self._apply(list(self._last), move))
+
+    def extend(self, snapshots):
+        '''
+        append snapshots; the moves of another DeltaHistory are copied instead of rebuilt snapshots.
+        '''
+        if not isinstance(snapshots, DeltaHistory):
+            for snap in snapshots:
+                self.append(snap)
+            return
+        for j, move in enumerate(snapshots._moves):
+            if move == self.EXPLICIT or self._last is None:
+                self.append(snapshots._explicit.get(j) or snapshots._snapshot(j))
+            else:
+                self.append_move(*snapshots._table[move])
+
+    def window(self, start, stop):
+        '''
+        snapshots start..stop-1 as a new DeltaHistory whose first snapshot is explicit.
+        '''
+        start, stop, _ = slice(start, stop).indices(len(self))
+        h = DeltaHistory()
+        if start >= stop:
+            return h
+        h.append(self._snapshot(start))
+        for j in range(start + 1, stop):
+            move = self._moves[j]
+            if move == self.EXPLICIT:
+                h.append(self._explicit[j])
+            else:
+                h.append_move(*self._table[move])
+        return h
+
+    def _push(self, move, snap):
+        i = len(self._moves)
+        self._moves.append(move)
+        if move == self.EXPLICIT:
+            self._explicit[i] = tuple(snap)
+        if i % self.KEYFRAME_INTERVAL == 0:
+            self._keyframes.append(tuple(snap))
+        self._last = snap
+
+    def _apply(self, snap, move):
+        state, mask = self._table[move]
+        snap[0] = state
+        for t, adv in enumerate(mask, 1):
+            if adv and t < len(snap):
+                snap[t] += 1
+        return snap
+
+    def _snapshot(self, i):
+        interval = self.KEYFRAME_INTERVAL
+        snap = list(self._keyframes[i // interval])
+        for j in range(i - i % interval + 1, i + 1):
+            move = self._moves[j]
+            snap = list(self._explicit[j]) if move == self.EXPLICIT else self._apply(snap, move)
+        return snap
+
+    def __len__(self):
+        return len(self._moves)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if start == 0 and step == 1:
+                return self._prefix(stop)
+            return [self._snapshot(j) for j in range(start, stop, step)]
+        n = len(self._moves)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("history index out of range")
+        return self._snapshot(i)
+
+    def __setitem__(self, i, snap):
+        n = len(self._moves)
+        if i < 0:
+            i += n
+        if i != n - 1:
+            raise IndexError("only the last snapshot of a DeltaHistory can be replaced")
+        self._moves[i] = self.EXPLICIT
+        self._explicit[i] = tuple(snap)
+        if i % self.KEYFRAME_INTERVAL == 0:
+            self._keyframes[-1] = tuple(snap)
+        self._last = list(snap)
+
+    def __iter__(self):
+        snap = None
+        for j, move in enumerate(self._moves):
+            snap = list(self._explicit[j]) if move == self.EXPLICIT else self._apply(snap, move)
+            yield list(snap)
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == list(b) for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f"DeltaHistory({len(self)} snapshots, {len(self._explicit)} explicit, {len(self._table)} moves)"
+
+    def _prefix(self, stop):
+        '''
+        history of the first stop snapshots; the move table is shared (it is append-only).
+        '''
+        h = DeltaHistory()
+        h._table = self._table
+        h._table_index = self._table_index
+        h._moves = self._moves[:stop]
+        h._explicit = {j: s for j, s in self._explicit.items() if j < stop}
+        h._keyframes = self._keyframes[:-(-stop // self.KEYFRAME_INTERVAL)]
+        h._last = self._snapshot(stop - 1) if stop else None
+        return h
+
+    def copy(self):
+        return self._prefix(len(self))
+
+    def pop(self):
+        n = len(self._moves)
+        if not n:
+            raise IndexError("pop from empty history")
+        snap = self._snapshot(n - 1)
+        self._moves.pop()
+        self._explicit.pop(n - 1, None)
+        if (n - 1) % self.KEYFRAME_INTERVAL == 0:
+            self._keyframes.pop()
+        self._last = self._snapshot(n - 2) if n > 1 else None
+        return snap
+
+    def clear(self):
+        self._table = []
+        self._table_index = {}
+        self._moves = array('l')
+        self._explicit = {}
+        self._keyframes = []
+        self._last = None
+
+    def pad(self, width):
+        '''
+        widen every snapshot to width entries with 0 positions (a word was added).
+        moves never change the width, so only explicit snapshots and keyframes are touched.
+        '''
+        def widen(snap):
+            return tuple(snap) + (0,) * (width - len(snap)) if len(snap) < width else snap
+        self._explicit = {j: widen(s) for j, s in self._explicit.items()}
+        self._keyframes = [widen(s) for s in self._keyframes]
+        if self._last is not None:
+            self._last = list(widen(self._last))
+
+    def to_parts(self):
+        '''
+        (move table, explicit snapshots by index, move per snapshot) for serialisation.
+        '''
+        return list(self._table), dict(self._explicit), self._moves
+
+    @classmethod
+    def from_parts(cls, table, explicit, moves):
+        h = cls()
+        for key in table:
+            h._table_index[(key[0], tuple(key[1]))] = len(h._table)
+            h._table.append((key[0], tuple(key[1])))
+        snap = None
+        for j, move in enumerate(moves):
+            if move == cls.EXPLICIT:
+                snap = list(explicit[j])
+            else:
+                snap = h._apply(list(snap), move)
+            h._push(move, snap)
+        return h
@@ -1,5 +1,5 @@
 from backend.Simulation import Simulation
-import copy
+from collections import deque
 
 from backend.Tape import Tape
 from backend.Transition import Transition
@@ -7,14 +7,26 @@ from backend.Transition import Transition
 
 
 class Manager:
-    def __init__(self, automata,tapes):
+    def __init__(self, automata,tapes, collect_stats=False, memory_profile=None):
         self.automata = automata           # Instance of Automata
         self.tapes = tapes
 
+        # Search instrumentation, only filled when collect_stats is set
+        self.collect_stats = collect_stats
+        self.state_visits = {}          # state -> number of expansions
+        self.transition_matches = {}    # backend Transition -> number of successful matches
+
+        # Work counters of the last mainLoop, always kept (two integer additions per tested transition)
+        self.transitions_tested = 0
+        self.duplicates = 0
+
+        # MemoryProfile accounting the search, None unless memory profiling was asked for
+        self.memory_profile = memory_profile
+
         self.accepting_states = automata.accept_states
         self.sim = Simulation(self.tapes)
-        self.visited = {self.sim}  #set of visited simulatios
-        self.queue = [self.sim] # List of active Simulation objects
+        self.visited = {self.sim.snapshot}  # snapshots (state, pos_1, ..., pos_k) of the visited simulations
+        self.queue = deque([self.sim]) # Queue of active Simulation objects
 
 
     # def stepTo(self,targetState):
@@ -34,48 +46,96 @@ class Manager:
 
 
 
+    def compile_moves(self):
+        '''
+        the transitions of every state in the form the search loop uses:
+        state -> [((tape, symbol code) pairs to match, advance mask, target state, transition)],
+        cut to the number of tapes (vector entries past the last tape are ignored, extra tapes are not read).
+        '''
+        k = len(self.tapes)
+        moves = {}
+        for state, transitions in self.automata.transitions.items():
+            compiled = []
+            for transition in transitions:
+                vector = transition.symbolsVector
+                checks = tuple(check for check in vector.checks if check[0] < k)
+                mask = (vector.mask + (0,) * k)[:k]
+                compiled.append((checks, mask, transition.targetState, transition))
+            moves[state] = compiled
+        return moves
+
     def mainLoop(self):
         '''
         this method based of BFS algorithm.
         its search a path to an accepting run and if exists return it history, else return the last Simulation's history.
+        a configuration is matched and advanced on tuples of head positions over the symbol codes of the words,
+        so no tape is copied; the visited set holds the snapshot tuples.
         :return:
         '''
+        stats = self.collect_stats
+        profile = self.memory_profile
+        visits = self.state_visits
+        matches = self.transition_matches
+        visited = self.visited
+        queue = self.queue
+        accepting = self.accepting_states
+        moves = self.compile_moves()
+        words = [tape.codes for tape in self.tapes]
+        lengths = [len(word) for word in words]
+        step = Simulation.step
+        sim = self.sim
+        positions = tuple(tape.currentPos for tape in self.tapes)   # heads of the start configuration
+        tested = 0
+        duplicates = 0
+        if profile:
+            profile.start(self)
         flag = True
-        while any(tape.symbol != '#' for tape in self.tapes) \
-                and (len(self.queue))>=0:
+        while any(pos < n for pos, n in zip(positions, lengths)):
             if flag:
-                sim = self.queue.pop(0)
-                self.tapes = sim.tapes
+                if not queue:
+                    break
+                sim = queue.popleft()
                 flag = False
 
-
-
-            for transition in self.automata.transitions.get(sim.currentState):
-                history = sim.history.copy()
-                tapesCopy = copy.deepcopy(self.tapes)
-                if transition.symbolsVector.matches(tapesCopy):
-
-                    current_state = transition.targetState
-                    historySnapShot = []
-                    historySnapShot.append(current_state)
-
-                    for tape in tapesCopy:
-                        historySnapShot.append(tape.currentPos)
-
-                    history.append(historySnapShot)
-                    newSim = Simulation(tapesCopy, history, current_state)
-                    if newSim in self.visited:
+            state = sim.snapshot[0]
+            if stats:
+                visits[state] = visits.get(state, 0) + 1
+            if profile:
+                profile.expand(self)
+            # states without outgoing transitions are dead ends
+            for checks, mask, target, transition in moves.get(state, ()):
+                tested += 1
+                for i, code in checks:
+                    pos = positions[i]
+                    if pos >= lengths[i] or words[i][pos] != code:
+                        break
+                else:
+                    if stats:
+                        matches[transition] = matches.get(transition, 0) + 1
+
+                    # only the parent, the transition and the snapshot are kept, the history is rebuilt on demand
+                    snapshot = (target,) + tuple([pos + m for pos, m in zip(positions, mask)])
+                    if snapshot in visited:
+                        duplicates += 1
                         continue
-                    else:
-                        self.visited.add(newSim)
-                        self.queue.append(newSim)
-
-            sim = self.queue.pop(0)
-            self.tapes = sim.tapes
-            if (sim.currentState in self.accepting_states) and (all(tape.symbol == '#' for tape in self.tapes)):
-                return sim.history
-
-
+                    visited.add(snapshot)
+                    newSim = step(sim, transition, snapshot)
+                    queue.append(newSim)
+                    if profile:
+                        profile.add(newSim)
+
+            if not queue:
+                # search space exhausted without reaching an accepting run
+                break
+            sim = queue.popleft()
+            positions = sim.snapshot[1:]
+            if (sim.snapshot[0] in accepting) and all(pos >= n for pos, n in zip(positions, lengths)):
+                break
+
+        self.transitions_tested = tested
+        self.duplicates = duplicates
+        if profile:
+            profile.finish(self)
         return sim.history
 
 
@@ -127,8 +187,8 @@ class Manager:
         """Made function from this part."""
     def update(self,history):
         sim = Simulation(self.tapes,history,history[-1][0])
-        self.visited = {sim}  # empty visited
-        self.queue = [sim]  # empty queue
+        self.visited = {sim.snapshot}  # empty visited
+        self.queue = deque([sim])  # empty queue
         self.sim = sim
         h = self.mainLoop()
         return h
@@ -137,10 +197,6 @@ class Manager:
         snapShot = snapShot[1:]
         for i in range(len(snapShot)):
             self.tapes[i].currentPos = snapShot[i]
-            if(snapShot[i] >= len(self.tapes[i].symbols)):
-                self.tapes[i].symbol = '#'
-            else:
-                self.tapes[i].symbol = self.tapes[i].symbols[snapShot[i]]
         return
 
     def stepBack(self,history):
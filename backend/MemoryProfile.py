@@ -0,0 +1,143 @@
+import os
+import sys
+import tracemalloc
+
+
+def object_size(obj):
+    '''
+    shallow size of an object including its instance dict, if it has one.
+    '''
+    size = sys.getsizeof(obj)
+    attrs = getattr(obj, '__dict__', None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+    return size
+
+
+class MemoryProfile:
+    '''
+    memory accounting of one search, enabled by passing it to Manager(memory_profile=...).
+    the engine reports every expanded and every new configuration; the bytes retained by each kind of
+    structure are added up from their shallow sizes:
+        simulations - the Simulation objects
+        snapshots   - the (state, head positions) tuple of each configuration, which stands in for its tapes
+        history     - the start history the search continues from
+        visited     - the visited set
+        queue       - the BFS queue
+    tracemalloc measures the real traced memory: current and peak bytes per BFS level, and at the end
+    the bytes still allocated per source file of the engine.
+    '''
+    CATEGORIES = ('simulations', 'snapshots', 'history', 'visited', 'queue')
+
+    def __init__(self, sources=5):
+        self.sources_limit = sources
+        self.levels = []
+        self.categories = dict.fromkeys(self.CATEGORIES, 0)
+        self.peaks = dict.fromkeys(self.CATEGORIES, 0)
+        self.sources = {}
+        self.peak_traced = 0
+        self.own_tracing = False
+        self.level = 0
+        self.pending = 0        # configurations of the current level not expanded yet
+        self.next_level = 0     # configurations found for the next level
+        self.expanded = 0
+
+    def start(self, manager):
+        '''
+        start tracing (unless tracemalloc already runs) and account the start configuration.
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.own_tracing = True
+        tracemalloc.reset_peak()
+        sim = manager.sim
+        if sim.prefix is not None:
+            self.categories['history'] += sys.getsizeof(sim.prefix)
+        self.add(sim)
+        self.pending, self.next_level = self.next_level, 0
+
+    def add(self, sim):
+        '''
+        account a configuration that was added to the visited set and the queue.
+        '''
+        self.categories['simulations'] += object_size(sim)
+        self.categories['snapshots'] += sys.getsizeof(sim.snapshot)
+        self.next_level += 1
+
+    def expand(self, manager):
+        '''
+        called before a configuration is expanded; closes the current level once all of its
+        configurations were expanded.
+        '''
+        if self.pending == 0:
+            self.close_level(manager)
+            self.pending, self.next_level = self.next_level, 0
+        self.pending -= 1
+        self.expanded += 1
+
+    def close_level(self, manager):
+        '''
+        record the accounting and the traced memory of the finished level, then reset the traced peak.
+        '''
+        self.categories['visited'] = sys.getsizeof(manager.visited)
+        self.categories['queue'] = sys.getsizeof(manager.queue)
+        for name, size in self.categories.items():
+            if size > self.peaks[name]:
+                self.peaks[name] = size
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak_traced = max(self.peak_traced, peak)
+        self.levels.append({
+            'level': self.level,
+            'expanded': self.expanded,
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'categories': dict(self.categories),
+        })
+        tracemalloc.reset_peak()
+        self.level += 1
+        self.expanded = 0
+
+    def finish(self, manager):
+        '''
+        close the last level, collect the traced bytes per engine source file and stop tracing.
+        '''
+        self.close_level(manager)
+        own_file = os.path.abspath(__file__)
+        engine_dir = os.path.dirname(own_file)
+        sources = []
+        for stat in tracemalloc.take_snapshot().statistics('filename'):
+            name = os.path.abspath(stat.traceback[0].filename)
+            if name != own_file and os.path.dirname(name) == engine_dir:
+                sources.append((os.path.basename(name), stat.size))
+        self.sources = dict(sources[:self.sources_limit])
+        if self.own_tracing:
+            tracemalloc.stop()
+            self.own_tracing = False
+
+    def report(self):
+        '''
+        the profile as plain data: peak bytes per category, peak traced bytes, per-level records and sources.
+        '''
+        return {
+            'peak_traced_bytes': self.peak_traced,
+            'peak_bytes': dict(self.peaks),
+            'levels': self.levels,
+            'sources': self.sources,
+        }
+
+    def format(self):
+        '''
+        the profile as a text table for display.
+        '''
+        lines = [f"peak traced memory: {self.peak_traced:,} bytes", "",
+                 "peak bytes per category:"]
+        lines += [f"  {name:<12}{size:>14,}" for name, size in self.peaks.items()]
+        if self.sources:
+            lines += ["", "traced bytes still allocated per source file:"]
+            lines += [f"  {name:<18}{size:>14,}" for name, size in self.sources.items()]
+        lines += ["", f"{'level':>5}{'expanded':>10}{'traced':>14}{'peak':>14}" +
+                  "".join(f"{name:>13}" for name in self.CATEGORIES)]
+        for lv in self.levels:
+            lines.append(f"{lv['level']:>5}{lv['expanded']:>10}{lv['traced_bytes']:>14,}{lv['traced_peak_bytes']:>14,}" +
+                         "".join(f"{lv['categories'][name]:>13,}" for name in self.CATEGORIES))
+        return "\n".join(lines)
@@ -1,24 +1,78 @@
+from backend.DeltaHistory import DeltaHistory
+from backend.Tape import Tape
+
 
 class Simulation:
     '''
-    this class is represents a a snap shot of a situation in the automata
+    this class is represents a a snap shot of a situation in the automata.
+    a configuration is its snapshot tuple (state, pos_1, ..., pos_k): equal snapshots are equal simulations.
+    a simulation created by a search step only keeps its parent, the transition taken and the snapshot,
+    no tapes; its history is rebuilt (as a DeltaHistory) and its tapes are rebuilt when asked for.
     '''
-    def __init__(self, tapes, history = None, currentState = 0):
-        self.currentState = currentState
-        self.tapes = tapes
-        self.history = history if history is not None else [[0] * (len(tapes) + 1)]
-        self.id = self.__hash__()
-
-    def __hash__(self):
-        return hash(tuple(self.history[-1]))
-
-    def __eq__(self, other):
-        return self.id == other.id
-
+    __slots__ = ('snapshot', 'parent', 'move', 'prefix', '_tapes')
 
+    def __init__(self, tapes, history = None, currentState = 0, parent = None, move = None):
+        self.parent = parent
+        self.move = move
+        self._tapes = tapes
+        if parent is None:
+            self.prefix = history if history is not None else [[0] * (len(tapes) + 1)]
+            self.snapshot = tuple(self.prefix[-1])
+        else:
+            self.prefix = None
+            self.snapshot = (currentState,) + tuple(tape.currentPos for tape in tapes)
 
+    @classmethod
+    def step(cls, parent, move, snapshot):
+        '''
+        the simulation reached from parent by the transition move, given by its snapshot tuple.
+        '''
+        sim = cls.__new__(cls)
+        sim.snapshot = snapshot
+        sim.parent = parent
+        sim.move = move
+        sim.prefix = None
+        sim._tapes = None
+        return sim
 
+    @property
+    def currentState(self):
+        return self.snapshot[0]
 
+    @property
+    def tapes(self):
+        '''
+        the tapes of this configuration: the ones it was created with, or new tapes over the words of
+        the start configuration with the heads at the positions of the snapshot.
+        '''
+        if self._tapes is not None:
+            return self._tapes
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        tapes = [Tape(tape.symbols) for tape in root._tapes]
+        for tape, pos in zip(tapes, self.snapshot[1:]):
+            tape.currentPos = pos
+        return tapes
 
+    @property
+    def history(self):
+        '''
+        the snapshots from the start of the run up to this simulation.
+        '''
+        moves = []
+        sim = self
+        while sim.parent is not None:
+            moves.append(sim.move)
+            sim = sim.parent
+        prefix = sim.prefix
+        history = prefix.copy() if isinstance(prefix, DeltaHistory) else DeltaHistory(prefix)
+        for transition in reversed(moves):
+            history.append_move(transition.targetState, transition.symbolsVector.mask)
+        return history
 
+    def __hash__(self):
+        return hash(self.snapshot)
 
+    def __eq__(self, other):
+        return self.snapshot == other.snapshot
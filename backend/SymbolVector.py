@@ -1,60 +1,51 @@
+import sys
+
+from backend.Symbols import WILDCARD, symbol_code
+
+
 class SymbolVector:
-    #אם מוסיפים מילה , כלומר טייפ חדש, צריך לעדכן את הווקטור, פשוט עושים אפנד לווקטור עם האות המתאימה
-    # def __init__(self, vector):
-    #     # self.size = size
-    #     self.vector = vector
+    '''
+    the symbols a transition reads, one per tape; the '#' wildcard leaves its tape alone.
+    the vector is an interned tuple; for the engine it also keeps the (tape, symbol code) pairs
+    that have to match and the advance mask (1 for every tape that is read).
+    '''
+    __slots__ = ('vector', 'checks', 'mask')
 
-    # def __init__(self,k, alphabeta):
-    #     '''k is amount of words'''
-    #     self.vector = []
-    #     for i in range(k):
-    #         symbol = input(f"please enter symbol to read from word {i+1}: ")
-    #         while(symbol not in alphabeta and symbol != '#'):
-    #             print("please choose a symbol from the alphabeta:")
-    #             print(alphabeta)
-    #             symbol = input(f"please enter symbol to read from word {i+1}: ")
-    #         self.vector.append(symbol)
     def __init__(self, vector):
-        # self.size = size
-        self.vector = vector
-
+        symbols = []
+        checks = []
+        mask = []
+        for i, sv in enumerate(vector):
+            if type(sv) is str:
+                sv = sys.intern(sv)
+            symbols.append(sv)
+            if sv == WILDCARD:
+                mask.append(0)
+            else:
+                checks.append((i, symbol_code(sv)))
+                mask.append(1)
+        self.vector = tuple(symbols)
+        self.checks = tuple(checks)
+        self.mask = tuple(mask)
 
     def __iter__(self):
         return iter(self.vector)
 
+    def __repr__(self):
+        return f"SymbolVector({list(self.vector)})"
 
     def matches(self, tapes):
         '''
         get Tapes and return true if there is a match between itself(SimbolVector) and zip vector of the Tapes.
+        on a match the tapes that are read are advanced; on a mismatch no tape is touched.
         '''
-        tapesLog = tapes.copy()
-        tapesSymbols = [tape.symbol for tape in tapes]
-        i = 0
-
-        for sv, tp in zip(self.vector, tapesSymbols):
-            if (sv == '#'):
-                i += 1
+        for i, code in self.checks:
+            if i >= len(tapes):
                 continue
-            elif (sv == tp):
-                tapes[i].read()
-                i += 1
-
-            else:
-                tapes = tapesLog
+            tape = tapes[i]
+            if tape.currentPos >= len(tape.codes) or tape.codes[tape.currentPos] != code:
                 return False
+        for tape, move in zip(tapes, self.mask):
+            if move:
+                tape.read()
         return True
-
-
-    # def addSymbol(self, symbol):
-    #     self.vector.append(symbol)
-
-    # def edit(self, k, alphabeta):
-    #     '''k is amount of words'''
-    #     self.vector = []
-    #     for i in range(k):
-    #         symbol = input(f"please enter symbol to read from word {i}")
-    #         while(symbol not in alphabeta):
-    #             print("please choose a symbol from the alphabeta:")
-    #             print(alphabeta)
-    #             symbol = input(f"please enter symbol to read from word {i}")
-    #         self.vector.append(symbol)
\ No newline at end of file
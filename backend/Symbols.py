@@ -0,0 +1,32 @@
+import threading
+from array import array
+
+WILDCARD = '#'      # in a symbol vector: the tape is not read. on a tape: past the end of the word
+
+_codes = {WILDCARD: 0}
+_symbols = [WILDCARD]
+_lock = threading.Lock()
+
+
+def symbol_code(symbol):
+    '''
+    small integer standing for a symbol; equal symbols get the same code for the life of the process.
+    '''
+    code = _codes.get(symbol)
+    if code is None:
+        with _lock:
+            code = _codes.get(symbol)
+            if code is None:
+                code = _codes[symbol] = len(_symbols)
+                _symbols.append(symbol)
+    return code
+
+
+def encode_word(word):
+    '''
+    the symbols of a word as codes: bytes while every code fits in a byte, array('I') otherwise.
+    '''
+    codes = [symbol_code(symbol) for symbol in word]
+    if max(codes, default=0) < 256:
+        return bytes(codes)
+    return array('I', codes)
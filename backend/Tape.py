@@ -1,21 +1,36 @@
+from backend.Symbols import WILDCARD, encode_word
+
 
 class Tape:
+    '''
+    a word on an input tape and the position of its head.
+    the word is kept as given (symbols) and as symbol codes (codes) for the search engine;
+    symbol is the symbol under the head, '#' past the end of the word.
+    '''
+    __slots__ = ('_symbols', 'codes', 'currentPos')
+
     def __init__(self, symbols):
         self.symbols = symbols
         self.currentPos = 0
-        self.symbol = symbols[0]
 
+    @property
+    def symbols(self):
+        return self._symbols
+
+    @symbols.setter
+    def symbols(self, symbols):
+        self._symbols = symbols
+        self.codes = encode_word(symbols)
+
+    @property
+    def symbol(self):
+        if self.currentPos < len(self._symbols):
+            return self._symbols[self.currentPos]
+        return WILDCARD
 
     def read(self):
         '''
         this method responsible for advancing the currentPosition of the tape and the current symbol to read.
         '''
-        if self.currentPos < len(self.symbols):
+        if self.currentPos < len(self._symbols):
             self.currentPos += 1
-            if self.currentPos <len(self.symbols):
-                self.symbol = self.symbols[self.currentPos]
-            else:
-                self.symbol = '#'
-
-        else:
-            self.symbol = '#'
@@ -2,6 +2,8 @@ from backend.SymbolVector import SymbolVector
 
 
 class Transition:
+    __slots__ = ('fromState', 'symbolsVector', 'targetState')
+
     def __init__(self, fromState, symbols_vector, targetState):
         self.symbolsVector = symbols_vector
         self.targetState = targetState
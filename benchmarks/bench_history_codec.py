@@ -0,0 +1,58 @@
+"""
+Size and save/load time of a 100k-step run history: legacy JSON vs the binary codec.
+"load x" is the load speed-up over JSON.
+
+    python -m benchmarks.bench_history_codec [--steps N] [--tapes K] [--states S]
+"""
+import argparse
+import json
+import random
+import time
+from utils.history_codec import encode_history, decode_history
+
+def make_history(steps, tapes, states, seed=0):
+    """ Synthetic BFS witness: random state names, monotonically advancing tape heads. """
+    rng = random.Random(seed)
+    positions = [0] * tapes
+    history = []
+    for _ in range(steps):
+        positions[rng.randrange(tapes)] += 1
+        history.append([f"q{rng.randrange(states)}"] + positions)
+    return [list(snap) for snap in history]
+
+def timed(fn, *args, repeat=3):
+    """ Best wall time of fn(*args) over repeat runs, and its result. """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=100_000)
+    parser.add_argument("--tapes", type=int, default=3)
+    parser.add_argument("--states", type=int, default=50)
+    args = parser.parse_args()
+
+    history = make_history(args.steps, args.tapes, args.states)
+    rows = []
+    save, blob = timed(json.dumps, history)
+    load, _ = timed(json.loads, blob)
+    rows.append(("json", len(blob.encode("utf-8")), save, load))
+    for compress in (False, True):
+        save, blob = timed(encode_history, history, compress)
+        load, decoded = timed(decode_history, blob)
+        assert decoded == history
+        rows.append(("binary+zlib" if compress else "binary", len(blob), save, load))
+
+    print(f"{args.steps} steps, {args.tapes} tapes, {args.states} states")
+    print(f"{'format':<12} {'bytes':>12} {'ratio':>7} {'save ms':>9} {'load ms':>9} {'load x':>7}")
+    base, base_load = rows[0][1], rows[0][3]
+    for name, size, save, load in rows:
+        print(f"{name:<12} {size:>12,} {size / base:>7.3f} {save * 1000:>9.1f} {load * 1000:>9.1f} {base_load / load:>7.2f}")
+
+if __name__ == "__main__":
+    main()
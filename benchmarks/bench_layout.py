@@ -0,0 +1,40 @@
+"""
+Time of the force-directed auto layout on a generated automaton (5k states, 15k edges by default).
+
+    python -m benchmarks.bench_layout [--states N] [--nondeterminism D] [--iterations I] [--budget S] [--seed S]
+
+The automaton comes from utils/workloads; with the default nondeterminism of 1.5 over a two-letter
+alphabet every state has three outgoing edges on average. The layout starts from the generated grid
+positions, as LayoutManager does. The exit status is 1 when the layout takes longer than --budget seconds.
+"""
+import argparse
+import sys
+import time
+from managers.layout_manager import force_directed_layout
+from utils.constants import LAYOUT_ITERATIONS
+from utils.workloads import random_automaton
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--states", type=int, default=5000)
+    parser.add_argument("--nondeterminism", type=float, default=1.5)
+    parser.add_argument("--iterations", type=int, default=LAYOUT_ITERATIONS)
+    parser.add_argument("--budget", type=float, default=5.0, help="seconds the layout may take (default: 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = random_automaton(args.states, "ab", 1, args.nondeterminism, seed=args.seed)
+    index = {st["name"]: i for i, st in enumerate(data["states"])}
+    edges = [(index[tr["source"]], index[tr["target"]]) for tr in data["transitions"] for _ in tr["vectors"]]
+    positions = [(st["x"], st["y"]) for st in data["states"]]
+
+    start = time.perf_counter()
+    force_directed_layout(len(index), edges, positions, iterations=args.iterations)
+    elapsed = time.perf_counter() - start
+    print(f"{len(index)} states, {len(edges)} edges, {args.iterations} iterations")
+    print(f"layout time          {elapsed:>10.2f}s  ({elapsed / max(args.iterations, 1) * 1000:.1f}ms per iteration)")
+    print(f"budget               {args.budget:>10.2f}s  {'ok' if elapsed <= args.budget else 'EXCEEDED'}")
+    return 0 if elapsed <= args.budget else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Memory per configuration and matching cost of the engine search.
+
+    python -m benchmarks.bench_memory [--states N] [--tapes K] [--length L] [--nondeterminism D] [--seed S]
+
+The search of a generated workload (utils/workloads) is traced with tracemalloc; the bytes still
+allocated once it finished, while the Manager is alive, divided by the configurations in the
+visited set give the retained memory per configuration. The search time divided by the transitions
+tested gives the cost of one match attempt.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from backend.Automata import Automata
+from backend.Manager import Manager
+from backend.Tape import Tape
+from utils.workloads import random_automaton, random_word_tuples
+
+def measure(automata, words):
+    """ (configurations, retained bytes, peak bytes, seconds, transitions tested) of one search. """
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    manager = Manager(automata, [Tape(w) for w in words])
+    start = time.perf_counter()
+    manager.update([[automata.start_state] + [0] * len(words)])
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(manager.visited), current - base, peak - base, elapsed, manager.transitions_tested
+
+def measure_untraced(automata, words):
+    """ Seconds of one search without the tracemalloc overhead. """
+    manager = Manager(automata, [Tape(w) for w in words])
+    start = time.perf_counter()
+    manager.update([[automata.start_state] + [0] * len(words)])
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--states", type=int, default=24)
+    parser.add_argument("--tapes", type=int, default=2)
+    parser.add_argument("--length", type=int, default=40)
+    parser.add_argument("--nondeterminism", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = random_automaton(args.states, "ab", args.tapes, args.nondeterminism, seed=args.seed)
+    words = next(random_word_tuples(data, 1, args.length, accept_rate=1.0, seed=args.seed))
+    automata = Automata.from_description(data)
+    configs, retained, peak, elapsed, tested = measure(automata, words)
+    print(f"{args.states} states, {args.tapes} tapes, words of {args.length}, nondeterminism {args.nondeterminism}")
+    print(f"configurations       {configs:>12,}")
+    print(f"retained bytes       {retained:>12,}  ({retained / max(configs, 1):,.0f} per configuration)")
+    print(f"peak traced bytes    {peak:>12,}")
+    print(f"search time          {elapsed * 1000:>12.1f}ms  (traced)")
+    print(f"transitions tested   {tested:>12,}  ({elapsed / max(tested, 1) * 1e6:.2f}us each, traced)")
+    untraced = measure_untraced(automata, words)
+    print(f"search time          {untraced * 1000:>12.1f}ms  (untraced, {untraced / max(tested, 1) * 1e6:.2f}us per transition)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Startup latency of the GUI: time to import main, to show the login window and to draw the first canvas.
+
+    python -m benchmarks.bench_startup [--repeat N]
+
+Every sample is a fresh interpreter, so import costs are measured cold (apart from the OS file cache).
+The login is skipped automatically and a throw-away database is used. Needs a display;
+without one only the import time is reported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def child(db_path):
+    """ One sample: start the app with an automatic login and print the timings as JSON. """
+    start = time.perf_counter()
+    import main
+    result = {"import_s": time.perf_counter() - start}
+    main.DB_URL = f"sqlite:///{db_path}"
+
+    class AutoLogin(main.LoginWindow):
+        def __init__(self, parent, get_db_manager):
+            super().__init__(parent, get_db_manager)
+            self.update()
+            result["login_window_s"] = time.perf_counter() - start
+            get_db_manager()    # what pressing Login would wait for
+            parent.current_user = "bench"
+            self.after(0, self.destroy)
+
+    main.LoginWindow = AutoLogin
+    try:
+        app = main.MainApplication()
+        app.update()
+        result["first_canvas_s"] = time.perf_counter() - start
+        app.run_writer.close()
+        app.destroy()
+    except main.tk.TclError as e:
+        result["error"] = str(e)
+    print(json.dumps(result))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.repeat):
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child",
+                                  os.path.join(tmp, "bench.db")],
+                                 cwd=ROOT, capture_output=True, text=True, check=True)
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(f"{'phase':<16}{'median':>10}{'min':>10}")
+    for key, label in (("import_s", "import main"), ("login_window_s", "login window"),
+                       ("first_canvas_s", "first canvas")):
+        values = [s[key] for s in samples if key in s]
+        if values:
+            print(f"{label:<16}{statistics.median(values) * 1000:>8.1f}ms{min(values) * 1000:>8.1f}ms")
+    errors = {s["error"] for s in samples if "error" in s}
+    for err in errors:
+        print(f"GUI phases skipped: {err}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Display-less DrawingBoard for benchmarks.
+
+StubCanvas implements the part of the tk.Canvas API the board, viewport, states and transitions use,
+keeping items in a dict instead of a Tk widget. StubDrawingBoard puts it under DrawingBoard in the
+MRO, so every DrawingBoard method runs unchanged and only the Tk calls are replaced.
+make_board() uses a real Tk canvas when a display (e.g. Xvfb) is available and the stub otherwise.
+"""
+import tkinter as tk
+from components.drawing_board import DrawingBoard
+
+class StubCanvas(tk.Canvas):
+    """ In-memory stand-in for tk.Canvas: items are [kind, coords, options] entries keyed by id. """
+    def __init__(self, parent=None, width=900, height=700, **kwargs):
+        self._w = ".stubcanvas"
+        self.size = (width, height)
+        self.items = {}
+        self.next_id = 1
+        self.pending_idle = []
+
+    def _create(self, kind, coords, options):
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = [kind, list(coords), options]
+        return item
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_arc(self, *coords, **options):
+        return self._create("arc", coords, options)
+
+    def itemconfig(self, item, **options):
+        entry = self.items.get(item)
+        if entry is not None:
+            entry[2].update(options)
+
+    def coords(self, item, *coords):
+        entry = self.items.get(item)
+        if entry is None:
+            return []
+        if coords:
+            entry[1] = list(coords[0]) if len(coords) == 1 else list(coords)
+        return entry[1]
+
+    def move(self, item, dx, dy):
+        entry = self.items.get(item)
+        if entry is not None:
+            entry[1] = [v + (dx if i % 2 == 0 else dy) for i, v in enumerate(entry[1])]
+
+    def delete(self, *items):
+        for item in items:
+            if item == "all":
+                self.items.clear()
+            else:
+                self.items.pop(item, None)
+
+    def cget(self, key):
+        return {"width": self.size[0], "height": self.size[1]}[key]
+
+    def winfo_width(self):
+        return self.size[0]
+
+    def winfo_height(self):
+        return self.size[1]
+
+    def canvasx(self, x):
+        return x
+
+    def canvasy(self, y):
+        return y
+
+    def after(self, ms, func=None, *args):
+        return "after#stub"
+
+    def after_idle(self, func, *args):
+        self.pending_idle.append((func, args))
+        return f"idle#{len(self.pending_idle)}"
+
+    def after_cancel(self, ident):
+        pass
+
+    def update_idletasks(self):
+        """ Run the callbacks scheduled with after_idle, like Tk does when it is idle. """
+        pending, self.pending_idle = self.pending_idle, []
+        for func, args in pending:
+            func(*args)
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def tag_lower(self, *args):
+        pass
+
+    def tag_raise(self, *args):
+        pass
+
+class StubDrawingBoard(DrawingBoard, StubCanvas):
+    """ DrawingBoard drawing into a StubCanvas. """
+
+def make_board(automata_mgr, mode="auto", width=900, height=700):
+    """
+        A drawing board for automata_mgr and the mode actually used: (board, root, "tk" | "stub").
+        mode "tk" requires a display, "stub" never opens one, "auto" tries Tk first.
+        root is the Tk root to destroy afterwards, or None for the stub.
+    """
+    if mode in ("auto", "tk"):
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            if mode == "tk":
+                raise
+        else:
+            root.withdraw()
+            board = DrawingBoard(root, automata_mgr, width=width, height=height)
+            board.pack()
+            root.update()
+            return board, root, "tk"
+    return StubDrawingBoard(None, automata_mgr, width=width, height=height), None, "stub"
@@ -0,0 +1,237 @@
+"""
+Benchmark suite: engine search, RunManager, database and canvas timings across scaling tiers.
+
+    python -m benchmarks.suite [--tier small|medium|large] [--only PREFIX] [--repeat N]
+                               [--output results.json] [--baseline baseline.json] [--threshold 0.25]
+                               [--canvas auto|tk|stub]
+
+Each tier has a base workload (states, vectors per state, tapes, word length); the engine
+benchmarks run the base and, for every dimension, the base with that dimension doubled,
+so the scaling of each one is visible; automata and words come from utils/workloads with fixed
+seeds. RunManager runs without Tk; the canvas benchmark uses
+a real Tk canvas when a display (e.g. Xvfb) is available and benchmarks/stub_canvas otherwise.
+Results are written as JSON; with --baseline, every benchmark whose median is more than
+threshold slower than in the baseline is reported and the exit status is 1. A results file
+from an earlier run serves as the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from backend.Automata import Automata
+from backend.Manager import Manager
+from backend.Tape import Tape
+from managers.automata_manager import AutomataManager
+from managers.run_manager import RunManager
+from utils.workloads import random_automaton, random_word_tuples
+
+TIERS = {
+    "small": {"states": 8, "vectors": 3, "tapes": 2, "length": 12, "steps": 10_000, "canvas_states": 200},
+    "medium": {"states": 24, "vectors": 4, "tapes": 2, "length": 24, "steps": 100_000, "canvas_states": 2_000},
+    "large": {"states": 48, "vectors": 4, "tapes": 2, "length": 32, "steps": 1_000_000, "canvas_states": 10_000},
+}
+SCALED = ("states", "vectors", "tapes", "length")   # dimensions doubled one at a time
+ALPHABET = "ab"
+
+def make_automaton(states, vectors, tapes, seed=0):
+    """ Seeded random automaton (utils/workloads) with on average `vectors` outgoing vectors per state. """
+    return random_automaton(states, ALPHABET, tapes, nondeterminism=vectors / len(ALPHABET),
+                            wildcard_density=0.3, accept_ratio=0.25, seed=seed)
+
+def make_workload(states, vectors, tapes, length, seeds=20):
+    """
+        (automaton, words): the first seeded automaton with a word tuple of at least
+        length symbols per tape that the engine accepts, so the search has a run to find, and that tuple.
+    """
+    for seed in range(seeds):
+        data = make_automaton(states, vectors, tapes, seed)
+        try:
+            return data, next(random_word_tuples(data, 1, length, accept_rate=1.0, alphabet=ALPHABET, seed=seed))
+        except ValueError:
+            continue
+    raise ValueError(f"no automaton with an accepted word tuple in {seeds} seeds")
+
+def make_history(steps, tapes, states, seed=0):
+    """ Synthetic BFS witness: random state names, monotonically advancing tape heads. """
+    rng = random.Random(seed)
+    positions = [0] * tapes
+    history = []
+    for _ in range(steps):
+        positions[rng.randrange(tapes)] += 1
+        history.append([f"q{rng.randrange(states)}"] + positions)
+    return history
+
+def measure(fn, repeat, setup=None):
+    """ Time fn(setup()) repeat times (setup not included); returns (seconds per run, last result). """
+    times = []
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = fn(arg)
+        times.append(time.perf_counter() - start)
+    return times, result
+
+def sweep(base):
+    """ The base workload and, for each scaled dimension, the base with that dimension doubled. """
+    points = [dict(base)]
+    for dim in SCALED:
+        points.append(dict(base, **{dim: base[dim] * 2}))
+    return points
+
+def label(name, params):
+    """ Benchmark name with its workload, e.g. engine.search[states=8,vectors=3,tapes=2,length=12]. """
+    return f"{name}[{','.join(f'{k}={params[k]}' for k in SCALED)}]"
+
+def bench_engine(tier, repeat):
+    """ Backend only: build Automata from a description, then search an accepting run. """
+    for point in sweep(tier):
+        params = {k: point[k] for k in SCALED}
+        data, words = make_workload(point["states"], point["vectors"], point["tapes"], point["length"])
+        times, automata = measure(lambda _: Automata.from_description(data), repeat)
+        yield label("engine.compile", params), times, params
+
+        def search(_):
+            manager = Manager(automata, [Tape(w) for w in words])
+            history = manager.update([[automata.start_state] + [0] * len(words)])
+            return len(history), len(manager.visited)
+        times, (steps, explored) = measure(search, repeat)
+        yield label("engine.search", params), times, dict(params, steps=steps, explored=explored)
+
+def bench_run_manager(tier, repeat):
+    """ RunManager without Tk: start a run, then change a word mid-run (partial re-simulation). """
+    params = {k: tier[k] for k in SCALED}
+    data, words = make_workload(tier["states"], tier["vectors"], tier["tapes"], tier["length"])
+    other = next(random_word_tuples(data, 1, tier["length"], accept_rate=0.0, alphabet=ALPHABET))[0]
+
+    def new_run(_=None):
+        am = AutomataManager()
+        am.load_snapshot(data["states"], data["transitions"], data["word_count"])
+        rm = RunManager(am, None, "bench")
+        rm.words = list(words)
+        return rm
+
+    def start(rm):
+        rm.initialize_backend()
+        return rm
+    times, _ = measure(start, repeat, setup=new_run)
+    yield label("run_manager.initialize_backend", params), times, params
+
+    def running(_=None):
+        rm = start(new_run())
+        rm.running = True
+        rm.current_step = len(rm.history) // 2
+        return rm
+    times, _ = measure(lambda rm: rm.change_word(0, other), repeat, setup=running)
+    yield label("run_manager.change_word", params), times, params
+
+def bench_db(tier, repeat):
+    """ Save a run of tier['steps'] snapshots to a file database and load it back in full. """
+    from db_integration import DBManager
+    history = make_history(tier["steps"], tier["tapes"], tier["states"])
+    automaton, words = make_workload(tier["states"], tier["vectors"], tier["tapes"], tier["length"])
+    automaton["words"] = words
+    params = {"steps": tier["steps"], "tapes": tier["tapes"]}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(db_url=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        db.add_user("bench", "bench")
+        times, _ = measure(lambda _: db.save_run_history("bench", automaton, history, "bench"), repeat)
+        yield f"db.save[steps={tier['steps']}]", times, params
+
+        def load(_):
+            run = db.get_run_history(1)
+            return sum(1 for _ in run[3])
+        times, count = measure(load, repeat)
+        assert count == len(history)
+        yield f"db.load[steps={tier['steps']}]", times, params
+        db.engine.dispose()
+
+def bench_canvas(tier, repeat, mode):
+    """ Load a snapshot of tier['canvas_states'] states into the GUI model and draw it. """
+    from benchmarks.stub_canvas import make_board
+    data = make_automaton(tier["canvas_states"], 2, 1)
+    am = AutomataManager()
+    board, root, used = make_board(am, mode)
+    params = {"states": tier["canvas_states"], "canvas": used}
+    try:
+        times, _ = measure(lambda _: am.load_snapshot(data["states"], data["transitions"]), repeat)
+        yield f"canvas.load_snapshot[states={tier['canvas_states']}]", times, params
+
+        def draw(_):
+            am.draw_all(board)
+            if root is not None:
+                root.update_idletasks()
+        times, _ = measure(draw, repeat)
+        yield f"canvas.draw_all[states={tier['canvas_states']}]", times, params
+    finally:
+        if root is not None:
+            root.destroy()
+
+def run_suite(tier_name, repeat, only=None, canvas="auto"):
+    """ Run every benchmark of a tier (those starting with only, if given); returns the results document. """
+    tier = TIERS[tier_name]
+    groups = {"engine": lambda: bench_engine(tier, repeat), "run_manager": lambda: bench_run_manager(tier, repeat),
+              "db": lambda: bench_db(tier, repeat), "canvas": lambda: bench_canvas(tier, repeat, canvas)}
+    results = {}
+    for prefix, group in groups.items():
+        if only and not (only.startswith(prefix) or prefix.startswith(only)):
+            continue
+        for name, times, params in group():
+            if only and not name.startswith(only):
+                continue
+            results[name] = {"median_s": statistics.median(times), "min_s": min(times),
+                             "repeat": len(times), "params": params}
+            print(f"{name:<72}{statistics.median(times) * 1000:>10.2f}ms", file=sys.stderr)
+    return {
+        "meta": {"tier": tier_name, "repeat": repeat, "python": platform.python_version(),
+                 "platform": platform.platform(), "time": datetime.now(timezone.utc).isoformat()},
+        "results": results,
+    }
+
+def compare(results, baseline, threshold):
+    """ [(name, baseline median, median, ratio)] of the benchmarks more than threshold slower than the baseline. """
+    regressions = []
+    for name, result in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base["median_s"]:
+            continue
+        ratio = result["median_s"] / base["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append((name, base["median_s"], result["median_s"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tier", choices=sorted(TIERS), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run only the benchmarks whose name starts with this")
+    parser.add_argument("--output", default="-", help="JSON results file, - for stdout (default)")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (default: 0.25)")
+    parser.add_argument("--canvas", choices=("auto", "tk", "stub"), default="auto")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.tier, args.repeat, args.only, args.canvas)
+    text = json.dumps(results, indent=2) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {before * 1000:.2f}ms -> {after * 1000:.2f}ms ({ratio:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
-from utils.logger import operation_logger
+from utils.logger import get_logger
 from components.buttons.selection_button import SelectionTool
+
+operation_logger = get_logger("canvas")
+
 class AddStateTool:
     """
         Tool to add a new state by clicking on the canvas.
@@ -27,6 +30,7 @@ class AddStateTool:
             open window near cursors    
         """
         selected_state = self.find_state(event.x, event.y)
+        x, y = self.canvas.view.to_model(event.x, event.y)
         
         selection_tool = SelectionTool(
             canvas=self.canvas,
@@ -36,15 +40,16 @@ class AddStateTool:
             )
         
         if selected_state:  #edit
-            selection_tool.open_state_window(state=selected_state, x=event.x, y=event.y, rx=event.x_root, ry=event.y_root)
+            selection_tool.open_state_window(state=selected_state, x=x, y=y, rx=event.x_root, ry=event.y_root)
         else:               #add
-            selection_tool.open_state_window(x=event.x, y=event.y, rx=event.x_root, ry=event.y_root)
+            selection_tool.open_state_window(x=x, y=y, rx=event.x_root, ry=event.y_root)
         
         
         
         
     def find_state(self, x, y):
-        """ Find and return the state at the given coordinates. """
+        """ Find and return the state at the given screen coordinates. """
+        x, y = self.canvas.view.to_model(x, y)
         for s in self.automata_manager.states:
             dx, dy = x - s.x, y - s.y
             if (dx*dx + dy*dy)**0.5 <= s.radius:
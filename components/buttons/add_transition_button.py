@@ -1,6 +1,9 @@
 from components.buttons.selection_button import SelectionTool
-from utils.logger import operation_logger
+from utils.logger import get_logger
 from utils.constants import COLOR_BLACK, COLOR_RED
+
+operation_logger = get_logger("canvas")
+
 class AddTransitionTool:
     """
         Tool to add a new transition by selecting two states on the canvas.
@@ -45,12 +48,12 @@ class AddTransitionTool:
                 if existing: # edit
                     selection_tool.open_transition_window(existing_transition=existing,
                                                           rx=event.x_root, ry=event.y_root)
-                    operation_logger.info(f"Existing transition selected for editing: {state1.name} -> {state2.name}")
+                    operation_logger.info("Existing transition selected for editing: %s -> %s", state1.name, state2.name)
                 else:       # add
                     selection_tool.open_transition_window(src=state1, tgt=state2,
                                                           existing_transition=None,
                                                           rx=event.x_root, ry=event.y_root)
-                    operation_logger.info(f"New transition created: {state1.name} -> {state2.name}")
+                    operation_logger.info("New transition created: %s -> %s", state1.name, state2.name)
                 for s_ in self.selected_states:
                     self.highlight_state(s_, False)
                 self.selected_states.clear()
@@ -62,7 +65,8 @@ class AddTransitionTool:
             operation_logger.warning("Clicked on empty space while adding transition.")
 
     def find_state(self, x, y):
-        """ Find and return the state at the given coordinates. """
+        """ Find and return the state at the given screen coordinates. """
+        x, y = self.canvas.view.to_model(x, y)
         for s in self.automata_manager.states:
             dx, dy = x - s.x, y - s.y
             if (dx*dx + dy*dy)**0.5 <= s.radius:
@@ -1,14 +1,39 @@
+import time
 import tkinter as tk
 from tkinter import messagebox
-from utils.logger import operation_logger, error_logger
-from utils.constants import COLOR_BLACK, COLOR_RED
+from utils.logger import get_logger, error_logger
+from utils.constants import COLOR_BLACK, COLOR_RED, DRAG_FRAME_MS
+
+operation_logger = get_logger("canvas")
+
+class DragStats:
+    """ Counts motion events, rendered frames and Tk calls for one drag gesture. """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.events = 0
+        self.frames = 0
+        self.tk_calls = 0
+
+    def report(self):
+        """ Summary of the drag: events per second and Tk calls per rendered frame. """
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "events": self.events,
+            "frames": self.frames,
+            "seconds": elapsed,
+            "events_per_sec": self.events / elapsed,
+            "frames_per_sec": self.frames / elapsed,
+            "tk_calls_per_frame": self.tk_calls / self.frames if self.frames else 0.0,
+        }
 
 class SelectionTool:
     """
     Tool for selecting and editing states or transitions.
     Supports:
       - Normal click to edit states or transitions.
-      - Right-click drag to move states
+      - Right-click drag to move states. Motion events are coalesced to one
+        canvas update per DRAG_FRAME_MS; set drag_stats_hook to receive DragStats.report()
+        when a drag ends.
     """
     def __init__(self, canvas, automata_manager, undo_stack, redo_stack):
         self.canvas = canvas
@@ -16,6 +41,10 @@ class SelectionTool:
         self.undo_stack = undo_stack
         self.redo_stack = redo_stack
         self.dragged_state = None
+        self.pending_drag = None
+        self.drag_after_id = None
+        self.drag_stats = None
+        self.drag_stats_hook = None
         self.temp_trans_states = []
         self.run_mgr = None 
 
@@ -50,29 +79,59 @@ class SelectionTool:
         st = self.find_state(event.x, event.y)
         if st:
             self.dragged_state = st
+            self.drag_stats = DragStats()
             self.canvas.bind("<B3-Motion>", self.on_drag)
             self.canvas.bind("<ButtonRelease-3>", self.on_release)
-            operation_logger.info(f"Started dragging state: {st.name}")
+            operation_logger.info("Started dragging state: %s", st.name)
 
     def on_drag(self, event):
-        """ Handle the dragging of a state. """
+        """ Record the latest drag position; the canvas is updated at most once per frame. """
         if self.dragged_state:
-            self.dragged_state.move(self.canvas, event.x, event.y)
-            for out_tr in self.dragged_state.outgoing_transitions:
-                out_tr.redraw(self.canvas)
-            for in_tr in self.dragged_state.incoming_transitions:
-                in_tr.redraw(self.canvas)
+            self.pending_drag = (event.x, event.y)
+            self.drag_stats.events += 1
+            if self.drag_after_id is None:
+                self.drag_after_id = self.canvas.after(DRAG_FRAME_MS, self.flush_drag)
+
+    def flush_drag(self):
+        """ Apply the pending drag position to the state and move its transitions in place. """
+        self.drag_after_id = None
+        if not self.dragged_state or self.pending_drag is None:
+            return
+        x, y = self.canvas.view.to_model(*self.pending_drag)
+        self.pending_drag = None
+        st = self.dragged_state
+        calls = st.move(self.canvas, x, y)
+        # dict.fromkeys keeps self-loops (both outgoing and incoming) from being updated twice
+        for tr in dict.fromkeys(st.outgoing_transitions + st.incoming_transitions):
+            calls += tr.update_coords(self.canvas)
+        calls += self.canvas.viewport.update_bundles(st)
+        self.drag_stats.frames += 1
+        self.drag_stats.tk_calls += calls
 
     def on_release(self, event):
         """ Handle the release of a dragged state. """
         if self.dragged_state:
-            operation_logger.info(f"Finished dragging state: {self.dragged_state.name}")
+            if self.drag_after_id is not None:
+                self.canvas.after_cancel(self.drag_after_id)
+                self.drag_after_id = None
+            self.flush_drag()
+            stats = self.drag_stats.report()
+            operation_logger.info(
+                f"Finished dragging state: {self.dragged_state.name} "
+                f"({stats['events_per_sec']:.0f} events/s, {stats['frames_per_sec']:.0f} frames/s, "
+                f"{stats['tk_calls_per_frame']:.1f} Tk calls/frame)"
+            )
+            if self.drag_stats_hook:
+                self.drag_stats_hook(stats)
+            self.canvas.viewport.update_index(self.dragged_state)
             self.dragged_state = None
+            self.drag_stats = None
             self.canvas.unbind("<B3-Motion>")
             self.canvas.unbind("<ButtonRelease-3>")
 
     def find_state(self, x, y):
-        """ Find and return the state at the given coordinates. """
+        """ Find and return the state at the given screen coordinates. """
+        x, y = self.canvas.view.to_model(x, y)
         for s in self.automata_mgr.states:
             dx, dy = x - s.x, y - s.y
             if (dx*dx + dy*dy)**0.5 <= s.radius:
@@ -102,30 +161,26 @@ class SelectionTool:
             
     def remove_transition_obj(self, tr):
         """ Remove a transition from the automata manager and canvas. """
-        for cid in tr.canvas_ids:
-            self.canvas.delete(cid)
+        tr.clear(self.canvas)
         if tr in self.automata_mgr.transitions:
             self.automata_mgr.transitions.remove(tr)
         if tr in tr.source.outgoing_transitions:
             tr.source.outgoing_transitions.remove(tr)
         if tr in tr.target.incoming_transitions:
             tr.target.incoming_transitions.remove(tr)
-        operation_logger.info(f"Transition removed: {tr.source.name} -> {tr.target.name}")
+        self.canvas.viewport.update_index(tr)
+        operation_logger.info("Transition removed: %s -> %s", tr.source.name, tr.target.name)
 
     def remove_state_obj(self, st):
         """ Remove a state and its associated transitions from the automata manager and canvas. """
-        if st.canvas_id:
-            self.canvas.delete(st.canvas_id)
-        if st.label_id:
-            self.canvas.delete(st.label_id)
-        for exid in st.extra_ids:
-            self.canvas.delete(exid)
+        st.clear(self.canvas)
         if st in self.automata_mgr.states:
             self.automata_mgr.states.remove(st)
         trans_to_remove = st.outgoing_transitions + st.incoming_transitions
         for t in trans_to_remove:
             self.remove_transition_obj(t)
-        operation_logger.info(f"State and its transitions removed: {st.name}")
+        self.canvas.viewport.update_index(st)
+        operation_logger.info("State and its transitions removed: %s", st.name)
 
     def open_transition_window(self, src=None, tgt=None, existing_transition=None, rx=0, ry=0):
         """ Open a window to add/edit a transition. """
@@ -203,9 +258,8 @@ class SelectionTool:
 
             if is_edit:
                 existing_transition.transition_vectors = new_vecs
-                existing_transition.clear(self.canvas)
-                existing_transition.draw(self.canvas)
-                operation_logger.info(f"Transition edited: {src.name} -> {tgt.name}")
+                self.automata_mgr.render(self.canvas)
+                operation_logger.info("Transition edited: %s -> %s", src.name, tgt.name)
             else:
                 new_tr = self.automata_mgr.add_transition(src, tgt, new_vecs)
                 # Compute offset_index for parallel transitions
@@ -213,9 +267,10 @@ class SelectionTool:
                              if (t.source == src and t.target == tgt)]
                 new_tr.offset_index = len(parallels) - 1  # Zero-based index
                 new_tr.draw(self.canvas)
+                self.canvas.viewport.update_index(new_tr)
                 self.undo_stack.append(("add_transition", new_tr))
                 self.redo_stack.clear()
-                operation_logger.info(f"Transition added: {src.name} -> {tgt.name}")
+                operation_logger.info("Transition added: %s -> %s", src.name, tgt.name)
 
             win.destroy()
             if self.run_mgr and self.run_mgr.running:
@@ -228,7 +283,7 @@ class SelectionTool:
             self.undo_stack.append(("remove_transition", existing_transition))
             self.redo_stack.clear()
             self.remove_transition_obj(existing_transition)
-            operation_logger.info(f"Transition deleted: {existing_transition.source.name} -> {existing_transition.target.name}")
+            operation_logger.info("Transition deleted: %s -> %s", existing_transition.source.name, existing_transition.target.name)
             win.destroy()
             if self.run_mgr and self.run_mgr.running:
                 self.run_mgr.updated_transitions = True
@@ -277,20 +332,21 @@ class SelectionTool:
             if is_edit:
                 if state_name != state.name and any(s.name == state_name for s in self.automata_mgr.states):
                     messagebox.showerror("Error", f"State '{state_name}' already exists.")
-                    error_logger.error(f"Attempted to rename state to existing name: {state_name}")
+                    error_logger.error("Attempted to rename state to existing name: %s", state_name)
                     return
                 # Update state attributes
+                self.canvas.rename_state(state.name, state_name)
                 state.name = state_name
                 state.is_start = start_var.get()
                 state.is_accept = accept_var.get()
-                state.draw(self.canvas)
+                self.automata_mgr.render(self.canvas)
                 self.undo_stack.append(("edit_state", state))
                 self.redo_stack.clear()
-                operation_logger.info(f"State edited: {state_name}")
+                operation_logger.info("State edited: %s", state_name)
             else:
                 if any(s.name == state_name for s in self.automata_mgr.states):
                     messagebox.showerror("Error", f"State '{state_name}' already exists.")
-                    error_logger.error(f"Attempted to add duplicate state: {state_name}")
+                    error_logger.error("Attempted to add duplicate state: %s", state_name)
                     return
                 st = self.automata_mgr.add_state(
                     name=state_name, x=x, y=y,
@@ -298,9 +354,10 @@ class SelectionTool:
                     is_accept=accept_var.get()
                 )
                 st.draw(self.canvas)
+                self.canvas.viewport.update_index(st)
                 self.undo_stack.append(("add_state", st))
                 self.redo_stack.clear()
-                operation_logger.info(f"State added: {state_name} at ({x}, {y})")
+                operation_logger.info("State added: %s at (%s, %s)", state_name, x, y)
             win.destroy()
 
         def on_delete():
@@ -312,7 +369,7 @@ class SelectionTool:
                 self.undo_stack.append(("remove_state", (state, transitions)))
                 self.redo_stack.clear()
                 self.remove_state_obj(state)
-                operation_logger.info(f"State deleted: {state.name}")
+                operation_logger.info("State deleted: %s", state.name)
                 win.destroy()
                 if self.run_mgr and self.run_mgr.running:
                     self.run_mgr.updated_transitions = True
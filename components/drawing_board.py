@@ -1,36 +1,163 @@
+import logging
 import tkinter as tk
-from utils.constants import COLOR_BLACK, COLOR_RED
-from utils.logger import operation_logger
+from components.view_transform import ViewTransform
+from components.viewport import Viewport
+import math
+from utils.constants import COLOR_BLACK, COLOR_RED, HEATMAP_COLD, HEATMAP_HOT, HEATMAP_MAX_WIDTH
+from utils.logger import get_logger
+
+operation_logger = get_logger("canvas")
 
 class DrawingBoard(tk.Canvas):
     """
     The main canvas for drawing states and transitions.
-    Allows highlighting a single state at a time.
+    Keeps a state name -> canvas item index so highlighting never scans the canvas,
+    and supports highlighting several states at once.
+    Owns the ViewTransform (self.view) mapping model coordinates to the screen; zooming
+    and middle-button panning only change the transform and the visible items.
+    Drawing of the whole automaton goes through self.viewport, which culls off-screen items.
+    An optional heatmap overlay colours states by search expansions and thickens
+    transitions by match count; it is re-applied to items drawn later (e.g. on scroll).
     """
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, automata_mgr, **kwargs):
         super().__init__(parent, **kwargs)
-        self.current_highlight = None
+        self.state_items = {}       # state name -> oval canvas id
+        self.highlighted = set()    # names of currently highlighted states
+        self.heat_fill = None       # state name -> fill colour while the heatmap is shown
+        self.heat_width = {}        # (source name, target name) -> line width
+        self.view = ViewTransform()
+        self.viewport = Viewport(self, automata_mgr)
+        self.pan_anchor = None
+        self.bind("<Configure>", lambda event: self.viewport.schedule_refresh())
+        self.bind("<ButtonPress-2>", self.on_pan_start)
+        self.bind("<B2-Motion>", self.on_pan)
+        self.bind("<ButtonRelease-2>", self.on_pan_end)
         operation_logger.info("DrawingBoard initialized.")
 
+    def register_state(self, state_name, item_id):
+        """ Record the oval item of a drawn state, re-applying its highlight if needed. """
+        self.state_items[state_name] = item_id
+        if self.heat_fill is not None:
+            self.itemconfig(item_id, fill=self.heat_fill.get(state_name, HEATMAP_COLD))
+        if state_name in self.highlighted:
+            self.itemconfig(item_id, outline=COLOR_RED, width=3)
+
+    def register_transition(self, tr):
+        """ Style a freshly drawn transition line according to the heatmap, if shown. """
+        if self.heat_fill is not None and tr.canvas_ids:
+            width = self.heat_width.get((tr.source.name, tr.target.name))
+            if width:
+                self.itemconfig(tr.canvas_ids[0], width=width)
+
+    def unregister_state(self, state_name, item_id=None):
+        """ Forget the canvas item of a state whose items were removed. """
+        if item_id is None or self.state_items.get(state_name) == item_id:
+            self.state_items.pop(state_name, None)
+
+    def rename_state(self, old_name, new_name):
+        """ Move index and highlight entries of a renamed state. """
+        if old_name == new_name:
+            return
+        if old_name in self.state_items:
+            self.state_items[new_name] = self.state_items.pop(old_name)
+        if old_name in self.highlighted:
+            self.highlighted.discard(old_name)
+            self.highlighted.add(new_name)
+
+    def delete(self, *args):
+        """ Delete canvas items, dropping the state index when the whole canvas is cleared. """
+        if "all" in args:
+            self.state_items.clear()
+            self.viewport.forget()
+        super().delete(*args)
+
+    def zoom(self, factor, cx=None, cy=None):
+        """ Zoom around a screen point (the canvas center by default), touching only visible items. """
+        if cx is None or cy is None:
+            cx = self.winfo_width() / 2
+            cy = self.winfo_height() / 2
+        self.view.zoom(factor, cx, cy)
+        self.viewport.refresh(reposition=True)
+        operation_logger.debug("View zoomed by %s: scale=%.3f", factor, self.view.scale)
+
+    def on_pan_start(self, event):
+        """ Remember where a middle-button pan started. """
+        self.pan_anchor = (event.x, event.y)
+
+    def on_pan(self, event):
+        """ Pan the view; existing items are shifted with one move call, culling happens on idle. """
+        if self.pan_anchor is None:
+            return
+        dx, dy = event.x - self.pan_anchor[0], event.y - self.pan_anchor[1]
+        self.pan_anchor = (event.x, event.y)
+        self.view.pan(dx, dy)
+        self.move("all", dx, dy)
+        self.viewport.schedule_refresh()
+
+    def on_pan_end(self, event):
+        """ Finish a middle-button pan. """
+        self.pan_anchor = None
+        self.viewport.refresh()
+
     def highlight_state(self, state_name):
         """
             Highlight the specified state on the canvas by changing its outline color.
-            Removes highlight from the previously highlighted state.
+            Removes highlight from the previously highlighted states.
+        """
+        self.highlight_states([state_name] if state_name else [])
+
+    def highlight_states(self, state_names):
+        """
+            Highlight exactly the given states. Only states whose highlight actually
+            changes are touched, so a playback step costs O(changed) canvas calls.
+        """
+        new = {name for name in state_names if name}
+        for name in self.highlighted - new:
+            item = self.state_items.get(name)
+            if item:
+                self.itemconfig(item, outline=COLOR_BLACK, width=2)
+        for name in new - self.highlighted:
+            item = self.state_items.get(name)
+            if item:
+                self.itemconfig(item, outline=COLOR_RED, width=3)
+        self.highlighted = new
+        if new and operation_logger.isEnabledFor(logging.DEBUG):
+            operation_logger.debug("States highlighted: %s", ', '.join(sorted(map(str, new))))
+
+    def show_heatmap(self, state_visits, edge_matches):
+        """
+            Overlay search counters: state fill goes from HEATMAP_COLD to HEATMAP_HOT with the
+            (log-scaled) expansion count, transition width grows with the match count.
         """
-        # Remove old highlight
-        if self.current_highlight:
-            self.itemconfig(self.current_highlight, outline=COLOR_BLACK, width=2)
-            operation_logger.debug(f"Removed highlight from state: {self.current_highlight}")
-            self.current_highlight = None
+        top_visits = math.log1p(max(state_visits.values(), default=0)) or 1.0
+        top_matches = math.log1p(max(edge_matches.values(), default=0)) or 1.0
+        self.heat_fill = {name: self.heat_color(math.log1p(v) / top_visits) for name, v in state_visits.items()}
+        self.heat_width = {key: 2 + (HEATMAP_MAX_WIDTH - 2) * math.log1p(m) / top_matches
+                           for key, m in edge_matches.items()}
+        self.apply_heatmap()
+        operation_logger.info("Heatmap shown for %s states, %s transitions.", len(state_visits), len(edge_matches))
 
-        if not state_name:
+    def hide_heatmap(self):
+        """ Remove the heatmap overlay, restoring the default fill and widths. """
+        if self.heat_fill is None:
             return
+        self.heat_fill = None
+        self.heat_width = {}
+        self.apply_heatmap()
+        operation_logger.info("Heatmap hidden.")
 
-        # Find and highlight the new state
-        for item in self.find_all():
-            tags = self.gettags(item)
-            if f"state_{state_name}" in tags:
-                self.itemconfig(item, outline=COLOR_RED, width=3)
-                self.current_highlight = item
-                operation_logger.info(f"State highlighted: {state_name}")
-                break
+    def apply_heatmap(self):
+        """ Restyle the currently drawn states and transitions (O(visible) canvas calls). """
+        for name, item in self.state_items.items():
+            fill = HEATMAP_COLD if self.heat_fill is None else self.heat_fill.get(name, HEATMAP_COLD)
+            self.itemconfig(item, fill=fill)
+        for tr in self.viewport.drawn_transitions:
+            if tr.canvas_ids:
+                self.itemconfig(tr.canvas_ids[0], width=self.heat_width.get((tr.source.name, tr.target.name), 2))
+
+    @staticmethod
+    def heat_color(t):
+        """ Interpolate between HEATMAP_COLD and HEATMAP_HOT for t in [0, 1]. """
+        cold = [int(HEATMAP_COLD[i:i + 2], 16) for i in (1, 3, 5)]
+        hot = [int(HEATMAP_HOT[i:i + 2], 16) for i in (1, 3, 5)]
+        return "#" + "".join(f"{round(c + (h - c) * t):02x}" for c, h in zip(cold, hot))
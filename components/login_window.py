@@ -1,15 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from utils.logger import operation_logger, error_logger
+from utils.logger import get_logger, error_logger
+
+operation_logger = get_logger("ui")
 
 class LoginWindow(tk.Toplevel):
     """
         Simple login window that checks credentials via DBManager.
         On success, sets self.master.current_user and closes.
+        get_db_manager returns the DBManager; it is only called on Login/Register, so the
+        database can still be opening while the window is shown.
     """
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, get_db_manager):
         super().__init__(parent)
-        self.db_manager = db_manager
+        self.get_db_manager = get_db_manager
         self.title("Login")
         self.geometry("300x180")
         self.resizable(False, False)
@@ -37,6 +41,15 @@ class LoginWindow(tk.Toplevel):
         operation_logger.info("LoginWindow closed by user.")
         self.master.destroy()
 
+    def db(self):
+        """ The DBManager, or None (after reporting it) if the database could not be opened. """
+        try:
+            return self.get_db_manager()
+        except Exception as e:
+            messagebox.showerror("Error", f"Cannot open the database: {e}")
+            error_logger.error("Failed to open the database: %s", e)
+            return None
+
     def on_login(self):
         """ Attempt to log in the user with provided credentials. """
         user = self.username_var.get().strip()
@@ -45,13 +58,16 @@ class LoginWindow(tk.Toplevel):
             messagebox.showerror("Error", "Please enter both username and password.")
             error_logger.warning("Login attempt with empty username or password.")
             return
-        if self.db_manager.check_user_credentials(user, pwd):
+        db = self.db()
+        if db is None:
+            return
+        if db.check_user_credentials(user, pwd):
             self.master.current_user = user
-            operation_logger.info(f"User logged in: {user}")
+            operation_logger.info("User logged in: %s", user)
             self.destroy()
         else:
             messagebox.showerror("Error", "Invalid credentials.")
-            error_logger.warning(f"Invalid login attempt for user: {user}")
+            error_logger.warning("Invalid login attempt for user: %s", user)
 
     def on_register(self):
         """ Attempt to register a new user with provided credentials. """
@@ -61,10 +77,13 @@ class LoginWindow(tk.Toplevel):
             messagebox.showerror("Error", "Please enter both username and password.")
             error_logger.warning("Registration attempt with empty username or password.")
             return
-        ok, msg = self.db_manager.add_user(user, pwd)
+        db = self.db()
+        if db is None:
+            return
+        ok, msg = db.add_user(user, pwd)
         if not ok:
             messagebox.showerror("Error", msg)
-            error_logger.error(f"Registration failed for user: {user}, Reason: {msg}")
+            error_logger.error("Registration failed for user: %s, Reason: %s", user, msg)
         else:
             messagebox.showinfo("Registered", msg)
-            operation_logger.info(f"User registered successfully: {user}")
+            operation_logger.info("User registered successfully: %s", user)
@@ -1,10 +1,15 @@
 import tkinter as tk
 from tkinter import ttk
-from utils.constants import COLOR_RED, COLOR_GREEN, COLOR_CS_BG, EMPTY_SETUP
-from utils.logger import operation_logger
+from utils.constants import COLOR_RED, COLOR_GREEN, COLOR_CS_BG, EMPTY_SETUP, TAPE_WINDOW, TAPE_CONTEXT
+from utils.logger import get_logger
+
+operation_logger = get_logger("run")
 
 class CurrentSetupFrame(tk.Frame):
-    """ Displays current simulation history step and highlights tapes in green if fully read. """
+    """
+        Displays current simulation history step and highlights tapes in green if fully read.
+        Only a window of each tape around its head is rendered, so long words stay cheap.
+    """
     def __init__(self, parent, run_mgr, canvas):
         super().__init__(parent, bg=COLOR_CS_BG)
         self.run_mgr = run_mgr
@@ -20,38 +25,72 @@ class CurrentSetupFrame(tk.Frame):
         # Configure text tags for coloring
         self.tapes_text.tag_config("red_char", foreground=COLOR_RED)
         self.tapes_text.tag_config("green_text", foreground=COLOR_GREEN)
+        self.lines = []     # per tape: (word, window start, window end, fully read, prefix length)
 
     def display_step(self, step):
-        """  Update Current Setup display based on the current history step. """
-        self.tapes_text.config(state=tk.NORMAL)
-        self.tapes_text.delete("1.0", tk.END)
-
+        """
+            Update Current Setup display based on the current history step.
+            Each tape shows only a TAPE_WINDOW slice around its head, written with one insert.
+            While the head stays inside its slice only the "red_char" tag is moved.
+        """
         if not step:
             self.state_label.config(text=EMPTY_SETUP)
-            self.tapes_text.config(state=tk.DISABLED)
+            self.clear_tapes()
             operation_logger.info("Displayed unknown state in CurrentSetupFrame.")
             return
 
         state_name = step[0]
         self.state_label.config(text=f"State: {state_name}")
+        words = self.run_mgr.words
         tape_positions = step[1:]
-        if len(tape_positions) < len(self.run_mgr.words):
-            tape_positions += [0] * (len(self.run_mgr.words) - len(tape_positions))
-
-        for i, word in enumerate(self.run_mgr.words):
-            pos = tape_positions[i]
-            self.tapes_text.insert(tk.END, f"Tape {i+1}: ")
-
-            if pos >= len(word):
-                # Entire tape read; color green
-                self.tapes_text.insert(tk.END, word + "\n", "green_text")
-            else:
-                # Partial highlight; current character in red
-                for j, ch in enumerate(word):
-                    if j == pos:
-                        self.tapes_text.insert(tk.END, ch, "red_char")
-                    else:
-                        self.tapes_text.insert(tk.END, ch)
-                self.tapes_text.insert(tk.END, "\n")
+        if len(tape_positions) < len(words):
+            tape_positions += [0] * (len(words) - len(tape_positions))
+
+        self.tapes_text.config(state=tk.NORMAL)
+        if len(self.lines) != len(words):
+            self.tapes_text.delete("1.0", tk.END)
+            self.lines = [None] * len(words)
+        for i, word in enumerate(words):
+            self.show_tape(i, word, tape_positions[i])
         self.tapes_text.config(state=tk.DISABLED)
-        operation_logger.info(f"Displayed step in CurrentSetupFrame: State={state_name}")
+        operation_logger.debug("Displayed step in CurrentSetupFrame: State=%s", state_name)
+
+    def clear_tapes(self):
+        """ Empty the tapes text and forget the rendered windows. """
+        self.tapes_text.config(state=tk.NORMAL)
+        self.tapes_text.delete("1.0", tk.END)
+        self.tapes_text.config(state=tk.DISABLED)
+        self.lines = []
+
+    def show_tape(self, i, word, pos):
+        """ Bring tape line i up to date, rebuilding it only if the head left the shown window. """
+        row = i + 1
+        line = self.lines[i]
+        done = pos >= len(word)
+        if line is not None and line[0] == word and line[3] == done and (done or line[1] <= pos < line[2]):
+            if not done:
+                self.tapes_text.tag_remove("red_char", f"{row}.0", f"{row}.end")
+                self.tapes_text.tag_add("red_char", f"{row}.{line[4] + pos - line[1]}")
+            return
+
+        prefix = f"Tape {row}: "
+        if done:
+            # Entire tape read; show its tail in green
+            start, end = max(0, len(word) - TAPE_WINDOW), len(word)
+        else:
+            start = max(0, min(pos - TAPE_CONTEXT, len(word) - TAPE_WINDOW))
+            end = min(len(word), start + TAPE_WINDOW)
+        if start > 0:
+            prefix += "\u2026"
+        body = word[start:end] + ("\u2026" if end < len(word) else "")
+        if line is None:
+            self.tapes_text.insert(f"{row}.0", "\n")
+        else:
+            self.tapes_text.delete(f"{row}.0", f"{row}.end")
+        if done:
+            self.tapes_text.insert(f"{row}.0", prefix, (), body, "green_text")
+        else:
+            # Partial highlight; current character in red
+            col = pos - start
+            self.tapes_text.insert(f"{row}.0", prefix + body[:col], (), body[col], "red_char", body[col + 1:], ())
+        self.lines[i] = (word, start, end, done, len(prefix))
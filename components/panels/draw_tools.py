@@ -1,11 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-from utils.constants import IMG_SIZE, COLOR_DT_BG
+from utils.constants import COLOR_DT_BG
 from components.buttons.add_state_button import AddStateTool
 from components.buttons.add_transition_button import AddTransitionTool
 from components.buttons.selection_button import SelectionTool
-from utils.logger import operation_logger, error_logger
+from utils.logger import get_logger
+from utils.icons import load_icon
+
+operation_logger = get_logger("ui")
 
 class ToolsFrame(tk.Frame):
     """ 
@@ -13,6 +15,7 @@ class ToolsFrame(tk.Frame):
           - Word Count controls
           - Tools: Add State, Add Transition, Selection
           - Undo/Redo/Zoom
+          - Auto Layout (automatic, force-directed or layered)
      """ 
     def __init__(self, parent, automata_mgr, canvas, undo_stack, redo_stack):
         super().__init__(parent, bg=COLOR_DT_BG)
@@ -23,16 +26,17 @@ class ToolsFrame(tk.Frame):
         self.active_tool = None
         self.tools = {}
         self.buttons_dict = {}
+        self.layout_mgr = None
 
         # Load icons
         self.icons = {
-            "add_state": self.load_icon("assets/circle.png"),
-            "add_transition": self.load_icon("assets/arrow.png"),
-            "select": self.load_icon("assets/arrow_select.png"),
-            "undo": self.load_icon("assets/arrow_back.png"),
-            "redo": self.load_icon("assets/arrow_forward.png"),
-            "zoom_in": self.load_icon("assets/zoom_in.png"),
-            "zoom_out": self.load_icon("assets/zoom_out.png"),
+            "add_state": load_icon("assets/circle.png"),
+            "add_transition": load_icon("assets/arrow.png"),
+            "select": load_icon("assets/arrow_select.png"),
+            "undo": load_icon("assets/arrow_back.png"),
+            "redo": load_icon("assets/arrow_forward.png"),
+            "zoom_in": load_icon("assets/zoom_in.png"),
+            "zoom_out": load_icon("assets/zoom_out.png"),
         }
 
         # Style configuration for pressed tool buttons
@@ -79,22 +83,22 @@ class ToolsFrame(tk.Frame):
         ttk.Button(self, image=self.icons["zoom_in"], command=self.zoom_in).pack(pady=3)
         ttk.Button(self, image=self.icons["zoom_out"], command=self.zoom_out).pack(pady=3)
 
-    def load_icon(self, path):
-        """ Load and resize an icon image. """ 
-        try:
-            img = Image.open(path)
-            img = img.resize(IMG_SIZE)
-            return ImageTk.PhotoImage(img)
-        except Exception as e:
-            error_logger.error(f"Failed to load icon {path}: {e}")
-            return None
+        # Auto Layout
+        layout_btn = ttk.Menubutton(self, text="Layout")
+        layout_menu = tk.Menu(layout_btn, tearoff=0)
+        layout_menu.add_command(label="Automatic", command=lambda: self.auto_layout("auto"))
+        layout_menu.add_command(label="Force-directed", command=lambda: self.auto_layout("force"))
+        layout_menu.add_command(label="Layered", command=lambda: self.auto_layout("layered"))
+        layout_btn["menu"] = layout_menu
+        layout_btn.pack(pady=3)
+        self.buttons_dict["Auto Layout"] = layout_btn
 
     def add_tool_button(self, label, tool_obj, icon):
         """ Add a tool button to the tools panel. """ 
         btn = ttk.Button(self, image=icon, command=lambda: self.activate_tool(label, tool_obj))
         btn.pack(pady=3)
         self.tools[label] = (btn, tool_obj)
-        operation_logger.info(f"Tool button added: {label}")
+        operation_logger.info("Tool button added: %s", label)
         return btn
 
     def activate_tool(self, label):
@@ -105,7 +109,7 @@ class ToolsFrame(tk.Frame):
         btn, t = self.tools[label]
         btn.config(style="PressedToolButton.TButton")
         t.activate()
-        operation_logger.info(f"Tool activated: {label}")
+        operation_logger.info("Tool activated: %s", label)
 
     def reset_tool(self, label):
         """ Reset a tool to its default state. """ 
@@ -113,7 +117,7 @@ class ToolsFrame(tk.Frame):
         btn.config(style="TButton")
         t.deactivate()
         self.active_tool = None
-        operation_logger.info(f"Tool reset: {label}")
+        operation_logger.info("Tool reset: %s", label)
 
     def enable_drawing_tools(self, enable: bool):
         """ 
@@ -121,10 +125,10 @@ class ToolsFrame(tk.Frame):
             Prevents modifications during BFS runs.
          """ 
         state_ = tk.NORMAL if enable else tk.DISABLED
-        for k in ["Add State", "Add Transition"]:
+        for k in ["Add State", "Add Transition", "Auto Layout"]:
             if k in self.buttons_dict:
                 self.buttons_dict[k].config(state=state_)
-        operation_logger.info(f"Drawing tools {'enabled' if enable else 'disabled'}.")
+        operation_logger.info("Drawing tools %s.", 'enabled' if enable else 'disabled')
 
     # Word Count
     def increment_word_count(self):
@@ -140,12 +144,11 @@ class ToolsFrame(tk.Frame):
             self.set_word_count()
 
     def set_word_count(self):
-        """ Set the word count in the automata manager and redraw the canvas. """ 
+        """ Set the word count in the automata manager and re-render the changed transition labels. """ 
         val = self.word_count_var.get()
         self.automata_mgr.set_word_count(val)
-        self.canvas.delete("all")
-        self.automata_mgr.draw_all(self.canvas)
-        operation_logger.info(f"Word count set to: {val}")
+        self.automata_mgr.render(self.canvas)
+        operation_logger.info("Word count set to: %s", val)
 
     # Undo/Redo
     def undo(self):
@@ -155,6 +158,7 @@ class ToolsFrame(tk.Frame):
             operation_logger.info("Undo attempted with empty stack.")
             return
         action, obj = self.undo_stack.pop()
+        restored = []
         if action == "add_state":
             self.remove_state_obj(obj)
         elif action == "add_transition":
@@ -168,15 +172,18 @@ class ToolsFrame(tk.Frame):
                 tr.source.outgoing_transitions.append(tr)
                 tr.target.incoming_transitions.append(tr)
                 tr.draw(self.canvas)
+            restored = [st, *tr_list]
         elif action == "remove_transition":
             tr = obj
             self.automata_mgr.transitions.append(tr)
             tr.source.outgoing_transitions.append(tr)
             tr.target.incoming_transitions.append(tr)
             tr.draw(self.canvas)
+            restored = [tr]
 
         self.redo_stack.append((action, obj))
-        operation_logger.info(f"Undo performed: {action} for {obj}")
+        self.canvas.viewport.update_index(*restored)
+        operation_logger.info("Undo performed: %s for %s", action, obj)
 
     def redo(self):
         """ Perform a redo operation. """ 
@@ -185,14 +192,17 @@ class ToolsFrame(tk.Frame):
             operation_logger.info("Redo attempted with empty stack.")
             return
         action, obj = self.redo_stack.pop()
+        restored = []
         if action == "add_state":
             self.automata_mgr.states.append(obj)
             obj.draw(self.canvas)
+            restored = [obj]
         elif action == "add_transition":
             self.automata_mgr.transitions.append(obj)
             obj.source.outgoing_transitions.append(obj)
             obj.target.incoming_transitions.append(obj)
             obj.draw(self.canvas)
+            restored = [obj]
         elif action == "remove_state":
             st, _ = obj
             self.remove_state_obj(st)
@@ -200,41 +210,55 @@ class ToolsFrame(tk.Frame):
             self.remove_transition_obj(obj)
 
         self.undo_stack.append((action, obj))
-        operation_logger.info(f"Redo performed: {action} for {obj}")
+        self.canvas.viewport.update_index(*restored)
+        operation_logger.info("Redo performed: %s for %s", action, obj)
 
     def remove_state_obj(self, st):
         """ Remove a state and its transitions from the automata manager and canvas. """ 
-        if st.canvas_id:
-            self.canvas.delete(st.canvas_id)
-        if st.label_id:
-            self.canvas.delete(st.label_id)
-        for exid in st.extra_ids:
-            self.canvas.delete(exid)
+        st.clear(self.canvas)
         if st in self.automata_mgr.states:
             self.automata_mgr.states.remove(st)
         all_trans = st.outgoing_transitions + st.incoming_transitions
         for t in all_trans:
             self.remove_transition_obj(t)
-        operation_logger.info(f"State removed via undo: {st.name}")
+        self.canvas.viewport.update_index(st)
+        operation_logger.info("State removed via undo: %s", st.name)
 
     def remove_transition_obj(self, tr):
         """ Remove a transition from the automata manager and canvas. """ 
-        for cid in tr.canvas_ids:
-            self.canvas.delete(cid)
+        tr.clear(self.canvas)
         if tr in self.automata_mgr.transitions:
             self.automata_mgr.transitions.remove(tr)
         if tr in tr.source.outgoing_transitions:
             tr.source.outgoing_transitions.remove(tr)
         if tr in tr.target.incoming_transitions:
             tr.target.incoming_transitions.remove(tr)
-        operation_logger.info(f"Transition removed via undo: {tr.source.name} -> {tr.target.name}")
+        self.canvas.viewport.update_index(tr)
+        operation_logger.info("Transition removed via undo: %s -> %s", tr.source.name, tr.target.name)
 
     def zoom_in(self):
         """ Zoom in the canvas. """ 
-        self.canvas.scale("all", 0, 0, 1.2, 1.2)
+        self.canvas.zoom(1.2)
         operation_logger.info("Canvas zoomed in.")
 
     def zoom_out(self):
         """ Zoom out the canvas. """ 
-        self.canvas.scale("all", 0, 0, 0.8, 0.8)
+        self.canvas.zoom(0.8)
         operation_logger.info("Canvas zoomed out.")
+
+    # Auto Layout
+    def auto_layout(self, method):
+        """ Lay out the automaton in the background; the button is disabled until it is applied. """ 
+        if not self.automata_mgr.states:
+            return
+        if self.layout_mgr is None:
+            from managers.layout_manager import LayoutManager  # NumPy is only loaded on first use
+            self.layout_mgr = LayoutManager(self.canvas, self.automata_mgr)
+        if self.layout_mgr.start(method, on_done=self.on_layout_done):
+            self.buttons_dict["Auto Layout"].config(state=tk.DISABLED)
+
+    def on_layout_done(self, err):
+        """ Re-enable the layout button and report a failed layout. """ 
+        self.buttons_dict["Auto Layout"].config(state=tk.NORMAL)
+        if err is not None:
+            messagebox.showerror("Auto Layout", f"Layout failed: {err}")
@@ -1,13 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from PIL import Image, ImageTk
-from utils.constants import IMG_SIZE, COLOR_RT_BG, RUN_PAUSES_MS, AppMode
-from utils.logger import operation_logger, error_logger
+from utils.constants import (COLOR_RT_BG, RUN_PAUSES_MS, PLAYBACK_SPEEDS, PLAYBACK_MIN_FRAME_MS,
+                             RUN_HISTORY_PAGE_SIZE, AppMode)
+from utils.logger import get_logger, error_logger
+from utils.icons import load_icon
+
+operation_logger = get_logger("run")
 
 class RunToolsFrame(tk.Frame):
     """ 
         The bottom frame with Run/Pause/Step/Stop/Reload/Save/Load icons and words window.
         Using run_manager to coordinate GUI and backend together.
+        Playback has a speed selector, seeking to a step and fast-forward to the last step;
+        at most one after() callback is pending and skipped steps are never drawn.
      """ 
     def __init__(self, parent, run_mgr, canvas):
         super().__init__(parent, bg=COLOR_RT_BG)
@@ -23,13 +28,13 @@ class RunToolsFrame(tk.Frame):
         self.after_id = None
         
         self.icons = {
-            "run": self.load_icon("assets/run.png"),
-            "pause": self.load_icon("assets/pause.png"),
-            "step": self.load_icon("assets/step.png"),
-            "stop": self.load_icon("assets/stop.png"),
-            "reload": self.load_icon("assets/reload.png"),
-            "save": self.load_icon("assets/save.png"),
-            "story": self.load_icon("assets/story.png"),
+            "run": load_icon("assets/run.png"),
+            "pause": load_icon("assets/pause.png"),
+            "step": load_icon("assets/step.png"),
+            "stop": load_icon("assets/stop.png"),
+            "reload": load_icon("assets/reload.png"),
+            "save": load_icon("assets/save.png"),
+            "story": load_icon("assets/story.png"),
         }
 
         # Initialize buttons with ttk for better appearance
@@ -54,15 +59,26 @@ class RunToolsFrame(tk.Frame):
         self.load_btn = ttk.Button(self, image=self.icons["story"], command=self.on_load_run)
         self.load_btn.pack(side=tk.LEFT, padx=5, pady=5)
 
-    def load_icon(self, path):
-        """ Load and resize an icon image. """ 
-        try:
-            img = Image.open(path)
-            img = img.resize(IMG_SIZE)
-            return ImageTk.PhotoImage(img)
-        except Exception as e:
-            error_logger.error(f"Failed to load icon {path}: {e}")
-            return None
+        # Playback controls
+        playback = tk.Frame(self, bg=COLOR_RT_BG)
+        playback.pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(playback, text="\u23e9", width=3, command=self.on_fast_forward).pack(side=tk.LEFT, padx=2)
+        ttk.Label(playback, text="Speed:").pack(side=tk.LEFT, padx=2)
+        self.speed_var = tk.StringVar(value="1x")
+        ttk.Combobox(playback, textvariable=self.speed_var, width=5, state="readonly",
+                     values=[f"{s:g}x" for s in PLAYBACK_SPEEDS]).pack(side=tk.LEFT, padx=2)
+        ttk.Label(playback, text="Step:").pack(side=tk.LEFT, padx=2)
+        self.seek_var = tk.StringVar()
+        seek_entry = ttk.Entry(playback, textvariable=self.seek_var, width=7, justify='center')
+        seek_entry.pack(side=tk.LEFT, padx=2)
+        seek_entry.bind("<Return>", lambda event: self.on_seek())
+        ttk.Button(playback, text="Go", width=3, command=self.on_seek).pack(side=tk.LEFT, padx=2)
+        self.step_label = ttk.Label(playback, text="0 / 0")
+        self.step_label.pack(side=tk.LEFT, padx=2)
+
+        self.heatmap_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self, text="Heatmap", variable=self.heatmap_var,
+                        command=self.on_toggle_heatmap).pack(side=tk.LEFT, padx=5, pady=5)
 
     def set_current_setup(self, setup_window):
         """ Set reference to the Current Setup window. """ 
@@ -80,34 +96,90 @@ class RunToolsFrame(tk.Frame):
         operation_logger.info("WordsWindow linked to RunToolsFrame.")
 
     def on_run(self):
-        """  Start the BFS simulation. Runs until paused. """ 
-        self.run_mgr.app_mode = AppMode.RUNNING
-        self.run_mgr.running = True
-        if self.tools_panel_ref:
-            self.tools_panel_ref.enable_drawing_tools(False)
-
-        if not self.running:
-            self.run_mgr.initialize_backend()
-            self.run_mgr.load_history()
-
+        """  Start the BFS simulation, or resume a paused/seeked one. Runs until paused. """ 
+        self.ensure_started()
         self.running = True
         self.run_simulation()
         operation_logger.info("BFS simulation started.")
 
+    def playback_delay(self):
+        """ Frame delay in ms and number of steps advanced per frame for the selected speed. """ 
+        try:
+            speed = float(self.speed_var.get().rstrip("x"))
+        except ValueError:
+            speed = 1.0
+        delay = RUN_PAUSES_MS / speed
+        if delay >= PLAYBACK_MIN_FRAME_MS:
+            return int(delay), 1
+        return PLAYBACK_MIN_FRAME_MS, round(PLAYBACK_MIN_FRAME_MS / delay)
+
+    def schedule(self, delay, callback):
+        """ Schedule the next playback frame, replacing any pending one. """ 
+        if self.after_id:
+            self.after_cancel(self.after_id)
+        self.after_id = self.after(delay, callback)
+
     def run_simulation(self):
-        """ Run the BFS simulation step-by-step. """ 
+        """ Run the BFS simulation; at high speeds several steps are taken per frame and only the last is drawn. """ 
+        self.after_id = None
         if not self.running:
             return
-        snap = self.run_mgr.step()
+        delay, steps = self.playback_delay()
+        snap = None
+        for _ in range(steps):
+            nxt = self.run_mgr.step()
+            if not nxt:
+                break
+            snap = nxt
         if snap:
             self.highlight_step(snap)
-            self.after_id = self.after(RUN_PAUSES_MS, self.run_simulation)  # Continue after 600ms
+            self.schedule(delay, self.run_simulation)
         else:
-            self.running = False
-            msg = "Accepted!" if self.run_mgr.is_accepted() else "Rejected!"
-            messagebox.showinfo("Result", msg)
-            operation_logger.info(f"BFS simulation ended with result: {msg}")
-            self.finish_run()
+            self.end_run()
+
+    def end_run(self):
+        """ Report the result of a finished run and return to drawing mode. """ 
+        self.running = False
+        msg = "Accepted!" if self.run_mgr.is_accepted() else "Rejected!"
+        messagebox.showinfo("Result", msg)
+        operation_logger.info("BFS simulation ended with result: %s", msg)
+        self.finish_run()
+
+    def ensure_started(self):
+        """ Build the backend and history unless a run is in progress (paused runs are resumed). """ 
+        if self.run_mgr.app_mode != AppMode.RUNNING or self.run_mgr.manager is None:
+            self.run_mgr.running = True
+            self.run_mgr.app_mode = AppMode.RUNNING
+            self.run_mgr.initialize_backend()
+            self.run_mgr.load_history()
+            self.update_heatmap()
+        elif not self.run_mgr.running:
+            self.run_mgr.resume()
+        if self.tools_panel_ref:
+            self.tools_panel_ref.enable_drawing_tools(False)
+
+    def on_fast_forward(self):
+        """ Jump straight to the last step, drawing only that frame, and report the result. """ 
+        self.on_pause()
+        self.ensure_started()
+        snap = self.run_mgr.seek(len(self.run_mgr.history) - 1)
+        if snap:
+            self.highlight_step(snap)
+        operation_logger.info("BFS simulation fast-forwarded to step %s.", self.run_mgr.current_step)
+        self.end_run()
+
+    def on_seek(self):
+        """ Show step N (1-based) of the run; playback, if active, continues from there. """ 
+        try:
+            target = int(self.seek_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Step must be a whole number.")
+            return
+        self.ensure_started()
+        snap = self.run_mgr.seek(target - 1)
+        if snap:
+            self.highlight_step(snap)
+            operation_logger.info("BFS simulation seeked to step %s.", self.run_mgr.current_step)
 
     def on_pause(self):
         """ Pause the BFS simulation. """ 
@@ -120,23 +192,28 @@ class RunToolsFrame(tk.Frame):
 
     def on_step(self):
         """ Perform a single step in the BFS simulation. """ 
-        if not self.run_mgr.running:
-            self.run_mgr.running = True
-            self.run_mgr.app_mode = AppMode.RUNNING
-            self.run_mgr.initialize_backend()
-            self.run_mgr.load_history()
-
-        if self.tools_panel_ref:
-            self.tools_panel_ref.enable_drawing_tools(False)
-
+        self.ensure_started()
         snap = self.run_mgr.step()
         if snap:
             self.highlight_step(snap)
         else:
-            msg = "Accepted!" if self.run_mgr.is_accepted() else "Rejected!"
-            messagebox.showinfo("Result", msg)
-            operation_logger.info(f"BFS simulation ended with result: {msg}")
-            self.finish_run()
+            self.end_run()
+
+    def on_toggle_heatmap(self):
+        """ Show or hide the search heatmap; counters are only collected while it is on. """ 
+        self.run_mgr.collect_stats = self.heatmap_var.get()
+        self.update_heatmap()
+
+    def update_heatmap(self):
+        """ Draw the counters of the current run on the canvas (re-running the search once if they were not collected). """ 
+        if not self.heatmap_var.get():
+            self.canvas.hide_heatmap()
+            return
+        stats = self.run_mgr.search_stats()
+        if stats is None and self.run_mgr.app_mode == AppMode.RUNNING:
+            stats = self.run_mgr.collect_search_stats()
+        if stats is not None:
+            self.canvas.show_heatmap(*stats)
 
     def on_stop(self):
         """ Stop the BFS simulation and reset. """ 
@@ -151,6 +228,7 @@ class RunToolsFrame(tk.Frame):
         """ Reload the simulation, clearing all states and transitions. """ 
         self.on_pause()
         self.run_mgr.clear_all()
+        self.canvas.hide_heatmap()
         self.canvas.delete("all")
         if self.current_setup_window:
             self.current_setup_window.display_step(None)
@@ -179,12 +257,13 @@ class RunToolsFrame(tk.Frame):
         self.highlight_state(state_name)
         if self.current_setup_window:
             self.current_setup_window.display_step(step)
-        operation_logger.info(f"Highlighted step: {state_name}")
+        self.step_label.config(text=f"{self.run_mgr.current_step} / {len(self.run_mgr.history)}")
+        operation_logger.debug("Highlighted step: %s", state_name)
 
     def highlight_state(self, state_name):
         """ Highlight a specific state on the canvas. """ 
         self.canvas.highlight_state(state_name)
-        operation_logger.info(f"State highlighted: {state_name}")
+        operation_logger.debug("State highlighted: %s", state_name)
 
     def on_save_run(self):
         """ Save the current run history to the database. """ 
@@ -195,55 +274,79 @@ class RunToolsFrame(tk.Frame):
         snap_name = simpledialog.askstring("Save Snapshot", "Enter a name for the current snapshot:")
         if snap_name is None or not snap_name.strip():
             return 
-        self.run_mgr.save_current_run(description=f"{snap_name}")
-        messagebox.showinfo("Saved", "Run history saved successfully!")
-        operation_logger.info(f"Run history saved with description: {snap_name}")
+        # Saving happens in the background; the outcome is reported when the write lands
+        self.run_mgr.save_current_run(
+            description=f"{snap_name}",
+            on_done=lambda: messagebox.showinfo("Saved", f"Run history '{snap_name}' saved successfully!"),
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to save run history: {e}"))
+        operation_logger.info("Run history save requested with description: %s", snap_name)
 
     def on_load_run(self):
-        """ Load a run history from the database. """ 
+        """ Load a run history from the database. The list is paged metadata; blobs are fetched on double-click. """ 
         if not self.run_mgr.current_user:
             messagebox.showerror("Error", "No user is currently logged in.")
             error_logger.error("Attempted to load run history without a logged-in user.")
             return
-        histories = self.run_mgr.db_manager.list_run_histories(self.run_mgr.current_user)
-        if not histories:
+        db = self.run_mgr.db_manager
+        user = self.run_mgr.current_user
+        total = db.count_run_histories(user)
+        if not total:
             messagebox.showinfo("No Snapshots", "There are no saved runs for this user.")
             operation_logger.info("No run histories found for user during load attempt.")
             return
 
         load_win = tk.Toplevel(self)
         load_win.title("Load Snapshot")
-        load_win.geometry("300x300")
+        load_win.geometry("360x340")
 
         ttk.Label(load_win, text="Select a snapshot to load:", justify='center').pack(pady=5)
         lb = tk.Listbox(load_win)
         lb.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        records_map = {}
-        for i, rec in enumerate(histories):
-            rid, desc, _, _ = rec
-            record_name = f"ID={rid}: {desc}"
-            lb.insert(tk.END, record_name)
-            records_map[i] = rec
-
-        def on_select_load():
+        page = {"offset": 0, "ids": []}
+        nav = tk.Frame(load_win)
+        nav.pack(pady=2)
+        prev_btn = ttk.Button(nav, text="<", width=3)
+        prev_btn.pack(side=tk.LEFT, padx=2)
+        page_label = ttk.Label(nav, text="")
+        page_label.pack(side=tk.LEFT, padx=5)
+        next_btn = ttk.Button(nav, text=">", width=3)
+        next_btn.pack(side=tk.LEFT, padx=2)
+
+        def show_page(offset):
+            """ Fetch and list one page of run metadata. """ 
+            rows = db.list_run_history_meta(user, offset, RUN_HISTORY_PAGE_SIZE)
+            page["offset"] = offset
+            page["ids"] = [rid for rid, _, _, _ in rows]
+            lb.delete(0, tk.END)
+            for rid, desc, created_at, size in rows:
+                when = created_at.strftime("%Y-%m-%d %H:%M") if created_at else "-"
+                lb.insert(tk.END, f"ID={rid}: {desc}  ({when}, {size / 1024:.1f} KB)")
+            page_label.config(text=f"{offset + 1}-{offset + len(rows)} of {total}")
+            prev_btn.config(state=tk.NORMAL if offset > 0 else tk.DISABLED)
+            next_btn.config(state=tk.NORMAL if offset + RUN_HISTORY_PAGE_SIZE < total else tk.DISABLED)
+
+        prev_btn.config(command=lambda: show_page(max(0, page["offset"] - RUN_HISTORY_PAGE_SIZE)))
+        next_btn.config(command=lambda: show_page(page["offset"] + RUN_HISTORY_PAGE_SIZE))
+        show_page(0)
+
+        def on_select_load(event=None):
             """ Handle the selection and loading of a run history. """ 
             sel = lb.curselection()
             if not sel:
                 return
-            idx = sel[0]
-            _, desc, automaton_json, hist_json = records_map[idx]
-            import json
             try:
-                automaton_data = json.loads(automaton_json)
-                history_data = json.loads(hist_json)
-            except json.JSONDecodeError as e:
+                record = db.get_run_history(page["ids"][sel[0]], user)
+            except ValueError as e:
                 messagebox.showerror("Error", f"Failed to parse run history data: {e}")
-                error_logger.error(f"JSON decode error during run history load: {e}")
+                error_logger.error("Decode error during run history load: %s", e)
+                return
+            if record is None:
+                messagebox.showerror("Error", "The selected run no longer exists.")
                 return
+            _, desc, automaton_data, history_data = record
 
             self.run_mgr.load_run(automaton_data, history_data)
-            self.canvas.delete("all")
             self.run_mgr.automata_manager.draw_all(self.canvas)
 
             # Refresh the Words Window
@@ -256,7 +359,7 @@ class RunToolsFrame(tk.Frame):
 
             load_win.destroy()
             messagebox.showinfo("Loaded", f"Snapshot '{desc}' loaded successfully.")
-            operation_logger.info(f"Run history loaded: {desc}")
+            operation_logger.info("Run history loaded: %s", desc)
 
         lb.bind("<Double-Button-1>", on_select_load)
         ttk.Label(load_win, text="(Double-click to load)", foreground="gray").pack(pady=5)
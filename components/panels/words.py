@@ -1,11 +1,17 @@
 import tkinter as tk
-from tkinter import ttk, simpledialog, messagebox
-from utils.logger import operation_logger, error_logger
+from tkinter import ttk, simpledialog, messagebox, filedialog
+from components.virtual_list import VirtualList
+from utils.logger import get_logger, error_logger
 from utils.constants import AppMode
+from utils.word_io import iter_words
+
+operation_logger = get_logger("run")
+
 class WordsFrame(tk.Frame):
     """
         Displays the list of tapes. Supports adding, editing, and deleting words on double click.
         Prevents deletion while the simulation is running, but can change the word during the run, changed word will run from start
+        Words can be imported in bulk from a text or JSONL file; the list only renders visible rows.
     """
     def __init__(self, parent, run_mgr, tool_window, automata_manager, run_tools):
         super().__init__(parent, bg="#fffde7")
@@ -16,11 +22,13 @@ class WordsFrame(tk.Frame):
         
         ttk.Label(self, text="Words Window", justify='center').pack(pady=5)
 
-        self.listbox = tk.Listbox(self, selectmode=tk.SINGLE)
-        self.listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        self.listbox.bind("<Double-Button-1>", self.on_click_word)
+        self.word_list = VirtualList(self, self.run_mgr.words, on_activate=self.on_click_word)
+        self.word_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        ttk.Button(self, text="Add Word", command=self.on_add_word).pack(pady=5)
+        btn_frame = tk.Frame(self, bg="#fffde7")
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Add Word", command=self.on_add_word).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Import Words", command=self.on_import_words).pack(side=tk.LEFT, padx=5)
         operation_logger.info("WordsFrame initialized.")
 
     def on_add_word(self):
@@ -29,28 +37,45 @@ class WordsFrame(tk.Frame):
         if w:
             try:
                 self.run_mgr.add_word(w.strip())
-                self.refresh()
-                # Update word_count if necessary
-                if len(self.run_mgr.words) > self.automata_manager.word_count:
-                    self.tool_window.word_count_var.set(len(self.run_mgr.words))
-                    self.tool_window.set_word_count()
-
-                # Highlight the current state if simulation is running
-                if self.run_mgr.app_mode == AppMode.RUNNING:
-                    current_step = self.run_mgr.history[self.run_mgr.current_step] if self.run_mgr.current_step < len(self.run_mgr.history) else None
-                    if current_step:
-                        self.run_tools.highlight_state(current_step[0])
-                operation_logger.info(f"Word added: {w.strip()}")
+                self.after_words_added()
+                operation_logger.info("Word added: %s", w.strip())
             except Exception as ex:
                 messagebox.showerror("Error", f"Failed to add word: {ex}")
-                error_logger.error(f"Exception occurred while adding word: {ex}")
+                error_logger.error("Exception occurred while adding word: %s", ex)
 
-    def on_click_word(self):
-        """ Handle double-click to edit a selected word. """
-        idx = self.listbox.curselection()
-        if not idx:
+    def on_import_words(self):
+        """ Stream words from a text (one per line) or JSONL file into the run manager in one batch. """
+        path = filedialog.askopenfilename(
+            title="Import Words",
+            filetypes=[("Word files", "*.txt *.jsonl *.ndjson"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            count = self.run_mgr.add_words(iter_words(path))
+        except (OSError, ValueError) as ex:
+            messagebox.showerror("Error", f"Failed to import words: {ex}")
+            error_logger.error("Exception occurred while importing words from %s: %s", path, ex)
             return
-        index = idx[0]
+        self.after_words_added()
+        operation_logger.info("Imported %s words from %s", count, path)
+
+    def after_words_added(self):
+        """ Show the new words and grow word_count / re-highlight the running state if needed. """
+        self.refresh()
+        self.word_list.see(len(self.run_mgr.words) - 1)
+        # Update word_count if necessary
+        if len(self.run_mgr.words) > self.automata_manager.word_count:
+            self.tool_window.word_count_var.set(len(self.run_mgr.words))
+            self.tool_window.set_word_count()
+
+        # Highlight the current state if simulation is running
+        if self.run_mgr.app_mode == AppMode.RUNNING:
+            current_step = self.run_mgr.history[self.run_mgr.current_step] if self.run_mgr.current_step < len(self.run_mgr.history) else None
+            if current_step:
+                self.run_tools.highlight_state(current_step[0])
+
+    def on_click_word(self, index):
+        """ Handle double-click to edit the word at index. """
         old_word = self.run_mgr.words[index]
         self.open_edit_window(index, old_word)
 
@@ -70,11 +95,11 @@ class WordsFrame(tk.Frame):
             if new_w:
                 try:
                     self.run_mgr.change_word(idx, new_w)
-                    self.refresh()
-                    operation_logger.info(f"Word changed at index {idx} to: {new_w}")
+                    self.word_list.update_row(idx)
+                    operation_logger.info("Word changed at index %s to: %s", idx, new_w)
                 except Exception as ex:
                     messagebox.showerror("Error", f"Failed to change word: {ex}")
-                    error_logger.error(f"Exception occurred while changing word: {ex}")
+                    error_logger.error("Exception occurred while changing word: %s", ex)
             win.destroy()
 
         def on_delete():
@@ -86,10 +111,10 @@ class WordsFrame(tk.Frame):
             try:
                 self.run_mgr.remove_word(idx)
                 self.refresh()
-                operation_logger.info(f"Word deleted at index {idx}")
+                operation_logger.info("Word deleted at index %s", idx)
             except Exception as ex:
                 messagebox.showerror("Error", f"Failed to delete word: {ex}")
-                error_logger.error(f"Exception occurred while deleting word: {ex}")
+                error_logger.error("Exception occurred while deleting word: %s", ex)
             win.destroy()
 
         # Buttons for changing and deleting the word
@@ -99,10 +124,12 @@ class WordsFrame(tk.Frame):
         ttk.Button(frm, text="Delete", style="Danger.TButton", command=on_delete).pack(side=tk.LEFT, padx=5)
 
     def refresh(self):
-        """ Refresh the list of words displayed. """ 
-        self.listbox.delete(0, tk.END)
-        for w in self.run_mgr.words:
-            self.listbox.insert(tk.END, w)
+        """ Refresh the list of words displayed (only the visible rows are rendered). """ 
+        if self.word_list.items is not self.run_mgr.words:
+            # load_run() / clear rebind RunManager.words
+            self.word_list.set_items(self.run_mgr.words)
+        else:
+            self.word_list.refresh()
         operation_logger.info("WordsFrame refreshed.")
 
     def tkraise(self, aboveThis=None):
@@ -1,15 +1,25 @@
+import logging
 import tkinter as tk
 from utils.constants import STATE_RADIUS, COLOR_BLACK
-from utils.logger import operation_logger
+from utils.logger import get_logger
+
+operation_logger = get_logger("canvas")
 
 class State:
-    """ Represents a single GUI state with x, y coordinates, radius, start/accept flags, ids, transitions"""
+    """
+        Represents a single GUI state with x, y coordinates, radius, start/accept flags, ids, transitions.
+        Changing name/is_start/is_accept (or set_position) marks the state dirty so the next
+        AutomataManager.render pass re-emits it.
+    """
     def __init__(self, name, x, y, is_start=False, is_accept=False):
-        self.name = name
+        self.dirty = False
+        self.moved = False      # dirty because of a position change (needs new coordinates)
+        self.dirty_sink = None  # set by AutomataManager; collects dirty states/transitions
+        self._name = name
         self.x = x
         self.y = y
-        self.is_start = is_start
-        self.is_accept = is_accept
+        self._is_start = is_start
+        self._is_accept = is_accept
         self.radius = STATE_RADIUS
 
         # Id's to easy identify states
@@ -20,53 +30,166 @@ class State:
         self.outgoing_transitions = []
         self.incoming_transitions = []
 
-    def draw(self, canvas):
-        """ Draw the state on the given canvas, including start arrow and accept ring if applicable. """
+    def mark_dirty(self, moved=False):
+        """ Flag the state for the next render pass. """
+        self.dirty = True
+        self.moved = self.moved or moved
+        if self.dirty_sink is not None:
+            self.dirty_sink.add(self)
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if value != self._name:
+            self._name = value
+            self.mark_dirty()
+
+    @property
+    def is_start(self):
+        return self._is_start
+
+    @is_start.setter
+    def is_start(self, value):
+        if value != self._is_start:
+            self._is_start = value
+            self.mark_dirty()
+
+    @property
+    def is_accept(self):
+        return self._is_accept
+
+    @is_accept.setter
+    def is_accept(self, value):
+        if value != self._is_accept:
+            self._is_accept = value
+            self.mark_dirty()
+
+    def set_position(self, x, y):
+        """ Move the state in the model only; it and its transitions are re-emitted by the next render. """
+        self.x, self.y = x, y
+        self.mark_dirty(moved=True)
+        for tr in self.outgoing_transitions + self.incoming_transitions:
+            tr.mark_dirty(moved=True)
+
+    def draw(self, canvas, detail=True):
+        """
+            Draw the state on the given canvas, including start arrow and accept ring if applicable.
+            Coordinates are mapped through canvas.view; with detail=False (zoomed-out level of
+            detail) the name label is skipped.
+        """
         if not canvas:
             return
+        view = canvas.view
         if self.canvas_id:
             canvas.delete(self.canvas_id)
-        r = self.radius
         self.canvas_id = canvas.create_oval(
-            self.x - r, self.y - r, self.x + r, self.y + r,
+            *view.points(self.oval_coords()),
             fill="white", outline=COLOR_BLACK, width=2,
             tags=(f"state_{self.name}",)
         )
+        canvas.register_state(self.name, self.canvas_id)
         if self.label_id:
             canvas.delete(self.label_id)
-        self.label_id = canvas.create_text(self.x, self.y, text=self.name)
+            self.label_id = None
+        if detail:
+            self.label_id = canvas.create_text(*view.to_screen(self.x, self.y), text=self.name)
 
         # Remove old extras
         for exid in self.extra_ids:
             canvas.delete(exid)
         self.extra_ids.clear()
 
+        extras = self.extra_coords()
         # Draw accept ring
         if self.is_accept:
             accept_id = canvas.create_oval(
-                self.x - r - 4, self.y - r - 4,
-                self.x + r + 4, self.y + r + 4,
+                *view.points(extras.pop(0)),
                 outline=COLOR_BLACK, width=2
             )
             self.extra_ids.append(accept_id)
-            operation_logger.debug(f"Accept ring drawn for state: {self.name}")
+            if operation_logger.isEnabledFor(logging.DEBUG):
+                operation_logger.debug("Accept ring drawn for state: %s", self.name)
 
         # Draw start arrow
         if self.is_start:
             arrow_id = canvas.create_line(
-                self.x - r - 20, self.y,
-                self.x - r, self.y,
+                *view.points(extras.pop(0)),
                 arrow=tk.LAST
             )
             self.extra_ids.append(arrow_id)
-            operation_logger.debug(f"Start arrow drawn for state: {self.name}")
+            if operation_logger.isEnabledFor(logging.DEBUG):
+                operation_logger.debug("Start arrow drawn for state: %s", self.name)
+
+    def oval_coords(self):
+        """ Model-space bounding box of the state circle. """
+        r = self.radius
+        return (self.x - r, self.y - r, self.x + r, self.y + r)
+
+    def extra_coords(self):
+        """ Model-space coordinates of the accept ring and start arrow, in extra_ids order. """
+        r = self.radius
+        extras = []
+        if self.is_accept:
+            extras.append((self.x - r - 4, self.y - r - 4, self.x + r + 4, self.y + r + 4))
+        if self.is_start:
+            extras.append((self.x - r - 20, self.y, self.x - r, self.y))
+        return extras
+
+    def refresh(self, canvas):
+        """
+            Bring the drawn items of a dirty state up to date: in place when the item
+            structure is unchanged, otherwise by redrawing it. Undrawn (culled) states are
+            only marked clean; they are drawn with current data once visible.
+        """
+        moved, self.dirty, self.moved = self.moved, False, False
+        if not self.canvas_id:
+            return
+        if len(self.extra_ids) != len(self.extra_coords()):
+            self.draw(canvas, detail=self.label_id is not None)
+            return
+        if moved:
+            self.update_coords(canvas)
+        if self.label_id:
+            canvas.itemconfig(self.label_id, text=self.name)
+
+    def update_coords(self, canvas):
+        """ Re-map the existing items through canvas.view (after zoom). Returns the number of Tk calls made. """
+        if not self.canvas_id:
+            return 0
+        view = canvas.view
+        canvas.coords(self.canvas_id, *view.points(self.oval_coords()))
+        calls = 1
+        if self.label_id:
+            canvas.coords(self.label_id, *view.to_screen(self.x, self.y))
+            calls += 1
+        for exid, coords in zip(self.extra_ids, self.extra_coords()):
+            canvas.coords(exid, *view.points(coords))
+            calls += 1
+        return calls
+
+    def clear(self, canvas):
+        """ Remove all canvas items associated with this state. """
+        if self.canvas_id:
+            canvas.delete(self.canvas_id)
+            canvas.unregister_state(self.name, self.canvas_id)
+        if self.label_id:
+            canvas.delete(self.label_id)
+        for exid in self.extra_ids:
+            canvas.delete(exid)
+        self.canvas_id = None
+        self.label_id = None
+        self.extra_ids.clear()
 
     def move(self, canvas, nx, ny):
-        """ Move the state to new coordinates and update all associated transitions. """
-        dx, dy = nx - self.x, ny - self.y
+        """ Move the state's canvas items to new model coordinates. Returns the number of Tk calls made. """
+        dx, dy = canvas.view.length(nx - self.x), canvas.view.length(ny - self.y)
         self.x, self.y = nx, ny
-        canvas.move(self.canvas_id, dx, dy)
-        canvas.move(self.label_id, dx, dy)
-        for exid in self.extra_ids:
-            canvas.move(exid, dx, dy)
-        operation_logger.info(f"State moved: {self.name} to ({nx}, {ny})")
+        items = [i for i in [self.canvas_id, self.label_id] + self.extra_ids if i]
+        for item in items:
+            canvas.move(item, dx, dy)
+        if operation_logger.isEnabledFor(logging.DEBUG):
+            operation_logger.debug("State moved: %s to (%s, %s)", self.name, nx, ny)
+        return len(items)
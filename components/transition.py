@@ -1,24 +1,58 @@
+import logging
 import tkinter as tk
 import math
 from utils.constants import COLOR_BLACK, PARALLEL_OFFSET
-from utils.logger import operation_logger, error_logger
+from utils.logger import get_logger, error_logger
+
+operation_logger = get_logger("canvas")
 
 class Transition:
     """
         Represents a GUI transition from a source state to a target state,
         with one or more condition vectors.
         Handles drawing of arrows and labels.
+        Assigning transition_vectors invalidates the cached label text and marks the
+        transition dirty for the next AutomataManager.render pass.
     """
     def __init__(self, source, target, transition_vectors):
+        self.dirty = False
+        self.moved = False      # dirty because of a position change (needs new coordinates)
+        self.dirty_sink = None  # set by AutomataManager; collects dirty states/transitions
         self.source = source
         self.target = target
-        self.transition_vectors = transition_vectors
+        self._label = None
+        self._vectors = transition_vectors
         self.canvas_ids = []
         self.offset_index = 0  # Used to compute ± offset for parallel transitions
 
         source.outgoing_transitions.append(self)
         target.incoming_transitions.append(self)
-        operation_logger.info(f"Transition created: {source.name} -> {target.name}")
+
+    def mark_dirty(self, moved=False):
+        """ Flag the transition for the next render pass. """
+        self.dirty = True
+        self.moved = self.moved or moved
+        if self.dirty_sink is not None:
+            self.dirty_sink.add(self)
+
+    @property
+    def transition_vectors(self):
+        return self._vectors
+
+    @transition_vectors.setter
+    def transition_vectors(self, vectors):
+        self._vectors = vectors
+        self._label = None
+        self.mark_dirty()
+
+    def refresh(self, canvas):
+        """ Update the drawn items of a dirty transition in place (label text, coordinates if moved). """
+        moved, self.dirty, self.moved = self.moved, False, False
+        if len(self.canvas_ids) != 2:
+            return
+        if moved:
+            self.update_coords(canvas)
+        canvas.itemconfig(self.canvas_ids[1], text=self.label_text())
 
     def draw(self, canvas):
         """ Draw the transition on the canvas. """
@@ -29,39 +63,49 @@ class Transition:
             self.draw_loop(canvas)
         else:
             self.draw_arrow(canvas)
+        canvas.register_transition(self)
 
     def redraw(self, canvas):
         """ Redraw the transition (useful after moving states) """
-        self.draw(canvas)
+        self.update_coords(canvas)
 
-    def draw_loop(self, canvas):
-        """ Draw a loop transition for transitions from a state to itself. """
+    def update_coords(self, canvas):
+        """
+            Move the existing line and label items to the current state positions
+            with canvas.coords instead of recreating them. Returns the number of Tk calls made.
+        """
+        if not self.canvas_ids:     # culled by the viewport or bundled at low detail
+            return 0
+        if len(self.canvas_ids) != 2:
+            self.draw(canvas)
+            return len(self.canvas_ids) + 1
+        line_coords, label_pos = self.geometry()
+        canvas.coords(self.canvas_ids[0], *canvas.view.points(line_coords))
+        canvas.coords(self.canvas_ids[1], *canvas.view.to_screen(*label_pos))
+        return 2
+
+    def geometry(self):
+        """ Model-space line/arc coordinates and label position for the current state positions. """
+        if self.source == self.target:
+            return self.loop_geometry()
+        return self.arrow_geometry()
+
+    def loop_geometry(self):
+        """ Arc bounding box and label position of a loop transition. """
         r = self.source.radius
         cx = self.source.x
         cy = self.source.y - (r + 30)
-        try:
-            arc_id = canvas.create_arc(
-                cx - r, cy - r, cx + r, cy + r,
-                start=290, extent=320, style="arc",
-                outline=COLOR_BLACK, width=2
-            )
-            self.canvas_ids.append(arc_id)
-
-            lbl = canvas.create_text(cx, cy - (r + 10), text=self.label_text())
-            self.canvas_ids.append(lbl)
-            operation_logger.debug(f"Loop transition drawn for state: {self.source.name}")
-        except Exception as e:
-            error_logger.error(f"Failed to draw loop transition: {e}")
+        return (cx - r, cy - r, cx + r, cy + r), (cx, cy - (r + 10))
 
-    def draw_arrow(self, canvas):
+    def arrow_geometry(self):
         """
-            Draw an arrow from the source state to the target state,
-            handling parallel transitions by offsetting them.
+            Line end points and label position of an arrow from the source state to the
+            target state, offsetting parallel transitions.
         """
         sx, sy = self.source.x, self.source.y
         tx, ty = self.target.x, self.target.y
         dx, dy = tx - sx, ty - sy
-        dist = math.hypot(dx, dy)
+        dist = math.hypot(dx, dy) or 1.0
 
         # Unit vector components
         ux, uy = dx / dist, dy / dist
@@ -78,28 +122,57 @@ class Transition:
         tx_e = tx - ux * self.target.radius + perp_x * offset
         ty_e = ty - uy * self.target.radius + perp_y * offset
 
+        # Label near the midpoint
+        mx, my = (sx_e + tx_e) / 2, (sy_e + ty_e) / 2
+        return (sx_e, sy_e, tx_e, ty_e), (mx, my - 10)
+
+    def draw_loop(self, canvas):
+        """ Draw a loop transition for transitions from a state to itself. """
+        arc_coords, label_pos = self.loop_geometry()
+        try:
+            arc_id = canvas.create_arc(
+                *canvas.view.points(arc_coords),
+                start=290, extent=320, style="arc",
+                outline=COLOR_BLACK, width=2
+            )
+            self.canvas_ids.append(arc_id)
+
+            lbl = canvas.create_text(*canvas.view.to_screen(*label_pos), text=self.label_text())
+            self.canvas_ids.append(lbl)
+            if operation_logger.isEnabledFor(logging.DEBUG):
+                operation_logger.debug("Loop transition drawn for state: %s", self.source.name)
+        except Exception as e:
+            error_logger.error("Failed to draw loop transition: %s", e)
+
+    def draw_arrow(self, canvas):
+        """
+            Draw an arrow from the source state to the target state,
+            handling parallel transitions by offsetting them.
+        """
+        line_coords, label_pos = self.arrow_geometry()
         try:
             line_id = canvas.create_line(
-                sx_e, sy_e, tx_e, ty_e,
+                *canvas.view.points(line_coords),
                 arrow=tk.LAST, fill=COLOR_BLACK, width=2
             )
             self.canvas_ids.append(line_id)
 
-            # Label near the midpoint
-            mx, my = (sx_e + tx_e) / 2, (sy_e + ty_e) / 2
-            lbl_id = canvas.create_text(mx, my - 10, text=self.label_text())
+            lbl_id = canvas.create_text(*canvas.view.to_screen(*label_pos), text=self.label_text())
             self.canvas_ids.append(lbl_id)
-            operation_logger.debug(f"Transition arrow drawn: {self.source.name} -> {self.target.name}")
+            if operation_logger.isEnabledFor(logging.DEBUG):
+                operation_logger.debug("Transition arrow drawn: %s -> %s", self.source.name, self.target.name)
         except Exception as e:
-            error_logger.error(f"Failed to draw transition arrow: {e}")
+            error_logger.error("Failed to draw transition arrow: %s", e)
 
     def label_text(self):
-        """ Generate the label text based on transition vectors. """
-        parts = []
-        for vec in self.transition_vectors:
-            vs = ",".join(vec)
-            parts.append("{" + vs + "}")
-        return ", ".join(parts)
+        """ Label text based on transition vectors, cached until transition_vectors is reassigned. """
+        if self._label is None:
+            parts = []
+            for vec in self._vectors:
+                vs = ",".join(vec)
+                parts.append("{" + vs + "}")
+            self._label = ", ".join(parts)
+        return self._label
 
     def clear(self, canvas):
         """ Remove all canvas items associated with this transition. """
@@ -107,6 +180,7 @@ class Transition:
             for cid in self.canvas_ids:
                 canvas.delete(cid)
             self.canvas_ids.clear()
-            operation_logger.debug(f"Transition cleared: {self.source.name} -> {self.target.name}")
+            if operation_logger.isEnabledFor(logging.DEBUG):
+                operation_logger.debug("Transition cleared: %s -> %s", self.source.name, self.target.name)
         except Exception as e:
-            error_logger.error(f"Failed to clear transition: {e}")
+            error_logger.error("Failed to clear transition: %s", e)
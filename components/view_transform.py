@@ -0,0 +1,45 @@
+class ViewTransform:
+    """
+        Maps model coordinates (State.x / State.y) to screen coordinates on the DrawingBoard:
+            screen = model * scale + offset
+        All drawing and hit-testing code converts through this object, so the model never
+        changes when the user zooms or pans.
+    """
+    def __init__(self, scale=1.0, offset_x=0.0, offset_y=0.0):
+        self.scale = scale
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+
+    def to_screen(self, x, y):
+        """ Convert a model point to screen coordinates. """
+        return x * self.scale + self.offset_x, y * self.scale + self.offset_y
+
+    def to_model(self, sx, sy):
+        """ Convert a screen point (e.g. event.x, event.y) to model coordinates. """
+        return (sx - self.offset_x) / self.scale, (sy - self.offset_y) / self.scale
+
+    def length(self, d):
+        """ Convert a model distance to a screen distance. """
+        return d * self.scale
+
+    def points(self, coords):
+        """ Convert a flat sequence of model x, y pairs to screen coordinates. """
+        s, ox, oy = self.scale, self.offset_x, self.offset_y
+        return [c * s + (ox if i % 2 == 0 else oy) for i, c in enumerate(coords)]
+
+    def zoom(self, factor, cx=0.0, cy=0.0):
+        """ Scale the view by factor while keeping the screen point (cx, cy) fixed. """
+        self.offset_x = cx - (cx - self.offset_x) * factor
+        self.offset_y = cy - (cy - self.offset_y) * factor
+        self.scale *= factor
+
+    def pan(self, dx, dy):
+        """ Shift the view by a screen-space delta. """
+        self.offset_x += dx
+        self.offset_y += dy
+
+    def visible_rect(self, width, height):
+        """ Model-space rectangle shown by a screen area of the given size. """
+        x0, y0 = self.to_model(0, 0)
+        x1, y1 = self.to_model(width, height)
+        return x0, y0, x1, y1
@@ -0,0 +1,292 @@
+import logging
+import math
+from components.state import State
+from utils.constants import (COLOR_BLACK, STATE_RADIUS, VIEWPORT_CELL_SIZE, VIEWPORT_MARGIN,
+                             VIEWPORT_MAX_EDGE_CELLS, LOD_ZOOM_THRESHOLD)
+from utils.logger import get_logger
+
+operation_logger = get_logger("canvas")
+
+class Viewport:
+    """
+        View layer of the DrawingBoard. Keeps a uniform grid index over states and
+        transitions and only draws the items intersecting the visible region of canvas.view.
+        Below LOD_ZOOM_THRESHOLD the cheap level of detail is used: no labels and one
+        bundled line per pair of connected states instead of every parallel transition.
+    """
+    def __init__(self, canvas, automata_mgr):
+        self.canvas = canvas
+        self.automata_mgr = automata_mgr
+        self.low_detail = False
+
+        self.drawn_states = set()
+        self.drawn_transitions = set()
+        self.bundles = {}           # frozenset of states -> bundled line/arc canvas id
+
+        self.state_grid = None      # (col, row) -> [State]
+        self.edge_grid = {}         # (col, row) -> [Transition]
+        self.long_edges = []        # transitions spanning too many cells to index
+        self.state_cells = {}       # State -> its (col, row), for incremental updates
+        self.edge_cells = {}        # Transition -> its cells, None for long edges
+        self.index_signature = None
+        self.refresh_id = None
+
+    # Spatial index
+    def invalidate(self):
+        """ Mark the whole spatial index stale (many states moved at once) and schedule a refresh. """
+        self.state_grid = None
+        self.schedule_refresh()
+
+    def update_index(self, *items):
+        """
+            Bring the index up to date for added, moved or removed states and transitions and
+            schedule a refresh. A state also re-indexes the transitions touching it; items no
+            longer in the automaton are dropped. Costs O(items) instead of a full rebuild.
+        """
+        if self.state_grid is not None:
+            states = self.automata_mgr.states
+            transitions = self.automata_mgr.transitions
+            for item in items:
+                if isinstance(item, State):
+                    self.unindex_state(item)
+                    if item in states:
+                        self.index_state(item)
+                    for tr in item.outgoing_transitions + item.incoming_transitions:
+                        self.unindex_transition(tr)
+                        if tr in transitions:
+                            self.index_transition(tr)
+                else:
+                    self.unindex_transition(item)
+                    if item in transitions:
+                        self.index_transition(item)
+            self.index_signature = (len(states), len(transitions))
+        self.schedule_refresh()
+
+    def ensure_index(self):
+        """ Rebuild the grid index if it was invalidated or the automaton changed behind its back. """
+        states = self.automata_mgr.states
+        transitions = self.automata_mgr.transitions
+        signature = (len(states), len(transitions))
+        if self.state_grid is not None and signature == self.index_signature:
+            return
+        self.state_grid = {}
+        self.edge_grid = {}
+        self.long_edges = []
+        self.state_cells = {}
+        self.edge_cells = {}
+        for st in states:
+            self.index_state(st)
+        for tr in transitions:
+            self.index_transition(tr)
+        self.index_signature = signature
+
+    def index_state(self, st):
+        """ Add a state to the cell holding its center. """
+        cell = VIEWPORT_CELL_SIZE
+        key = (math.floor(st.x / cell), math.floor(st.y / cell))
+        self.state_grid.setdefault(key, []).append(st)
+        self.state_cells[st] = key
+
+    def unindex_state(self, st):
+        """ Remove a state from its cell, if it is indexed. """
+        key = self.state_cells.pop(st, None)
+        if key is not None:
+            bucket = self.state_grid[key]
+            bucket.remove(st)
+            if not bucket:
+                del self.state_grid[key]
+
+    def index_transition(self, tr):
+        """ Add a transition to every cell its bounding box covers, or to long_edges. """
+        cell = VIEWPORT_CELL_SIZE
+        x0, y0, x1, y1 = self.transition_bbox(tr)
+        c0, c1 = math.floor(x0 / cell), math.floor(x1 / cell)
+        r0, r1 = math.floor(y0 / cell), math.floor(y1 / cell)
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > VIEWPORT_MAX_EDGE_CELLS:
+            self.long_edges.append(tr)
+            self.edge_cells[tr] = None
+            return
+        keys = [(c, r) for c in range(c0, c1 + 1) for r in range(r0, r1 + 1)]
+        for key in keys:
+            self.edge_grid.setdefault(key, []).append(tr)
+        self.edge_cells[tr] = keys
+
+    def unindex_transition(self, tr):
+        """ Remove a transition from its cells (or long_edges), if it is indexed. """
+        if tr not in self.edge_cells:
+            return
+        keys = self.edge_cells.pop(tr)
+        if keys is None:
+            self.long_edges.remove(tr)
+            return
+        for key in keys:
+            bucket = self.edge_grid[key]
+            bucket.remove(tr)
+            if not bucket:
+                del self.edge_grid[key]
+
+    @staticmethod
+    def transition_bbox(tr):
+        """ Model-space bounding box of a transition, including its label and loop arc. """
+        pad = STATE_RADIUS * 3
+        return (min(tr.source.x, tr.target.x) - pad, min(tr.source.y, tr.target.y) - pad,
+                max(tr.source.x, tr.target.x) + pad, max(tr.source.y, tr.target.y) + pad)
+
+    def visible_rect(self):
+        """ Visible region in model coordinates, padded by VIEWPORT_MARGIN. """
+        w = self.canvas.winfo_width()
+        h = self.canvas.winfo_height()
+        if w <= 1 or h <= 1:    # not mapped yet, fall back to the requested size
+            w = int(self.canvas.cget("width"))
+            h = int(self.canvas.cget("height"))
+        x0, y0, x1, y1 = self.canvas.view.visible_rect(w, h)
+        m = VIEWPORT_MARGIN
+        return x0 - m, y0 - m, x1 + m, y1 + m
+
+    def cells(self, rect):
+        """ Grid cells overlapping a model-space rectangle. """
+        cell = VIEWPORT_CELL_SIZE
+        x0, y0, x1, y1 = rect
+        for c in range(math.floor(x0 / cell), math.floor(x1 / cell) + 1):
+            for r in range(math.floor(y0 / cell), math.floor(y1 / cell) + 1):
+                yield (c, r)
+
+    def visible_objects(self, rect):
+        """ States and transitions intersecting the given model-space rectangle. """
+        x0, y0, x1, y1 = rect
+        states = set()
+        transitions = set(tr for tr in self.long_edges if self.bbox_intersects(tr, rect))
+        for key in self.cells(rect):
+            for st in self.state_grid.get(key, ()):
+                r = st.radius
+                if x0 - r <= st.x <= x1 + r and y0 - r <= st.y <= y1 + r:
+                    states.add(st)
+            for tr in self.edge_grid.get(key, ()):
+                if tr not in transitions and self.bbox_intersects(tr, rect):
+                    transitions.add(tr)
+        return states, transitions
+
+    def bbox_intersects(self, tr, rect):
+        """ Whether a transition's bounding box overlaps the rectangle. """
+        bx0, by0, bx1, by1 = self.transition_bbox(tr)
+        x0, y0, x1, y1 = rect
+        return bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0
+
+    # Rendering
+    def schedule_refresh(self):
+        """ Coalesce refresh requests into one pass when Tk is idle. """
+        if self.refresh_id is None:
+            self.refresh_id = self.canvas.after_idle(self.refresh)
+
+    def forget(self):
+        """ Drop bookkeeping after the canvas was cleared wholesale. """
+        self.drawn_states.clear()
+        self.drawn_transitions.clear()
+        self.bundles.clear()
+        self.state_grid = None
+
+    def redraw(self):
+        """ Clear the canvas and draw the visible part of the automaton from scratch. """
+        self.canvas.delete("all")
+        for st in self.automata_mgr.states:
+            st.canvas_id = None
+            st.label_id = None
+            st.extra_ids = []
+        for tr in self.automata_mgr.transitions:
+            tr.canvas_ids = []
+        self.refresh()
+
+    def refresh(self, reposition=False):
+        """
+            Incrementally bring the canvas in line with the visible region: items that
+            panned or zoomed out of view are deleted, newly visible ones are created.
+            With reposition=True (after a zoom) the items that stay visible are re-mapped
+            through canvas.view in place, so the cost is O(visible) either way.
+        """
+        if self.refresh_id is not None:
+            self.canvas.after_cancel(self.refresh_id)
+            self.refresh_id = None
+        low_detail = self.canvas.view.scale < LOD_ZOOM_THRESHOLD
+        if low_detail != self.low_detail:
+            self.clear_drawn()
+            self.low_detail = low_detail
+
+        self.ensure_index()
+        states, transitions = self.visible_objects(self.visible_rect())
+
+        for st in self.drawn_states - states:
+            st.clear(self.canvas)
+        for st in states:
+            if st.canvas_id is None:
+                st.draw(self.canvas, detail=not low_detail)
+            elif reposition:
+                st.update_coords(self.canvas)
+        self.drawn_states = states
+
+        if low_detail:
+            self.refresh_bundles(transitions, reposition)
+        else:
+            for tr in self.drawn_transitions - transitions:
+                tr.clear(self.canvas)
+            for tr in transitions:
+                if not tr.canvas_ids:
+                    tr.draw(self.canvas)
+                elif reposition:
+                    tr.update_coords(self.canvas)
+            self.drawn_transitions = transitions
+        if operation_logger.isEnabledFor(logging.DEBUG):
+            operation_logger.debug("Viewport refreshed: %s states, %s transitions visible", len(states), len(transitions))
+
+    def clear_drawn(self):
+        """ Delete every item drawn by the viewport (used when switching level of detail). """
+        for st in self.drawn_states:
+            st.clear(self.canvas)
+        for tr in self.drawn_transitions:
+            tr.clear(self.canvas)
+        for item in self.bundles.values():
+            self.canvas.delete(item)
+        self.drawn_states = set()
+        self.drawn_transitions = set()
+        self.bundles = {}
+
+    # Low level of detail
+    def refresh_bundles(self, transitions, reposition=False):
+        """ Draw one unlabeled line (or loop arc) per visible pair of connected states. """
+        pairs = {}
+        for tr in transitions:
+            pairs.setdefault(frozenset((tr.source, tr.target)), tr)
+        for key in list(self.bundles):
+            if key not in pairs:
+                self.canvas.delete(self.bundles.pop(key))
+        for key, tr in pairs.items():
+            if key not in self.bundles:
+                self.bundles[key] = self.draw_bundle(tr)
+            elif reposition:
+                self.canvas.coords(self.bundles[key], *self.canvas.view.points(self.bundle_coords(tr)))
+
+    def bundle_coords(self, tr):
+        """ Model coordinates of the bundled item standing in for a transition's state pair. """
+        if tr.source == tr.target:
+            return tr.loop_geometry()[0]
+        return (tr.source.x, tr.source.y, tr.target.x, tr.target.y)
+
+    def draw_bundle(self, tr):
+        """ Create the bundled item for a transition's state pair below the state ovals. """
+        coords = self.canvas.view.points(self.bundle_coords(tr))
+        if tr.source == tr.target:
+            item = self.canvas.create_arc(*coords, start=290, extent=320, style="arc",
+                                          outline=COLOR_BLACK, width=1, tags=("bundle",))
+        else:
+            item = self.canvas.create_line(*coords, fill=COLOR_BLACK, width=1, tags=("bundle",))
+        self.canvas.tag_lower(item)
+        return item
+
+    def update_bundles(self, st):
+        """ Move the bundled items touching a dragged state. Returns the number of Tk calls made. """
+        calls = 0
+        for tr in st.outgoing_transitions + st.incoming_transitions:
+            item = self.bundles.get(frozenset((tr.source, tr.target)))
+            if item:
+                self.canvas.coords(item, *self.canvas.view.points(self.bundle_coords(tr)))
+                calls += 1
+        return calls
@@ -0,0 +1,140 @@
+import tkinter as tk
+from tkinter import ttk
+from utils.constants import COLOR_BLACK, WORD_ROW_HEIGHT, WORD_PREVIEW_CHARS
+
+class VirtualList(tk.Frame):
+    """
+        Scrollable single-selection list that only renders the visible rows.
+        The rows come from a shared sequence (e.g. RunManager.words) that is never copied;
+        a fixed pool of canvas text items is reused while scrolling, so refreshing costs
+        O(visible rows) no matter how many items there are.
+    """
+    def __init__(self, parent, items, on_activate=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.items = items
+        self.on_activate = on_activate
+        self.first = 0              # index of the topmost visible row
+        self.selected = None
+        self.rows = []              # pool of text item ids, one per visible row
+
+        self.canvas = tk.Canvas(self, bg="white", highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.select_rect = self.canvas.create_rectangle(0, 0, 0, 0, fill="#cce0ff", width=0, state=tk.HIDDEN)
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Double-Button-1>", self.on_double_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.scroll_rows(-1 if event.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-1))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(1))
+
+    def visible_count(self):
+        """ Number of rows that fit into the canvas. """
+        height = self.canvas.winfo_height()
+        if height <= 1:
+            height = self.canvas.winfo_reqheight()
+        return max(1, height // WORD_ROW_HEIGHT)
+
+    def set_items(self, items):
+        """ Point the list at another sequence and show it from the top. """
+        self.items = items
+        self.first = 0
+        self.selected = None
+        self.refresh()
+
+    def refresh(self):
+        """ Re-render the visible rows, e.g. after items were added or removed. """
+        count = self.visible_count()
+        self.first = max(0, min(self.first, len(self.items) - count))
+        if self.selected is not None and self.selected >= len(self.items):
+            self.selected = None
+        while len(self.rows) < count + 1:
+            self.rows.append(self.canvas.create_text(4, 0, anchor=tk.NW, fill=COLOR_BLACK))
+        for slot, item in enumerate(self.rows):
+            self.render_row(slot, item)
+        self.render_selection()
+        self.update_scrollbar(count)
+
+    def render_row(self, slot, item):
+        """ Show item self.first + slot in a pooled text item (hidden past the end). """
+        index = self.first + slot
+        if index >= len(self.items):
+            self.canvas.itemconfig(item, state=tk.HIDDEN)
+            return
+        text = str(self.items[index])
+        if len(text) > WORD_PREVIEW_CHARS:
+            text = text[:WORD_PREVIEW_CHARS] + "…"
+        self.canvas.itemconfig(item, text=text, state=tk.NORMAL)
+        self.canvas.coords(item, 4, slot * WORD_ROW_HEIGHT + 1)
+
+    def update_row(self, index):
+        """ Re-render a single item after it changed; a no-op when it is scrolled out of view. """
+        slot = index - self.first
+        if 0 <= slot < len(self.rows):
+            self.render_row(slot, self.rows[slot])
+
+    def render_selection(self):
+        """ Place the selection highlight behind the selected row, if it is visible. """
+        slot = None if self.selected is None else self.selected - self.first
+        if slot is None or not 0 <= slot < len(self.rows):
+            self.canvas.itemconfig(self.select_rect, state=tk.HIDDEN)
+            return
+        y = slot * WORD_ROW_HEIGHT
+        self.canvas.coords(self.select_rect, 0, y, self.canvas.winfo_width(), y + WORD_ROW_HEIGHT)
+        self.canvas.itemconfig(self.select_rect, state=tk.NORMAL)
+
+    def update_scrollbar(self, count):
+        """ Size the scrollbar thumb to the visible fraction of the list. """
+        total = len(self.items)
+        if total <= count:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + count) / total)
+
+    def scroll_rows(self, delta):
+        """ Scroll by a number of rows. """
+        self.first += delta
+        self.refresh()
+
+    def see(self, index):
+        """ Scroll so the given index is visible. """
+        count = self.visible_count()
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + count:
+            self.first = index - count + 1
+        self.refresh()
+
+    def on_scroll(self, action, amount, unit=None):
+        """ Scrollbar command: "moveto fraction" or "scroll n units|pages". """
+        count = self.visible_count()
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.items))
+        elif action == "scroll":
+            step = count if unit == "pages" else 1
+            self.first += int(amount) * step
+        self.refresh()
+
+    def index_at(self, y):
+        """ Item index under a canvas y coordinate, or None. """
+        index = self.first + int(y // WORD_ROW_HEIGHT)
+        return index if 0 <= index < len(self.items) else None
+
+    def on_click(self, event):
+        """ Select the row under the pointer. """
+        self.selected = self.index_at(event.y)
+        self.render_selection()
+
+    def on_double_click(self, event):
+        """ Activate the row under the pointer. """
+        index = self.index_at(event.y)
+        if index is not None and self.on_activate:
+            self.selected = index
+            self.render_selection()
+            self.on_activate(index)
+
+    def curselection(self):
+        """ Selected indices, like Listbox.curselection(). """
+        return () if self.selected is None else (self.selected,)
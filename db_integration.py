@@ -1,11 +1,25 @@
-import json
-from sqlalchemy import create_engine, Column, Integer, String, Text
-from sqlalchemy.orm import sessionmaker, declarative_base
-from utils.logger import operation_logger, error_logger
+from datetime import datetime
+from sqlalchemy import (create_engine, event, inspect, text, func, Column, Integer, String, Text, DateTime,
+                        LargeBinary, ForeignKey)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from backend.DeltaHistory import DeltaHistory
+from utils.constants import RUN_HISTORY_PAGE_SIZE, HISTORY_CHUNK_SIZE
+from utils.automaton_hash import split_automaton, automaton_hash
+from utils.history_codec import encode_automaton, encode_history, decode_automaton, decode_history
+from utils.lazy_history import LazyHistory
+from utils import metrics
+from utils.logger import get_logger, error_logger
+
+operation_logger = get_logger("db")
 
 # Define the base class for declarative models
 Base = declarative_base()
 
+# Stored in SQLite's PRAGMA user_version once create_all() and migrate() have run;
+# bump it whenever the tables or migrate() change so existing databases are upgraded.
+SCHEMA_VERSION = 2
+
 class User(Base):
     """ Represents the 'users' table in the database. """
     __tablename__ = 'users'
@@ -14,18 +28,56 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=False)  # Unique username
     password = Column(String(128), nullable=False)  # Encrypted password
 
+class AutomatonRecord(Base):
+    """
+        Represents the 'automata' table: each distinct automaton (states and transitions) stored once,
+        keyed by the SHA-256 of its canonical form (utils.automaton_hash). Runs reference it by hash.
+    """
+    __tablename__ = 'automata'
+
+    hash = Column(String(64), primary_key=True)  # automaton_hash() of the automaton
+    data = Column(LargeBinary, nullable=False)  # Automaton description, history_codec format
+    size = Column(Integer, default=0)  # Size of data in bytes
+    created_at = Column(DateTime, default=datetime.utcnow)  # When the automaton was first saved
+
 class RunHistory(Base):
     """
         Represents the 'run_history' table in the database.
         Stores the history of user runs and automata state. 
+        created_at and size let the load dialog list runs without reading the blobs.
+        New rows are stored in the compact binary format of utils.history_codec;
+        the *_json columns are only read for rows saved by older versions.
+        The automaton itself lives in the automata table (automaton_hash); the row only keeps
+        the words of the run (words_blob). automaton_blob is only read for rows not migrated yet.
+        Histories longer than HISTORY_CHUNK_SIZE are stored in run_history_chunks instead
+        of history_blob (chunk_size is then set) and loaded lazily.
     """
     __tablename__ = 'run_history'
     
     id = Column(Integer, primary_key=True)  # Unique identifier for each run
-    username = Column(String(50), nullable=False)  # Username associated with the run
-    automaton_json = Column(Text)  # Automaton snapshot in JSON format
-    history_json = Column(Text)    # BFS run data in JSON format
+    username = Column(String(50), nullable=False, index=True)  # Username associated with the run
+    automaton_json = Column(Text)  # Automaton snapshot in JSON format (legacy rows)
+    history_json = Column(Text)    # BFS run data in JSON format (legacy rows)
+    automaton_blob = Column(LargeBinary)  # Automaton snapshot, history_codec format
+    automaton_hash = Column(String(64), ForeignKey('automata.hash'), index=True)  # Shared automaton
+    words_blob = Column(LargeBinary)      # Words and word count of the run, history_codec format
+    history_blob = Column(LargeBinary)    # BFS run data, history_codec format
     description = Column(String(200), default="")  # Optional description of the run
+    created_at = Column(DateTime, default=datetime.utcnow)  # When the run was saved
+    size = Column(Integer, default=0)  # Size of the stored blobs in bytes
+    step_count = Column(Integer, default=0)  # Number of history snapshots
+    chunk_size = Column(Integer)  # Snapshots per chunk for chunked histories, NULL otherwise
+
+    automaton = relationship(AutomatonRecord, lazy="joined")
+
+class RunHistoryChunk(Base):
+    """ One chunk of a long run history: snapshots [start_step, end_step) in history_codec format. """
+    __tablename__ = 'run_history_chunks'
+
+    run_id = Column(Integer, primary_key=True)  # RunHistory.id
+    start_step = Column(Integer, primary_key=True)  # Index of the first snapshot in the chunk
+    end_step = Column(Integer, nullable=False)  # Index past the last snapshot
+    data = Column(LargeBinary, nullable=False)
 
 class DBManager:
     """
@@ -35,9 +87,148 @@ class DBManager:
     def __init__(self, db_url="sqlite:///automata.db"):
         """ Initializes the database manager. """
         self.engine = create_engine(db_url, echo=False)
-        Base.metadata.create_all(self.engine)  
+        url = self.engine.url
+        if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+            # WAL lets the write-behind RunWriter commit while the GUI keeps reading
+            event.listen(self.engine, "connect", self.enable_wal)
+        if self.schema_version() != SCHEMA_VERSION:
+            Base.metadata.create_all(self.engine)
+            self.migrate()
+            self.set_schema_version()
         self.Session = sessionmaker(bind=self.engine)  
         operation_logger.info("Database initialized.")
+
+    def schema_version(self):
+        """ Schema version recorded in the database (SQLite only), None if it cannot be recorded. """
+        if self.engine.url.get_backend_name() != "sqlite":
+            return None
+        with self.engine.connect() as conn:
+            return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+    def set_schema_version(self):
+        """ Record that the schema is current, so the next start skips create_all() and migrate(). """
+        if self.engine.url.get_backend_name() == "sqlite":
+            with self.engine.begin() as conn:
+                conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            operation_logger.info("Database schema is at version %s.", SCHEMA_VERSION)
+
+    @staticmethod
+    def enable_wal(dbapi_conn, connection_record):
+        """ Switch a new SQLite connection to WAL journaling (synchronous=NORMAL is durable enough in WAL mode). """
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    def writer_session(self):
+        """ Session on its own long-lived connection, for the RunWriter thread (close it with close_writer_session). """
+        return self.Session(bind=self.engine.connect())
+
+    @staticmethod
+    def close_writer_session(sess):
+        """ Close a session from writer_session() together with its connection. """
+        conn = sess.get_bind()
+        sess.close()
+        conn.close()
+
+    def migrate(self):
+        """
+            Bring databases created by older versions up to the current schema:
+            add the run_history metadata and binary columns (backfilling size) and the username index.
+            create_all() only creates missing tables, so existing ones are altered here.
+        """
+        columns = {c["name"] for c in inspect(self.engine).get_columns("run_history")}
+        with self.engine.begin() as conn:
+            if "created_at" not in columns:
+                conn.execute(text("ALTER TABLE run_history ADD COLUMN created_at DATETIME"))
+                operation_logger.info("Migrated run_history: added created_at.")
+            if "size" not in columns:
+                conn.execute(text("ALTER TABLE run_history ADD COLUMN size INTEGER DEFAULT 0"))
+                conn.execute(text("UPDATE run_history SET size = "
+                                  "COALESCE(LENGTH(automaton_json), 0) + COALESCE(LENGTH(history_json), 0)"))
+                operation_logger.info("Migrated run_history: added and backfilled size.")
+            for column, sql_type in (("automaton_blob", "BLOB"), ("history_blob", "BLOB"),
+                                     ("step_count", "INTEGER DEFAULT 0"), ("chunk_size", "INTEGER"),
+                                     ("automaton_hash", "VARCHAR(64) REFERENCES automata (hash)"),
+                                     ("words_blob", "BLOB")):
+                if column not in columns:
+                    conn.execute(text(f"ALTER TABLE run_history ADD COLUMN {column} {sql_type}"))
+                    operation_logger.info("Migrated run_history: added %s.", column)
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_run_history_username ON run_history (username)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_run_history_automaton_hash ON run_history (automaton_hash)"))
+            self.rehash_automata(conn)
+            self.dedup_automata(conn)
+
+    @staticmethod
+    def rehash_automata(conn):
+        """
+            Re-key the automata table with the current automaton_hash: before schema version 2 the
+            hash depended on the save format (one transition entry per vector or per GUI transition),
+            so the same automaton could be stored twice. Rows that now share a hash are merged.
+        """
+        remap = {}      # old hash -> current hash
+        records = {}    # current hash -> (data, size, created_at) of the first row mapped to it
+        for old, data, size, created_at in conn.execute(text("SELECT hash, data, size, created_at FROM automata")):
+            try:
+                digest = automaton_hash(decode_automaton(data))
+            except (ValueError, TypeError, AttributeError) as e:
+                error_logger.error("Cannot rehash stored automaton %s: %s", old, e)
+                continue
+            if digest != old:
+                remap[old] = digest
+                records.setdefault(digest, (data, size, created_at))
+        if not remap:
+            return
+        # All new keys are known before anything is written, so an old key that equals another
+        # row's new key cannot be followed twice
+        runs = [(run_id, remap[h]) for run_id, h in conn.execute(
+            text("SELECT id, automaton_hash FROM run_history WHERE automaton_hash IS NOT NULL")) if h in remap]
+        for old in remap:
+            conn.execute(text("DELETE FROM automata WHERE hash = :h"), {"h": old})
+        existing = {h for (h,) in conn.execute(text("SELECT hash FROM automata"))}
+        for digest, (data, size, created_at) in records.items():
+            if digest not in existing:
+                conn.execute(text("INSERT INTO automata (hash, data, size, created_at) VALUES (:h, :d, :s, :c)"),
+                             {"h": digest, "d": data, "s": size, "c": created_at})
+        for run_id, digest in runs:
+            conn.execute(text("UPDATE run_history SET automaton_hash = :h WHERE id = :id"), {"h": digest, "id": run_id})
+        operation_logger.info("Migrated automata: re-keyed %s stored automata into %s.", len(remap), len(records))
+
+    @staticmethod
+    def dedup_automata(conn):
+        """
+            Move the automata of rows saved before the automata table into it, one row per distinct
+            automaton, leaving the words in words_blob. Rows whose automaton cannot be decoded, or is not
+            an automaton object, are logged and left as they are.
+        """
+        rows = conn.execute(text("SELECT id, automaton_blob, automaton_json FROM run_history "
+                                 "WHERE automaton_hash IS NULL "
+                                 "AND (automaton_blob IS NOT NULL OR automaton_json IS NOT NULL)")).fetchall()
+        if not rows:
+            return
+        known = {h for (h,) in conn.execute(text("SELECT hash FROM automata"))}
+        migrated = 0
+        for run_id, blob, legacy in rows:
+            try:
+                decoded = decode_automaton(blob if blob is not None else legacy)
+                if not isinstance(decoded, dict):
+                    raise ValueError(f"expected an automaton object, got {type(decoded).__name__}")
+                automaton, run_part = split_automaton(decoded)
+                digest = automaton_hash(automaton)
+            except (ValueError, TypeError, AttributeError) as e:
+                error_logger.error("Cannot migrate the automaton of run %s: %s", run_id, e)
+                continue
+            if digest not in known:
+                data = encode_automaton(automaton)
+                conn.execute(text("INSERT INTO automata (hash, data, size, created_at) VALUES (:h, :d, :s, :c)"),
+                             {"h": digest, "d": data, "s": len(data), "c": datetime.utcnow()})
+                known.add(digest)
+            conn.execute(text("UPDATE run_history SET automaton_hash = :h, words_blob = :w, "
+                              "automaton_blob = NULL, automaton_json = NULL WHERE id = :id"),
+                         {"h": digest, "w": encode_automaton(run_part), "id": run_id})
+            migrated += 1
+        if migrated:
+            operation_logger.info("Migrated run_history: %s runs now share %s stored automata.", migrated, len(known))
     
     def add_user(self, username, password):
         """ Adds a new user to the database. """
@@ -45,13 +236,13 @@ class DBManager:
         existing = sess.query(User).filter_by(username=username).first()
         if existing:
             sess.close()
-            error_logger.error(f"Attempt to add existing user: {username}")
+            error_logger.error("Attempt to add existing user: %s", username)
             return False, "User already exists."
         user = User(username=username, password=password)
         sess.add(user)
         sess.commit()
         sess.close()
-        operation_logger.info(f"User created: {username}")
+        operation_logger.info("User created: %s", username)
         return True, "User created."
     
     def check_user_credentials(self, username, password):
@@ -60,38 +251,175 @@ class DBManager:
         user = sess.query(User).filter_by(username=username).first()
         if not user:
             sess.close()
-            error_logger.warning(f"Failed login attempt for non-existent user: {username}")
+            error_logger.warning("Failed login attempt for non-existent user: %s", username)
             return False
         valid = (user.password == password)
         sess.close()
         if valid:
-            operation_logger.info(f"User logged in: {username}")
+            operation_logger.info("User logged in: %s", username)
         else:
-            error_logger.warning(f"Invalid credentials for user: {username}")
+            error_logger.warning("Invalid credentials for user: %s", username)
         return valid
     
     def save_run_history(self, username, automaton_data, history_data, description=""):
-        """ Saves a new run history to the database. """
+        """ Saves a new run history to the database in the compact binary format. """
         sess = self.Session()
+        self.add_run_history(sess, username, automaton_data, history_data, description)
+        sess.commit()
+        sess.close()
+        operation_logger.info("Run history saved for user: %s, Description: %s", username, description)
+        return True
+
+    @metrics.traced("db.save")
+    def add_run_history(self, sess, username, automaton_data, history_data, description=""):
+        """
+            Encode a run and add it to sess without committing, so several saves can share a transaction.
+            Histories longer than HISTORY_CHUNK_SIZE are written as chunk rows in the same transaction.
+            Returns the new RunHistory row.
+        """
+        automaton, run_part = split_automaton(automaton_data)
+        digest, automaton_size = self.store_automaton(sess, automaton)
+        words_blob = encode_automaton(run_part)
+        chunked = len(history_data) > HISTORY_CHUNK_SIZE
+        history_blob = None if chunked else encode_history(history_data)
         rh = RunHistory(
             username=username,
-            automaton_json=json.dumps(automaton_data),
-            history_json=json.dumps(history_data),
-            description=description
+            automaton_hash=digest,
+            words_blob=words_blob,
+            history_blob=history_blob,
+            description=description,
+            step_count=len(history_data),
+            chunk_size=HISTORY_CHUNK_SIZE if chunked else None
         )
         sess.add(rh)
-        sess.commit()
+        size = automaton_size + len(words_blob) + len(history_blob or b"")
+        if chunked:
+            sess.flush()    # assigns rh.id
+            for start, chunk in self.iter_chunks(history_data, HISTORY_CHUNK_SIZE):
+                data = encode_history(chunk)
+                size += len(data)
+                sess.add(RunHistoryChunk(run_id=rh.id, start_step=start, end_step=start + len(chunk), data=data))
+        rh.size = size
+        metrics.count("bytes_serialized", size - automaton_size)
+        return rh
+
+    @staticmethod
+    def store_automaton(sess, automaton):
+        """
+            Make sure the automaton is in the automata table, inserting it only if its hash is new.
+            Returns (hash, size of the stored data).
+        """
+        digest = automaton_hash(automaton)
+        record = sess.get(AutomatonRecord, digest)
+        if record is None:
+            data = encode_automaton(automaton)
+            metrics.count("bytes_serialized", len(data))
+            try:
+                with sess.begin_nested():   # another connection may insert the same automaton first
+                    sess.add(AutomatonRecord(hash=digest, data=data, size=len(data)))
+            except IntegrityError:
+                pass
+            return digest, len(data)
+        return digest, record.size or 0
+
+    @staticmethod
+    def iter_chunks(history, chunk_size):
+        """ Yield (start, chunk) pieces of a history, keeping DeltaHistory chunks delta-encoded. """
+        if isinstance(history, LazyHistory) and history.chunk_size == chunk_size:
+            yield from history.chunks()
+            return
+        for start in range(0, len(history), chunk_size):
+            if isinstance(history, DeltaHistory):
+                yield start, history.window(start, start + chunk_size)
+            else:
+                yield start, list(history[start:start + chunk_size])
+
+    @metrics.traced("db.load_chunk")
+    def get_history_chunk(self, run_id, start_step):
+        """ Decode the chunk of a chunked run history that begins at start_step. """
+        sess = self.Session()
+        row = sess.query(RunHistoryChunk.data).filter_by(run_id=run_id, start_step=start_step).first()
         sess.close()
-        operation_logger.info(f"Run history saved for user: {username}, Description: {description}")
-        return True
-    
+        if row is None:
+            raise ValueError(f"Missing history chunk {start_step} of run {run_id}")
+        return decode_history(row[0])
+
+    @staticmethod
+    def decode_run(r):
+        """
+            (id, description, automaton_data, history_data) of a row, reading the binary
+            columns or, for rows saved before them, the JSON ones. Raises ValueError on corrupt data.
+        """
+        automaton = DBManager.decode_automaton_data(r)
+        history = decode_history(r.history_blob if r.history_blob is not None else r.history_json)
+        return r.id, r.description, automaton, history
+
+    @staticmethod
+    def decode_automaton_data(r):
+        """ The automaton description of a row: the shared automaton plus the words of the run. """
+        if r.automaton_hash is None:
+            return decode_automaton(r.automaton_blob if r.automaton_blob is not None else r.automaton_json)
+        if r.automaton is None:
+            raise ValueError(f"Run {r.id} references a missing automaton {r.automaton_hash}")
+        automaton = decode_automaton(r.automaton.data)
+        if r.words_blob is not None:
+            automaton.update(decode_automaton(r.words_blob))
+        return automaton
+
+    def decode_run_lazy(self, r):
+        """ Like decode_run, but a chunked history is returned as a LazyHistory reading chunks on demand. """
+        if not r.chunk_size:
+            return self.decode_run(r)
+        automaton = self.decode_automaton_data(r)
+        run_id = r.id
+        history = LazyHistory(lambda start: self.get_history_chunk(run_id, start), r.step_count, r.chunk_size)
+        return r.id, r.description, automaton, history
+
     def list_run_histories(self, username):
-        """ Retrieves all run histories for a specific user. """
+        """ Retrieves and decodes all run histories for a specific user. """
         sess = self.Session()
         records = sess.query(RunHistory).filter_by(username=username).all()
         output = []
         for r in records:
-            output.append((r.id, r.description, r.automaton_json, r.history_json))
+            output.append(self.decode_run_lazy(r))
         sess.close()
-        operation_logger.info(f"Listed run histories for user: {username}")
+        operation_logger.info("Listed run histories for user: %s", username)
         return output
+
+    def count_run_histories(self, username):
+        """ Number of saved runs of a user. """
+        sess = self.Session()
+        total = sess.query(func.count(RunHistory.id)).filter_by(username=username).scalar()
+        sess.close()
+        return total or 0
+
+    def list_run_history_meta(self, username, offset=0, limit=RUN_HISTORY_PAGE_SIZE):
+        """
+            One page of a user's runs, newest first, without the blobs.
+            Returns a list of (id, description, created_at, size) tuples.
+        """
+        sess = self.Session()
+        records = (sess.query(RunHistory.id, RunHistory.description, RunHistory.created_at, RunHistory.size)
+                   .filter_by(username=username)
+                   .order_by(RunHistory.id.desc())
+                   .offset(offset).limit(limit).all())
+        sess.close()
+        operation_logger.info("Listed run history metadata for user: %s (offset %s, %s rows)", username, offset, len(records))
+        return [tuple(r) for r in records]
+
+    @metrics.traced("db.load")
+    def get_run_history(self, run_id, username=None):
+        """
+            Fetch and decode a single run: (id, description, automaton_data, history_data),
+            or None if it does not exist (or belongs to another user when username is given).
+            Chunked histories come back as a LazyHistory. Raises ValueError if the stored data is corrupt.
+        """
+        sess = self.Session()
+        query = sess.query(RunHistory).filter_by(id=run_id)
+        if username is not None:
+            query = query.filter_by(username=username)
+        r = query.first()
+        try:
+            return self.decode_run_lazy(r) if r else None
+        finally:
+            sess.close()
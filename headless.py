@@ -0,0 +1,129 @@
+"""
+Headless batch runner: run word tuples through the backend engine without the GUI.
+
+    python headless.py --automaton automaton.json [--words words.txt | -] [--output results.jsonl]
+    python headless.py --run-id 12 [--db demo.db] [--saved-words]
+
+The automaton is a JSON export in the saved-run format ({"states": [...], "transitions": [...]},
+optionally with "words") or the automaton of a run saved in the SQLite database.
+Word tuples (one word per tape) are read from a file or stdin: whitespace-separated words per
+line, or JSONL (.jsonl / .ndjson or --jsonl) with a list of strings per line.
+One JSON object per tuple is written as soon as its run finishes:
+    {"index", "words", "accepted", "steps", "explored", "time_ms"} or {"index", "words", "error"}
+Only the backend is imported; SQLAlchemy is loaded for --run-id alone, tkinter and PIL never.
+The exit status is 1 if any tuple could not be run. --metrics (or HYPER_AUTOMATA_METRICS) writes the
+search spans and counters (utils/metrics) to a file at exit. --memprofile adds a "memory" object
+to each result: peak bytes per engine structure and per BFS level (backend/MemoryProfile).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from backend.Automata import Automata
+from backend.Manager import Manager
+from backend.MemoryProfile import MemoryProfile
+from backend.Tape import Tape
+from utils import metrics
+from utils.history_codec import decode_automaton
+from utils.word_io import JSONL_SUFFIXES, iter_word_tuples
+
+def load_automaton(args):
+    """ The saved automaton description, from a JSON export or from a run saved in the database. """
+    if args.automaton:
+        with open(args.automaton, "rb") as f:
+            return decode_automaton(f.read())
+    from db_integration import DBManager     # only this path needs SQLAlchemy
+    record = DBManager(db_url=f"sqlite:///{args.db}").get_run_history(args.run_id)
+    if record is None:
+        raise SystemExit(f"No saved run with id {args.run_id} in {args.db}")
+    return record[2]
+
+def run_words(automata, words, memprofile=False):
+    """
+        Search an accepting run for one word tuple; returns the result fields of its output line.
+        With memprofile the search is traced with tracemalloc and a "memory" report is added.
+    """
+    if automata.start_state is None:
+        raise ValueError("the automaton has no start state")
+    tapes = [Tape(w) for w in words]
+    profile = MemoryProfile() if memprofile else None
+    manager = Manager(automata, tapes, memory_profile=profile)
+    start = time.perf_counter()
+    history = manager.update([[automata.start_state] + [0] * len(tapes)])
+    elapsed = time.perf_counter() - start
+    metrics.record_span("engine.search", start, elapsed)
+    metrics.count("configurations_explored", len(manager.visited))
+    metrics.count("duplicates_hit", manager.duplicates)
+    metrics.count("transitions_tested", manager.transitions_tested)
+    last = history[-1]
+    accepted = last[0] in automata.accept_states and all(pos >= len(w) for pos, w in zip(last[1:], words))
+    result = {
+        "accepted": accepted,
+        "steps": len(history) - 1,
+        "explored": len(manager.visited),
+        "time_ms": round(elapsed * 1000, 3),
+    }
+    if profile:
+        result["memory"] = profile.report()
+    return result
+
+def word_tuples(args, data):
+    """ The word tuples to run: the saved words of the automaton, or lines from a file or stdin. """
+    if args.saved_words:
+        yield list(data.get("words", []))
+        return
+    if args.words == "-":
+        yield from iter_word_tuples(sys.stdin, args.jsonl)
+        return
+    jsonl = args.jsonl or os.path.splitext(args.words)[1].lower() in JSONL_SUFFIXES
+    with open(args.words, encoding="utf-8") as f:
+        yield from iter_word_tuples(f, jsonl, args.words)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--automaton", help="JSON export of an automaton")
+    source.add_argument("--run-id", type=int, help="id of a run saved in the database")
+    parser.add_argument("--db", default="demo.db", help="SQLite database for --run-id (default: demo.db)")
+    parser.add_argument("--words", default="-", help="file of word tuples, - for stdin (default)")
+    parser.add_argument("--jsonl", action="store_true", help="read the word tuples as JSONL")
+    parser.add_argument("--saved-words", action="store_true", help="run the words saved with the automaton")
+    parser.add_argument("--output", default="-", help="JSONL results file, - for stdout (default)")
+    parser.add_argument("--memprofile", action="store_true",
+                        help="trace memory with tracemalloc and add a per-category, per-BFS-level report to each result")
+    parser.add_argument("--metrics", help="write spans and counters to this file at exit (.prom: Prometheus text, else JSON)")
+    args = parser.parse_args(argv)
+    metrics.setup_metrics(args.metrics)
+
+    data = load_automaton(args)
+    automata = Automata.from_description(data)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    failed = 0
+    try:
+        for index, words in enumerate(word_tuples(args, data)):
+            result = {"index": index, "words": words}
+            try:
+                result.update(run_words(automata, words, args.memprofile))
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                failed += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    except ValueError as e:      # malformed word input
+        print(e, file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        if out is not sys.stdout:
+            raise
+        # The reader went away (e.g. | head): point stdout at devnull so the flush at exit
+        # does not raise again, and stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
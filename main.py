@@ -1,6 +1,6 @@
+import threading
 import tkinter as tk
-from tkinter import ttk
-from db_integration import DBManager
+from tkinter import ttk, messagebox
 import traceback
 
 from components.panels.draw_tools import ToolsFrame
@@ -12,9 +12,15 @@ from components.login_window import LoginWindow
 from components.drawing_board import DrawingBoard
 
 from managers.run_manager import RunManager
+from managers.run_writer import RunWriter
 from managers.automata_manager import AutomataManager
 
-from utils.logger import operation_logger, error_logger
+from utils.logger import get_logger, error_logger, setup_logging
+from utils import metrics
+
+operation_logger = get_logger("ui")
+
+DB_URL = "sqlite:///demo.db"
 
 class MainApplication(tk.Tk):
     def __init__(self):
@@ -26,11 +32,14 @@ class MainApplication(tk.Tk):
         # Initialize current_user after login
         self.current_user = None
 
-        # Initialize Database Manager
-        self.db_manager = DBManager(db_url="sqlite:///demo.db")
+        # Open the database (SQLAlchemy import, schema check) while the login window is shown
+        self.db_manager = None
+        self.db_error = None
+        self.db_thread = threading.Thread(target=self.open_database, name="open-database", daemon=True)
+        self.db_thread.start()
 
         # Launch Login Window
-        self.login_window = LoginWindow(self, self.db_manager)
+        self.login_window = LoginWindow(self, self.get_db_manager)
         self.wait_window(self.login_window)
 
         # If the user closed the login, the app ends
@@ -46,6 +55,11 @@ class MainApplication(tk.Tk):
             current_user=self.current_user
         )
 
+        # Saves are written behind the GUI; flush them before the window goes away
+        self.run_writer = RunWriter(self, self.db_manager)
+        self.run_mgr.writer = self.run_writer
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Undo/Redo stacks
         self.undo_stack = []
         self.redo_stack = []
@@ -55,7 +69,7 @@ class MainApplication(tk.Tk):
         self.grid_columnconfigure(0, weight=1)
 
         # Initialize Drawing Board
-        self.canvas = DrawingBoard(self, bg="white", width=900, height=700)
+        self.canvas = DrawingBoard(self, automata_mgr=self.automata_mgr, bg="white", width=900, height=700)
         self.canvas.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
 
         # Initialize Tools Panel
@@ -106,6 +120,13 @@ class MainApplication(tk.Tk):
         self.run_tools.set_words_window_ref(self.words_window)
         self.run_tools.set_tools_panel_ref(self.tools_panel)
 
+        # Debug menu
+        menubar = tk.Menu(self)
+        debug_menu = tk.Menu(menubar, tearoff=0)
+        debug_menu.add_command(label="Memory profile of current words", command=self.show_memory_profile)
+        menubar.add_cascade(label="Debug", menu=debug_menu)
+        self.config(menu=menubar)
+
         # Link selection tool to run_mgr for partial BFS updates
         if "Selection" in self.tools_panel.tools:
             _, selection_tool = self.tools_panel.tools["Selection"]
@@ -113,13 +134,61 @@ class MainApplication(tk.Tk):
 
         operation_logger.info("Main GUI initialized.")
 
+    def open_database(self):
+        """ Background thread: import the database layer and open DB_URL. No Tk calls here. """
+        try:
+            from db_integration import DBManager
+            self.db_manager = DBManager(db_url=DB_URL)
+        except Exception as e:
+            self.db_error = e
+
+    def get_db_manager(self):
+        """ The DBManager, waiting for open_database to finish if it is still running. """
+        self.db_thread.join()
+        if self.db_error is not None:
+            raise self.db_error
+        return self.db_manager
+
+    def show_memory_profile(self):
+        """ Profile the memory of a search of the current words and show the report in a window. """
+        try:
+            profile = self.run_mgr.profile_memory()
+        except Exception as e:
+            error_logger.error("Memory profile failed: %s", e)
+            messagebox.showerror("Error", f"Memory profile failed: {e}")
+            return
+        if profile is None:
+            messagebox.showinfo("Memory profile", "Add words and a start state to profile a search.")
+            return
+        win = tk.Toplevel(self)
+        win.title("Memory profile")
+        text = tk.Text(win, wrap="none", font=("Courier", 10), width=110, height=30)
+        yscroll = ttk.Scrollbar(win, orient=tk.VERTICAL, command=text.yview)
+        xscroll = ttk.Scrollbar(win, orient=tk.HORIZONTAL, command=text.xview)
+        text.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        text.grid(row=0, column=0, sticky="nsew")
+        yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        win.grid_rowconfigure(0, weight=1)
+        win.grid_columnconfigure(0, weight=1)
+        text.insert("1.0", profile.format())
+        text.configure(state="disabled")
+        operation_logger.info("Memory profile shown.")
+
+    def on_close(self):
+        """ Flush pending run saves, then close the application. """
+        self.run_writer.close()
+        self.destroy()
+
 def main():
+    setup_logging()
+    metrics.setup_metrics()
     try:
         app = MainApplication()
         app.mainloop()
     except Exception as e:
         error_message = f"Critical error occurred: {str(e)}"
-        error_logger.critical(f"{error_message}\n{traceback.format_exc()}")
+        error_logger.critical("%s\n%s", error_message, traceback.format_exc())
         
         # Show error dialog to user
         root = tk.Tk()
@@ -1,29 +1,92 @@
 from components.state import State
 from components.transition import Transition as GTransition
-from utils.logger import operation_logger
+from utils.logger import get_logger
+from utils import metrics
+
+operation_logger = get_logger("canvas")
 
 class AutomataManager:
-    """ Manages the GUI states & transitions. 'word_count' = # of symbols per transition vector. """
+    """
+        Manages the GUI states & transitions. 'word_count' = # of symbols per transition vector.
+        States and transitions report changes into self.dirty; render() re-emits only those.
+    """
     def __init__(self):
         self.states = []
         self.transitions = []
+        self.dirty = set()
         self.word_count = 1
         operation_logger.info("AutomataManager initialized.")
 
     def add_state(self, name, x, y, is_start=False, is_accept=False):
         """ Add a new state to the automata. """
         st = State(name, x, y, is_start, is_accept)
+        st.dirty_sink = self.dirty
         self.states.append(st)
-        operation_logger.info(f"State added to AutomataManager: {name}")
+        operation_logger.info("State added to AutomataManager: %s", name)
         return st
 
     def add_transition(self, src, tgt, vectors):
         """ Add a new transition to the automata. """
         tr = GTransition(src, tgt, vectors)
+        tr.dirty_sink = self.dirty
         self.transitions.append(tr)
-        operation_logger.info(f"Transition added to AutomataManager: {src.name} -> {tgt.name}")
+        operation_logger.info("Transition added to AutomataManager: %s -> %s", src.name, tgt.name)
         return tr
 
+    def load_snapshot(self, states_data, transitions_data, word_count=1):
+        """
+            Replace the automaton with a saved one in a single pass: states are created first and
+            indexed by name, then transitions resolve their endpoints through that dict.
+            A transition entry either carries all vectors of one GUI transition ([[...], [...]]) or,
+            in saves made from the backend, a single vector; single-vector entries between the
+            same pair of states are merged into one transition. Nothing is drawn: call draw_all once.
+            Returns (number of states, number of transitions).
+        """
+        self.states.clear()
+        self.transitions.clear()
+        self.dirty.clear()
+        by_name = {}
+        for st in states_data:
+            state = State(st['name'], st['x'], st['y'], st['is_start'], st['is_accept'])
+            state.dirty_sink = self.dirty
+            self.states.append(state)
+            by_name[state.name] = state
+
+        merged = {}     # (source, target) -> (transition, vectors) collecting single-vector entries
+        parallels = {}  # (source, target) -> transitions created so far, for offset_index
+        skipped = 0
+        for tdata in transitions_data:
+            src = by_name.get(tdata['source'])
+            tgt = by_name.get(tdata['target'])
+            if src is None or tgt is None:
+                skipped += 1
+                continue
+            vectors = tdata['vectors']
+            key = (src, tgt)
+            single = bool(vectors) and not isinstance(vectors[0], (list, tuple))
+            if single:
+                if key in merged:
+                    merged[key][1].append(tuple(vectors))
+                    continue
+                vectors = [vectors]
+            tr = GTransition(src, tgt, [tuple(v) for v in vectors])
+            tr.dirty_sink = self.dirty
+            tr.offset_index = parallels.get(key, 0)
+            parallels[key] = tr.offset_index + 1
+            if single:
+                merged[key] = (tr, [tuple(vectors[0])])
+            self.transitions.append(tr)
+        # Assign the merged vectors through the property so labels and dirty flags stay in step
+        for tr, vectors in merged.values():
+            if len(vectors) > 1:
+                tr.transition_vectors = vectors
+        self.set_word_count(word_count)
+        self.dirty.clear()
+        if skipped:
+            operation_logger.warning("Snapshot load skipped %s transitions with unknown states.", skipped)
+        operation_logger.info("Snapshot loaded: %s states, %s transitions.", len(self.states), len(self.transitions))
+        return len(self.states), len(self.transitions)
+
     def set_word_count(self, new_count):
         """ Set the number of symbols per transition vector and adjust existing transitions. """
         self.word_count = new_count
@@ -36,14 +99,29 @@ class AutomataManager:
                 elif len(lst) > new_count:
                     lst = lst[:new_count]
                 new_vecs.append(tuple(lst))
-            tr.transition_vectors = new_vecs
-        operation_logger.info(f"Word count set to: {new_count}")
+            if new_vecs != list(tr.transition_vectors):
+                tr.transition_vectors = new_vecs
+        operation_logger.info("Word count set to: %s", new_count)
 
+    @metrics.traced("canvas.draw_all")
     def draw_all(self, canvas):
-        """ Draw all states and transitions on the canvas. """
-        canvas.delete("all")
-        for s in self.states:
-            s.draw(canvas)
-        for t in self.transitions:
-            t.draw(canvas)
+        """ Redraw the canvas; only states and transitions in the visible region are drawn. """
+        self.dirty.clear()
+        canvas.viewport.forget()   # the objects may have been replaced wholesale (load_snapshot)
+        canvas.viewport.redraw()
         operation_logger.info("All states and transitions drawn on the canvas.")
+
+    def render(self, canvas):
+        """ Re-emit only the states and transitions marked dirty since the last render. """
+        if not self.dirty:
+            return
+        dirty = list(self.dirty)
+        self.dirty.clear()
+        # States first so transitions are updated against current state geometry
+        for obj in dirty:
+            if isinstance(obj, State):
+                obj.refresh(canvas)
+        for obj in dirty:
+            if not isinstance(obj, State):
+                obj.refresh(canvas)
+        operation_logger.debug("Rendered %s changed items.", len(dirty))
@@ -0,0 +1,278 @@
+import math
+import queue
+import threading
+import numpy as np
+from utils.constants import (LAYOUT_EDGE_LENGTH, LAYOUT_ITERATIONS, LAYOUT_EXACT_LIMIT, LAYOUT_CELL_OCCUPANCY,
+                             LAYOUT_CELL_CAP, LAYOUT_GRID_CLIP,
+                             LAYOUT_MARGIN, LAYOUT_LAYER_GAP, LAYOUT_NODE_GAP, LAYOUT_POLL_MS)
+from utils.logger import get_logger, error_logger
+
+operation_logger = get_logger("layout")
+
+def force_directed_layout(n, edges, positions=None, iterations=LAYOUT_ITERATIONS, seed=0):
+    """
+        Fruchterman-Reingold layout computed with NumPy.
+        n: number of nodes, edges: iterable of (i, j) index pairs, positions: optional (n, 2) start.
+        Repulsion is exact up to LAYOUT_EXACT_LIMIT nodes; above that it is approximated on a
+        uniform grid (see _grid_repulsion).
+        Returns an (n, 2) float array in model coordinates.
+    """
+    if n == 0:
+        return np.zeros((0, 2))
+    k = float(LAYOUT_EDGE_LENGTH)
+    side = k * math.sqrt(n)
+    rng = np.random.default_rng(seed)
+    if positions is None:
+        pos = rng.uniform(0, side, size=(n, 2))
+    else:
+        pos = np.array(positions, dtype=float).reshape(n, 2)
+        pos += rng.uniform(-1, 1, size=(n, 2))  # break ties between stacked nodes
+
+    edge_arr = np.array([(i, j) for i, j in edges if i != j], dtype=np.int64).reshape(-1, 2)
+    temperature = side / 10
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        if n <= LAYOUT_EXACT_LIMIT:
+            disp = _exact_repulsion(pos, k)
+        else:
+            disp = _grid_repulsion(pos, k)
+        if len(edge_arr):
+            delta = pos[edge_arr[:, 0]] - pos[edge_arr[:, 1]]
+            dist = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 0.01)
+            force = delta * (dist / k)[:, None]
+            np.add.at(disp, edge_arr[:, 0], -force)
+            np.add.at(disp, edge_arr[:, 1], force)
+        length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 0.01)
+        pos += disp / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature -= cooling
+    return _normalize(pos)
+
+def _exact_repulsion(pos, k):
+    """ All-pairs repulsive displacement k^2 / d along each pair, O(n^2) memory. """
+    x, y = pos[:, 0], pos[:, 1]
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    weight = (k * k) / np.maximum(dx * dx + dy * dy, 0.01)
+    np.fill_diagonal(weight, 0.0)
+    return np.stack(((dx * weight).sum(axis=1), (dy * weight).sum(axis=1)), axis=1)
+
+def _grid_repulsion(pos, k):
+    """
+        Grid-approximated repulsion. The grid covers the layout without its outermost
+        LAYOUT_GRID_CLIP percent of nodes on each side (those are clipped into the border
+        cells), so a few far-flung nodes cannot stretch it; cells are at least k wide and
+        hold about LAYOUT_CELL_OCCUPANCY nodes on average. Forces from the 3x3 neighbouring
+        cells are exact for the first LAYOUT_CELL_CAP nodes of each cell, the rest of a
+        crowded cell acts through its centroid; forces from all other cells are computed
+        cell-to-cell through their centroids.
+    """
+    n = len(pos)
+    origin, top = np.percentile(pos, (LAYOUT_GRID_CLIP, 100 - LAYOUT_GRID_CLIP), axis=0)
+    span = float((top - origin).max()) + 1.0
+    per_side = max(1, min(int(math.sqrt(n / LAYOUT_CELL_OCCUPANCY)), int(span / k)))
+    cells = np.clip(((pos - origin) / (span / per_side)).astype(np.int64), 0, per_side - 1)
+    width = per_side + 2
+    keys = (cells[:, 0] + 1) * width + (cells[:, 1] + 1)
+    order = np.argsort(keys, kind="stable")
+    uniq, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    cell_of = np.searchsorted(uniq, keys)
+
+    # Far field, cell to cell: every non-neighbouring cell acts through its centroid
+    centroids = np.stack((np.bincount(cell_of, pos[:, 0]), np.bincount(cell_of, pos[:, 1])), axis=1)
+    centroids /= counts[:, None]
+    cx, cy = uniq // width, uniq % width
+    near = (np.abs(cx[:, None] - cx[None, :]) <= 1) & (np.abs(cy[:, None] - cy[None, :]) <= 1)
+    dx = centroids[:, 0][:, None] - centroids[:, 0][None, :]
+    dy = centroids[:, 1][:, None] - centroids[:, 1][None, :]
+    weight = np.where(near, 0.0, counts[None, :] * (k * k) / np.maximum(dx * dx + dy * dy, 0.01))
+    far = np.stack(((dx * weight).sum(axis=1), (dy * weight).sum(axis=1)), axis=1)
+    disp = far[cell_of]
+
+    # Near field: padded member table so neighbours are gathered without Python loops;
+    # nodes past LAYOUT_CELL_CAP in a cell are left out of it and act through their centroid
+    cap = min(int(counts.max()), LAYOUT_CELL_CAP)
+    slot = np.arange(n) - np.repeat(starts, counts)
+    row = np.repeat(np.arange(len(uniq)), counts)
+    listed = slot < cap
+    members = np.full((len(uniq), cap), -1, dtype=np.int64)
+    members[row[listed], slot[listed]] = order[listed]
+    rest = row[~listed]
+    if len(rest):
+        rest_nodes = order[~listed]
+        rest_counts = np.bincount(rest, minlength=len(uniq))
+        rest_pos = np.stack((np.bincount(rest, pos[rest_nodes, 0], minlength=len(uniq)),
+                             np.bincount(rest, pos[rest_nodes, 1], minlength=len(uniq))), axis=1)
+        rest_pos /= np.maximum(rest_counts, 1)[:, None]
+    node = np.arange(n)
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            neighbour = keys + ox * width + oy
+            idx = np.minimum(np.searchsorted(uniq, neighbour), len(uniq) - 1)
+            rows = node[uniq[idx] == neighbour]
+            if not len(rows):
+                continue
+            cand = members[idx[rows]]
+            valid = (cand >= 0) & (cand != rows[:, None])
+            cand = np.where(valid, cand, 0)
+            ddx = pos[rows, 0][:, None] - pos[cand, 0]
+            ddy = pos[rows, 1][:, None] - pos[cand, 1]
+            w = np.where(valid, (k * k) / np.maximum(ddx * ddx + ddy * ddy, 0.01), 0.0)
+            disp[rows, 0] += (ddx * w).sum(axis=1)
+            disp[rows, 1] += (ddy * w).sum(axis=1)
+            if len(rest):
+                src = idx[rows]
+                rdx = pos[rows, 0] - rest_pos[src, 0]
+                rdy = pos[rows, 1] - rest_pos[src, 1]
+                w = rest_counts[src] * (k * k) / np.maximum(rdx * rdx + rdy * rdy, 0.01)
+                disp[rows, 0] += rdx * w
+                disp[rows, 1] += rdy * w
+    return disp
+
+def layered_layout(n, edges, roots=()):
+    """
+        Layered layout for mostly acyclic automata: layers are BFS depths from the roots
+        (start state first, then any unreached node), ordered within a layer by the
+        barycenter of their predecessors. Returns an (n, 2) float array.
+    """
+    succ = [[] for _ in range(n)]
+    pred = [[] for _ in range(n)]
+    for i, j in edges:
+        if i != j:
+            succ[i].append(j)
+            pred[j].append(i)
+    layer = [-1] * n
+    # BFS from the start states first, then from any node not reached yet
+    # (fewest predecessors first, so sources of other components become roots)
+    seeds = [[r] for r in roots if 0 <= r < n]
+    seeds += [[v] for v in sorted(range(n), key=lambda v: len(pred[v]))]
+    for frontier in seeds:
+        frontier = [v for v in frontier if layer[v] == -1]
+        for v in frontier:
+            layer[v] = 0
+        depth = 0
+        while frontier:
+            nxt = []
+            for v in frontier:
+                for w in succ[v]:
+                    if layer[w] == -1:
+                        layer[w] = depth + 1
+                        nxt.append(w)
+            frontier = nxt
+            depth += 1
+
+    layers = {}
+    for v in range(n):
+        layers.setdefault(layer[v], []).append(v)
+    rank = [0.0] * n
+    for depth in sorted(layers):
+        nodes = layers[depth]
+        def barycenter(v):
+            ps = [rank[p] for p in pred[v] if layer[p] < depth]
+            return sum(ps) / len(ps) if ps else rank[v]
+        nodes.sort(key=barycenter)
+        for i, v in enumerate(nodes):
+            rank[v] = i
+
+    pos = np.zeros((n, 2))
+    tallest = max((len(v) for v in layers.values()), default=1)
+    for depth, nodes in layers.items():
+        shift = (tallest - len(nodes)) * LAYOUT_NODE_GAP / 2
+        for i, v in enumerate(nodes):
+            pos[v] = (depth * LAYOUT_LAYER_GAP, shift + i * LAYOUT_NODE_GAP)
+    return _normalize(pos)
+
+def back_edge_ratio(n, edges, roots=()):
+    """ Fraction of (non-loop) edges that point back to an earlier or the same BFS depth. """
+    succ = [[] for _ in range(n)]
+    plain = [(i, j) for i, j in edges if i != j]
+    for i, j in plain:
+        succ[i].append(j)
+    depth = [-1] * n
+    frontier = [r for r in roots if 0 <= r < n] or ([0] if n else [])
+    for r in frontier:
+        depth[r] = 0
+    while frontier:
+        nxt = []
+        for v in frontier:
+            for w in succ[v]:
+                if depth[w] == -1:
+                    depth[w] = depth[v] + 1
+                    nxt.append(w)
+        frontier = nxt
+    back = sum(1 for i, j in plain if depth[i] >= 0 and depth[j] >= 0 and depth[j] <= depth[i])
+    return back / len(plain) if plain else 0.0
+
+def _normalize(pos):
+    """ Translate a layout so its top-left node sits at LAYOUT_MARGIN. """
+    if len(pos):
+        pos = pos - pos.min(axis=0) + LAYOUT_MARGIN
+    return pos
+
+class LayoutManager:
+    """
+        Runs a layout off the Tk thread. The automaton is snapshotted on the Tk thread,
+        positions are computed in a worker thread and handed back through a queue that the
+        Tk thread polls with after(); results are written into State.x/y and rendered.
+    """
+    METHODS = ("auto", "force", "layered")
+
+    def __init__(self, canvas, automata_mgr):
+        self.canvas = canvas
+        self.automata_mgr = automata_mgr
+        self.results = queue.Queue()
+        self.worker = None
+
+    def busy(self):
+        """ Whether a layout is currently being computed. """
+        return self.worker is not None and self.worker.is_alive()
+
+    def start(self, method="auto", on_done=None):
+        """ Snapshot the automaton and compute its layout in a background thread. """
+        if self.busy():
+            return False
+        states = list(self.automata_mgr.states)
+        index = {st: i for i, st in enumerate(states)}
+        edges = [(index[tr.source], index[tr.target]) for tr in self.automata_mgr.transitions
+                 if tr.source in index and tr.target in index]
+        positions = [(st.x, st.y) for st in states]
+        roots = [i for i, st in enumerate(states) if st.is_start]
+        self.worker = threading.Thread(
+            target=self._compute, args=(method, states, edges, positions, roots), daemon=True)
+        self.worker.start()
+        self.canvas.after(LAYOUT_POLL_MS, self._poll, on_done)
+        operation_logger.info("Auto layout started (%s) for %s states.", method, len(states))
+        return True
+
+    def _compute(self, method, states, edges, positions, roots):
+        """ Worker thread body: no Tk calls here. """
+        try:
+            n = len(states)
+            if method == "auto":
+                method = "layered" if back_edge_ratio(n, edges, roots) < 0.2 else "force"
+            if method == "layered":
+                pos = layered_layout(n, edges, roots)
+            else:
+                pos = force_directed_layout(n, edges, positions)
+            self.results.put((states, pos.tolist(), method, None))
+        except Exception as e:
+            self.results.put((states, None, method, e))
+
+    def _poll(self, on_done):
+        """ Tk thread: apply a finished layout, otherwise check again later. """
+        try:
+            states, pos, method, err = self.results.get_nowait()
+        except queue.Empty:
+            self.canvas.after(LAYOUT_POLL_MS, self._poll, on_done)
+            return
+        if err is not None:
+            error_logger.error("Auto layout failed: %s", err)
+        else:
+            alive = set(self.automata_mgr.states)
+            for st, (x, y) in zip(states, pos):
+                if st in alive:
+                    st.set_position(x, y)
+            self.automata_mgr.render(self.canvas)
+            self.canvas.viewport.invalidate()
+            operation_logger.info("Auto layout applied (%s) to %s states.", method, len(states))
+        if on_done:
+            on_done(err)
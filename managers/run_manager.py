@@ -1,17 +1,25 @@
-import copy
+import logging
+from collections import OrderedDict
 from tkinter import messagebox
 from backend.Automata import Automata
+from backend.DeltaHistory import DeltaHistory
+from utils.lazy_history import LazyHistory
 from backend.Manager import Manager
+from backend.MemoryProfile import MemoryProfile
 from backend.Tape import Tape
-from backend.SymbolVector import SymbolVector
-from backend.Transition import Transition
-from utils.logger import operation_logger, error_logger
-from utils.constants import AppMode  
+from utils.automaton_hash import automaton_hash
+from utils import metrics
+from utils.logger import get_logger, error_logger
+from utils.constants import AppMode, COMPILED_AUTOMATA_CACHE
+
+operation_logger = get_logger("run")
 
 class RunManager:
     """
         Coordinates BFS logic, partial BFS updates, user actions (word add/remove),
         DB saving/loading, and tracks app_mode: 'drawing'/'running'.
+        history is a DeltaHistory: list-like, but snapshots are rebuilt on access, so
+        mutate them through history[-1] = snap or pad() rather than in place.
     """
     def __init__(self, automata_manager, db_manager, current_user):
         self.automata_manager = automata_manager
@@ -19,53 +27,135 @@ class RunManager:
         self.current_user = current_user
 
         self.words = []
-        self.history = []
+        self.history = DeltaHistory()
         self.current_step = 0
         self.manager = None
 
         self.running = False
         self.updated_during_run = False
-        self.history_backup = []
+        self.history_backup = DeltaHistory()
         self.updated_transitions = False
         self.app_mode = AppMode.DRAWING 
+        self.collect_stats = False      # count state expansions / transition matches for the heatmap
+        self.history_loaded = False     # history came from load_run: replay it instead of searching again
+        self.writer = None              # RunWriter for write-behind saves, set by the main window
+        self.compiled = OrderedDict()   # automaton_hash(layout=False) -> backend Automata (LRU, never mutated)
         
-        operation_logger.info(f"RunManager initialized for user: {self.current_user}")
-
+        operation_logger.info("RunManager initialized for user: %s", self.current_user)
+
+    def automaton_snapshot(self):
+        """ The GUI automaton as saved: states with positions, transitions with all their symbol vectors. """
+        states = [{
+            'name': s.name,
+            'x': s.x,
+            'y': s.y,
+            'is_start': s.is_start,
+            'is_accept': s.is_accept
+        } for s in self.automata_manager.states]
+        transitions = [{
+            'source': tr.source.name,
+            'target': tr.target.name,
+            'vectors': [list(vec) for vec in tr.transition_vectors]
+        } for tr in self.automata_manager.transitions]
+        return {'states': states, 'transitions': transitions}
+
+    def compile_automaton(self):
+        """
+            Backend Automata of the GUI automaton, reused from a small LRU keyed by its layout-free
+            content hash, so re-running an unchanged automaton (or a loaded one) skips the rebuild.
+            The cached Automata are shared: replace them, never mutate them.
+        """
+        snapshot = self.automaton_snapshot()
+        key = automaton_hash(snapshot, layout=False)
+        automata = self.compiled.get(key)
+        if automata is not None:
+            self.compiled.move_to_end(key)
+            operation_logger.debug("Compiled automaton reused (%s).", key[:12])
+            return automata
+        automata = Automata.from_description(snapshot)
+        self.compiled[key] = automata
+        if len(self.compiled) > COMPILED_AUTOMATA_CACHE:
+            self.compiled.popitem(last=False)
+        return automata
+
+    def search(self, snapshots):
+        """ Run the engine search from a history prefix, recording its span and work counters. """
+        with metrics.span("engine.search"):
+            history = self.manager.update(snapshots)
+        metrics.count("configurations_explored", len(self.manager.visited))
+        metrics.count("duplicates_hit", self.manager.duplicates)
+        metrics.count("transitions_tested", self.manager.transitions_tested)
+        return history
+
+    @metrics.traced("run.initialize_backend")
     def initialize_backend(self):
         """ Initialize the backend automata and manager based on current states and transitions. """
         try:
-            automata = Automata()
-            for gui_state in self.automata_manager.states:
-                automata.add_state(gui_state.name, is_accept=gui_state.is_accept)
-                if gui_state.is_start:
-                    automata.set_start_state(gui_state.name)
-
-            for gui_tr in self.automata_manager.transitions:
-                source = gui_tr.source.name
-                target = gui_tr.target.name
-                for vec in gui_tr.transition_vectors:
-                    sym_vec = SymbolVector(list(vec))
-                    for c in vec:
-                        automata.alphabet.add(c)
-                    b_tr = Transition(fromState=source, symbols_vector=sym_vec, targetState=target)
-                    automata.add_transition(b_tr)
+            automata = self.compile_automaton()
 
             tapes = [Tape(w) for w in self.words]
-            self.manager = Manager(automata, tapes)
+            self.manager = Manager(automata, tapes, collect_stats=self.collect_stats)
             operation_logger.info("Backend Automata and Manager initialized.")
 
-            if automata.start_state is None:
-                self.history = []
+            if self.history_loaded and self.history:
+                # Replay the saved run; its (possibly lazy) history is kept as it is
+                self.history_loaded = False
+                self.current_step = 0
+                operation_logger.info("Backend initialized for a loaded run history.")
+            elif automata.start_state is None:
+                self.history = DeltaHistory()
                 self.current_step = 0
                 operation_logger.warning("Automata has no start state. History cleared.")
             else:
                 snap = [automata.start_state] + [0] * len(tapes)
-                self.history = self.manager.update([snap])
+                self.history = self.search([snap])
                 self.current_step = 0
                 operation_logger.info("Initial history snapshot created.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to initialize backend: {e}")
-            error_logger.error(f"Failed to initialize backend: {e}")
+            error_logger.error("Failed to initialize backend: %s", e)
+
+    def search_stats(self):
+        """
+            Search counters of the current backend run for the heatmap overlay:
+            (state name -> expansions, (source name, target name) -> transition matches).
+            Returns None if no run was made with collect_stats enabled.
+        """
+        if not self.manager or not self.manager.collect_stats:
+            return None
+        edges = {}
+        for tr, count in self.manager.transition_matches.items():
+            key = (tr.fromState, tr.targetState)
+            edges[key] = edges.get(key, 0) + count
+        return dict(self.manager.state_visits), edges
+
+    def collect_search_stats(self):
+        """ Re-run the search of the current run with counters enabled, keeping the playback position. """
+        self.collect_stats = True
+        if self.manager and not self.manager.collect_stats:
+            step = self.current_step
+            self.initialize_backend()
+            self.current_step = min(step, len(self.history))
+            operation_logger.info("Search re-run with statistics collection.")
+        return self.search_stats()
+
+    def profile_memory(self):
+        """
+            Search the current words again with a MemoryProfile (tracemalloc), on a separate Manager
+            so the run and its playback position are untouched. Returns the profile, or None if there
+            are no words or no start state.
+        """
+        if not self.words:
+            return None
+        automata = self.compile_automaton()
+        if automata.start_state is None:
+            return None
+        profile = MemoryProfile()
+        manager = Manager(automata, [Tape(w) for w in self.words], memory_profile=profile)
+        manager.update([[automata.start_state] + [0] * len(self.words)])
+        operation_logger.info("Memory profile: peak %s traced bytes over %s BFS levels.",
+                              profile.peak_traced, len(profile.levels))
+        return profile
 
     def load_history(self):
         """ Return the current history. """
@@ -75,15 +165,12 @@ class RunManager:
     def __update_run_history(self, new_word=True):
         """ Update the run history when words are added or removed during a run. """
         self.history_backup = self.history[:self.current_step]
-        for snap in self.history_backup:
-            while len(snap) < (len(self.words) + 1):
-                if new_word:
-                    snap.append(0)
-                else:
-                    break
+        if new_word:
+            self.history_backup.pad(len(self.words) + 1)
         self.updated_during_run = True
         operation_logger.debug("Run history updated during run.")
 
+    @metrics.traced("run.simulate_from_updated_history")
     def simulate_from_updated_history(self):
         """ Simulate BFS steps from the updated history backup. """
         if not self.manager or not self.history_backup:
@@ -93,40 +180,52 @@ class RunManager:
         positions = last_snap[1:]
         for i, tape in enumerate(self.manager.tapes):
             if i < len(positions):
-                pos = positions[i]
-                tape.currentPos = pos
-                tape.symbol = tape.symbols[pos] if pos < len(tape.symbols) else '#'
+                tape.currentPos = positions[i]
 
-        self.history = self.manager.update(copy.deepcopy(self.history_backup))
+        self.history = self.search(self.history_backup)
         self.current_step = len(self.history_backup)
         self.updated_during_run = False
         operation_logger.debug("Simulated BFS from updated history.")
 
     def add_word(self, new_word):
         """ Add a new word to the simulation. """
-        if not new_word:
-            return
-        self.words.append(new_word)
-        operation_logger.info(f"Word added: {new_word}")
+        self.add_words([new_word])
+
+    def add_words(self, batch):
+        """
+            Add many words (any iterable, e.g. a file stream) in one batch.
+            During a run the history is padded and re-simulated once for the whole batch.
+            Returns the number of words added.
+        """
+        added = [w for w in batch if w]
+        if not added:
+            return 0
+        self.words.extend(added)
+        if len(added) == 1:
+            operation_logger.info("Word added: %s", added[0])
+        else:
+            operation_logger.info("%s words added.", len(added))
         if self.running:
+            if self.manager:
+                self.manager.tapes.extend(Tape(w) for w in added)
+                operation_logger.info("%s word(s) added to manager tapes.", len(added))
             self.__update_run_history(new_word=True)
             self.simulate_from_updated_history()
-            if self.manager:
-                self.manager.tapes.append(Tape(new_word))
-                operation_logger.info(f"Word added to manager tapes: {new_word}")
+        return len(added)
 
     def change_word(self, idx, new_word):
         """ Change an existing word in the simulation. """
         if 0 <= idx < len(self.words):
             old_word = self.words[idx]
             self.words[idx] = new_word
-            operation_logger.info(f"Word changed from {old_word} to {new_word} at index {idx}")
+            operation_logger.info("Word changed from %s to %s at index %s", old_word, new_word, idx)
             if self.running:
                 partial = self.history[:self.current_step]
                 if partial:
                     last_snap = partial[-1]
                     if (idx + 1) < len(last_snap):
                         last_snap[idx + 1] = 0
+                        partial[-1] = last_snap
                 self.history_backup = partial
                 if self.manager:
                     self.manager.tapes[idx].symbols = new_word
@@ -140,12 +239,12 @@ class RunManager:
             removed_word = self.words.pop()
             if self.manager and self.manager.tapes:
                 self.manager.tapes.pop()
-            operation_logger.info(f"Word removed: {removed_word}")
+            operation_logger.info("Word removed: %s", removed_word)
         else:
             removed_word = self.words.pop(idx)
             if self.manager and idx < len(self.manager.tapes):
                 self.manager.tapes.pop(idx)
-            operation_logger.info(f"Word removed at index {idx}: {removed_word}")
+            operation_logger.info("Word removed at index %s: %s", idx, removed_word)
 
         if self.running:
             self.__update_run_history(new_word=False)
@@ -162,7 +261,8 @@ class RunManager:
         if self.current_step < len(self.history):
             snap = self.history[self.current_step]
             self.current_step += 1
-            operation_logger.debug(f"BFS step performed: {snap}")
+            if operation_logger.isEnabledFor(logging.DEBUG):
+                operation_logger.debug("BFS step performed: %s", snap)
             return snap
         else:
             self.running = False
@@ -170,6 +270,22 @@ class RunManager:
             operation_logger.info("BFS simulation completed all steps.")
             return None
 
+    def seek(self, index):
+        """
+            Jump to history snapshot index (clamped to the available range) without
+            replaying the steps in between. The following step() continues after it.
+            Returns the snapshot, or None if there is no history.
+        """
+        if self.updated_transitions:
+            self.update_transitions_in_backend()
+            self.updated_transitions = False
+        if not self.history:
+            return None
+        index = max(0, min(index, len(self.history) - 1))
+        self.current_step = index + 1
+        operation_logger.debug("BFS seeked to step %s", index)
+        return self.history[index]
+
     def is_accepted(self):
         """ Check if the BFS simulation ended in an accepting state. """
         if not self.history:
@@ -200,7 +316,8 @@ class RunManager:
 
     def restart(self):
         """ Restart the BFS simulation. """
-        self.history.clear()
+        self.history = DeltaHistory()    # rebound, not cleared: a queued save may still hold it
+        self.history_loaded = False
         self.current_step = 0
         self.running = False
         self.updated_during_run = False
@@ -213,7 +330,8 @@ class RunManager:
         self.automata_manager.states.clear()
         self.automata_manager.transitions.clear()
         self.automata_manager.word_count = 1
-        self.history.clear()
+        self.history = DeltaHistory()    # rebound, not cleared: a queued save may still hold it
+        self.history_loaded = False
         self.current_step = 0
         self.running = False
         self.updated_during_run = False
@@ -224,95 +342,70 @@ class RunManager:
         """ Update transitions in the backend Automata based on GUI transitions. """
         if not self.manager or not self.manager.automata:
             return
-        self.manager.automata.transitions.clear()
         self.history_backup = self.history[:self.current_step]
-
-        for gui_tr in self.automata_manager.transitions:
-            source = gui_tr.source.name
-            target = gui_tr.target.name
-            for vec in gui_tr.transition_vectors:
-                sym_vec = SymbolVector(list(vec))
-                for c in vec:
-                    self.manager.automata.alphabet.add(c)
-                b_tr = Transition(fromState=source, symbols_vector=sym_vec, targetState=target)
-                self.manager.automata.add_transition(b_tr)
+        # Swap in the compiled automaton instead of editing it: compiled automata are cached and shared
+        self.manager.automata = self.compile_automaton()
+        self.manager.accepting_states = self.manager.automata.accept_states
         operation_logger.info("Backend transitions updated based on GUI.")
 
         self.simulate_from_updated_history()
 
-    def save_current_run(self, description=""):
-        """ Save the current run history to the database. Serialize the run. """
+    def save_current_run(self, description="", on_done=None, on_error=None):
+        """
+            Save the current run history to the database. Serialize the run.
+            With a RunWriter the run is queued and written in the background, and on_done() /
+            on_error(exc) are called on the Tk thread; otherwise it is saved synchronously.
+        """
         try:
-            st_list = []
-            for s in self.automata_manager.states:
-                st_list.append({
-                    'name': s.name,
-                    'x': s.x,
-                    'y': s.y,
-                    'is_start': s.is_start,
-                    'is_accept': s.is_accept
-                })
-            tr_list = []
-            for tr in (self.manager.automata.transitions if self.manager else self.automata_manager.transitions):
-                tr_list.append({
-                    'source': (tr.fromState if self.manager else tr.source.name),
-                    'target': (tr.targetState if self.manager else tr.target.name),
-                    'vectors': (tr.symbolsVector.vector if self.manager else tr.transition_vectors)
-                })
-
-            automaton_data = {
-                'states': st_list,
-                'transitions': tr_list,
-                'word_count': self.automata_manager.word_count,
-                'words': self.words
-            }
+            automaton_data = self.automaton_snapshot()
+            automaton_data['word_count'] = self.automata_manager.word_count
+            automaton_data['words'] = list(self.words)
             history_data = self.history
+            if self.writer is not None:
+                self.writer.save(self.current_user, automaton_data, history_data, description, on_done, on_error)
+                operation_logger.info("Run history queued for saving with description: %s", description)
+                return
             self.db_manager.save_run_history(
                 username=self.current_user,
                 automaton_data=automaton_data,
                 history_data=history_data,
                 description=description
             )
-            operation_logger.info(f"Run history saved with description: {description}")
+            operation_logger.info("Run history saved with description: %s", description)
+            if on_done:
+                on_done()
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save run history: {e}")
-            error_logger.error(f"Exception occurred while saving run history: {e}")
+            if on_error:
+                on_error(e)
+            else:
+                messagebox.showerror("Error", f"Failed to save run history: {e}")
+            error_logger.error("Exception occurred while saving run history: %s", e)
 
     def load_run(self, automaton_data, history_data):
-        """ Load a run history from the database. Unserializing the data"""
+        """
+            Load a run history from the database. Unserializing the data.
+            A chunked history stays a LazyHistory, so long runs open without reading every chunk.
+            Returns the loaded history.
+        """
         try:
             self.words.clear()
-            self.automata_manager.states.clear()
-            self.automata_manager.transitions.clear()
-
-            for st in automaton_data['states']:
-                self.automata_manager.add_state(
-                    name=st['name'],
-                    x=st['x'],
-                    y=st['y'],
-                    is_start=st['is_start'],
-                    is_accept=st['is_accept']
-                )
-            for tdata in automaton_data['transitions']:
-                src = None
-                tgt = None
-                for s in self.automata_manager.states:
-                    if s.name == tdata['source']:
-                        src = s
-                    if s.name == tdata['target']:
-                        tgt = s
-                if src and tgt:
-                    self.automata_manager.add_transition(src, tgt, [tuple(tdata['vectors'])])
-
+            self.automata_manager.load_snapshot(
+                automaton_data['states'],
+                automaton_data['transitions'],
+                automaton_data.get('word_count', 1)
+            )
             self.words = automaton_data.get('words', [])
-            wc = automaton_data.get('word_count', 1)
-            self.automata_manager.set_word_count(wc)
 
-            self.history = history_data
+            if isinstance(history_data, (DeltaHistory, LazyHistory)):
+                self.history = history_data
+            else:
+                self.history = DeltaHistory(history_data)
+            self.history_loaded = True
             self.current_step = 0
             self.running = False
             self.app_mode = AppMode.DRAWING
             operation_logger.info("Run history loaded successfully.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load run history: {e}")
-            error_logger.error(f"Exception occurred while loading run history: {e}")
+            error_logger.error("Exception occurred while loading run history: %s", e)
+        return self.history
@@ -0,0 +1,127 @@
+import atexit
+import queue
+import threading
+from utils.constants import WRITE_BATCH_MAX, WRITE_BATCH_WINDOW_MS, WRITE_POLL_MS
+from utils.logger import get_logger, error_logger
+
+operation_logger = get_logger("db")
+
+class RunWriter:
+    """
+        Write-behind persistence for saved runs. save() only queues the run; a dedicated writer
+        thread encodes it and commits it on its own long-lived connection, grouping the saves
+        that arrive close together into one transaction. Completion and failure callbacks are
+        handed back through a queue that the Tk thread polls with after(), like LayoutManager.
+        close() (window close, or atexit as a fallback) flushes the pending writes.
+    """
+    def __init__(self, widget, db_manager):
+        self.widget = widget
+        self.db_manager = db_manager
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0            # saves not yet reported back (Tk thread only)
+        self.polling = False
+        self.worker = None
+        self.closed = False
+
+    def save(self, username, automaton_data, history_data, description="", on_done=None, on_error=None):
+        """
+            Queue a run for saving. The data must not be mutated afterwards (RunManager rebinds
+            its history instead of clearing it). on_done() / on_error(exc) run on the Tk thread.
+        """
+        if self.closed:
+            raise RuntimeError("RunWriter is closed")
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, name="run-writer", daemon=True)
+            self.worker.start()
+            atexit.register(self.close)
+        self.pending += 1
+        self.jobs.put((username, automaton_data, history_data, description, on_done, on_error))
+        if not self.polling:
+            self.polling = True
+            self.widget.after(WRITE_POLL_MS, self._poll)
+
+    def _run(self):
+        """ Writer thread body: no Tk calls here. """
+        sess = self.db_manager.writer_session()
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    self.jobs.task_done()
+                    return
+                batch = [job]
+                stop = False
+                # Give saves made in quick succession a moment to join the same transaction
+                while len(batch) < WRITE_BATCH_MAX:
+                    try:
+                        job = self.jobs.get(timeout=WRITE_BATCH_WINDOW_MS / 1000)
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stop = True
+                        break
+                    batch.append(job)
+                self._write(sess, batch)
+                for _ in range(len(batch) + stop):
+                    self.jobs.task_done()
+                if stop:
+                    return
+        finally:
+            self.db_manager.close_writer_session(sess)
+
+    def _write(self, sess, batch):
+        """ Commit a batch in one transaction; if that fails, retry the saves one by one to isolate the bad one. """
+        try:
+            for username, automaton_data, history_data, description, _, _ in batch:
+                self.db_manager.add_run_history(sess, username, automaton_data, history_data, description)
+            sess.commit()
+        except Exception as e:
+            sess.rollback()
+            if len(batch) > 1:
+                operation_logger.info("Batched save of %s runs failed (%s), retrying one by one.", len(batch), e)
+                for job in batch:
+                    self._write(sess, [job])
+                return
+            self.results.put((batch[0], e))
+            return
+        operation_logger.info("Saved %s run histories in one transaction.", len(batch))
+        for job in batch:
+            self.results.put((job, None))
+
+    def _poll(self):
+        """ Tk thread: deliver finished saves, keep polling while some are outstanding. """
+        self.deliver()
+        if self.pending:
+            self.widget.after(WRITE_POLL_MS, self._poll)
+        else:
+            self.polling = False
+
+    def deliver(self, callbacks=True):
+        """ Run the callbacks of all finished saves (Tk thread); only log them when callbacks is False. """
+        while True:
+            try:
+                job, err = self.results.get_nowait()
+            except queue.Empty:
+                return
+            self.pending -= 1
+            username, _, _, description, on_done, on_error = job
+            if err is None:
+                operation_logger.info("Run history saved for user: %s, Description: %s", username, description)
+                if callbacks and on_done:
+                    on_done()
+            else:
+                error_logger.error("Failed to save run history '%s' for user %s: %s", description, username, err)
+                if callbacks and on_error:
+                    on_error(err)
+
+    def close(self):
+        """ Flush the pending saves and stop the writer thread. Safe to call more than once. """
+        if self.closed:
+            return
+        self.closed = True
+        if self.worker is not None and self.worker.is_alive():
+            self.jobs.put(None)
+            self.worker.join()
+            operation_logger.info("Run writer flushed and stopped.")
+        self.deliver(callbacks=False)   # the GUI is going away, just log the outcomes
@@ -0,0 +1,53 @@
+import hashlib
+import json
+
+RUN_KEYS = ("words", "word_count")  # per-run parts of a saved automaton description
+
+def split_automaton(data):
+    """
+        Split a saved automaton description into (automaton, run_part):
+        the states and transitions, which many runs share, and the words of this run.
+    """
+    automaton = {k: v for k, v in data.items() if k not in RUN_KEYS}
+    run_part = {k: data[k] for k in RUN_KEYS if k in data}
+    return automaton, run_part
+
+def canonical_transitions(transitions):
+    """
+        Transitions in one form whichever way they were saved: one entry per (source, target)
+        pair with all its vectors sorted. Older saves have one entry per vector ("vectors" is a
+        single vector), newer ones one entry per GUI transition with a list of vectors.
+    """
+    merged = {}
+    for tr in transitions:
+        vectors = tr.get("vectors", [])
+        if vectors and not isinstance(vectors[0], (list, tuple)):
+            vectors = [vectors]
+        key = (str(tr.get("source")), str(tr.get("target")))
+        merged.setdefault(key, []).extend(list(vec) for vec in vectors)
+    return [{"source": src, "target": tgt, "vectors": sorted(vectors, key=lambda vec: [str(sym) for sym in vec])}
+            for (src, tgt), vectors in sorted(merged.items())]
+
+def canonical_automaton(automaton, layout=True):
+    """
+        Canonical JSON bytes of an automaton: states sorted by name, transitions merged per
+        state pair (canonical_transitions) and sorted, compact separators and sorted keys, so
+        equal automata always give equal bytes, in either save format.
+        With layout=False the state positions are left out.
+    """
+    states = [dict(st) for st in automaton.get("states", [])]
+    if not layout:
+        for st in states:
+            st.pop("x", None)
+            st.pop("y", None)
+    states.sort(key=lambda st: str(st.get("name")))
+    transitions = canonical_transitions(automaton.get("transitions", []))
+    canonical = dict(automaton, states=states, transitions=transitions)
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def automaton_hash(automaton, layout=True):
+    """
+        SHA-256 hex digest of the canonical automaton: the key of the automata table and,
+        with layout=False, of RunManager's cache of compiled backend automata.
+    """
+    return hashlib.sha256(canonical_automaton(automaton, layout)).hexdigest()
@@ -6,22 +6,74 @@ COLOR_GREEN = "#008000"
 COLOR_RT_BG = "#e0e0ff"
 COLOR_DT_BG = "#f0f0f0"
 COLOR_CS_BG = "#e7fff7"
+HEATMAP_COLD = "#ffffff"    # state fill for states the search never expanded
+HEATMAP_HOT = "#ff4500"     # state fill for the most expanded state
+HEATMAP_MAX_WIDTH = 10      # line width of the most matched transition
 
 IMG_SIZE = (25, 25)
+ASSETS_DIR = "assets"
+ICON_CACHE_DIR = "assets/cache"  # icons pre-resized to IMG_SIZE (see utils/icons.py)
 
 PARALLEL_OFFSET = 13
 STATE_RADIUS = 30
 
+# viewport culling / level of detail
+VIEWPORT_CELL_SIZE = 200        # grid cell size (model units) of the viewport spatial index
+VIEWPORT_MARGIN = 50            # items this close to the visible region are drawn too
+VIEWPORT_MAX_EDGE_CELLS = 64    # transitions covering more cells are tested individually
+LOD_ZOOM_THRESHOLD = 0.6        # below this zoom labels are hidden and parallel edges bundled
+
+# auto layout
+LAYOUT_EDGE_LENGTH = 120        # ideal distance between connected states (model units)
+LAYOUT_ITERATIONS = 80
+LAYOUT_EXACT_LIMIT = 800        # above this many states repulsion uses the grid approximation
+LAYOUT_CELL_OCCUPANCY = 8       # target states per grid cell for the approximation
+LAYOUT_CELL_CAP = 32            # states per cell repelled exactly; the rest of a crowded cell acts through its centroid
+LAYOUT_GRID_CLIP = 1            # percent of states on each side outside the grid extent (clipped to its border)
+LAYOUT_MARGIN = 60
+LAYOUT_LAYER_GAP = 160
+LAYOUT_NODE_GAP = 90
+LAYOUT_POLL_MS = 50
+WORKLOAD_STATE_GAP = 120   # grid spacing of the states of generated automata (utils/workloads)
+
 RUN_PAUSES_MS = 600
+PLAYBACK_SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16, 64, 256)  # multiples of 1 step per RUN_PAUSES_MS
+PLAYBACK_MIN_FRAME_MS = 16   # faster playback advances several steps per frame and draws only the last
+DRAG_FRAME_MS = 16  # ~60 fps; drag motion events are coalesced to one canvas update per frame
+
+RUN_HISTORY_PAGE_SIZE = 50  # saved runs per page in the load dialog
+HISTORY_CHUNK_SIZE = 4096   # snapshots per stored chunk; longer histories are saved in chunks
+HISTORY_CHUNK_CACHE = 8     # decoded chunks kept in memory by a LazyHistory
+WRITE_BATCH_MAX = 16        # saves grouped into one transaction by the run writer
+WRITE_BATCH_WINDOW_MS = 50  # how long the run writer waits for more saves before committing
+WRITE_POLL_MS = 100         # how often the GUI checks for finished saves
+COMPILED_AUTOMATA_CACHE = 8 # backend automata kept by RunManager, keyed by content hash
 
 EMPTY_SETUP = "State: ???"
+TAPE_WINDOW = 30      # characters of each tape shown around the head in Current Setup
+TAPE_CONTEXT = 8      # characters kept visible to the left of the head
+WORD_ROW_HEIGHT = 18  # pixel height of a row in the words list
+WORD_PREVIEW_CHARS = 120  # longer words are cut off in the words list
 
 #logger
 LOG_DIR = 'logs'
+LOG_LEVELS = {          # per-subsystem levels of the operation_logger children (utils/logger.get_logger)
+    "canvas": "INFO",   # drawing board, states, transitions, viewport, editing tools
+    "run": "INFO",      # BFS runs, playback, words, current setup
+    "db": "INFO",       # database, saves, history chunks
+    "layout": "INFO",
+    "ui": "INFO",       # main window, login, toolbars
+}
+LOG_LEVELS_ENV = "HYPER_AUTOMATA_LOG"  # overrides, e.g. "canvas=DEBUG,run=WARNING"
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 ERROR_LOG = "error_log.log"
 OTHER_LOG = "app_log.log"
 
+#metrics
+METRICS_ENV = "HYPER_AUTOMATA_METRICS"  # output file of utils/metrics; .prom for Prometheus text, else JSON
+METRICS_PREFIX = "hyper_automata"       # prefix of the exported Prometheus metric names
+METRICS_RECENT_SPANS = 256              # individual spans kept for the JSON export
+
 #enum for application state.
 class AppMode(Enum):
     DRAWING = "drawing"
@@ -0,0 +1,243 @@
+"""
+Compact binary format for saved runs.
+
+Every blob starts with a fixed header:
+    MAGIC (4 bytes) | version (u8) | kind (u8) | flags (u8)
+followed by the payload, zlib-compressed when FLAG_ZLIB is set.
+
+KIND_HISTORY payload (all integers little-endian):
+    u32 table length | JSON list of the distinct state names (interned table)
+    u32 snapshot count | u16 width (max positions per snapshot)
+    typecode of the state index array | state indices, one per snapshot
+    typecode of the position array | positions, width per snapshot,
+    shorter snapshots padded with the largest value of the typecode (sentinel)
+KIND_DELTA payload (a backend DeltaHistory):
+    u32 length | JSON [move table, explicit snapshots as [index, snapshot] pairs]
+    u32 snapshot count | typecode of the move array | move per snapshot,
+    explicit snapshots marked with the largest value of the typecode
+KIND_JSON payload: compact UTF-8 JSON (used for the automaton description).
+
+Blobs without MAGIC are treated as legacy JSON text.
+"""
+import gc
+import json
+import struct
+import sys
+import zlib
+from array import array
+from contextlib import contextmanager
+from itertools import chain
+from operator import itemgetter
+from backend.DeltaHistory import DeltaHistory
+
+MAGIC = b"HAUT"
+VERSION = 1
+KIND_HISTORY = 1
+KIND_JSON = 2
+KIND_DELTA = 3
+FLAG_ZLIB = 0x01
+
+_HEADER = struct.Struct("<4sBBB")
+_U32 = struct.Struct("<I")
+_COUNTS = struct.Struct("<IH")
+_TYPECODES = (("B", 0xFF), ("H", 0xFFFF), ("I", 0xFFFFFFFF), ("Q", 0xFFFFFFFFFFFFFFFF))
+
+class HistoryCodecError(ValueError):
+    """ Raised for blobs that are truncated, of an unknown version or of the wrong kind. """
+
+def is_encoded(blob):
+    """ Whether blob is in the binary format (as opposed to legacy JSON text). """
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[:4]) == MAGIC
+
+def encode_history(history, compress=True):
+    """ Encode a list of [state, pos, pos, ...] snapshots, or a DeltaHistory as its moves. """
+    if isinstance(history, DeltaHistory):
+        return _encode_delta(history, compress)
+    index = {}
+    states = [index.setdefault(snap[0], len(index)) for snap in history]
+    names = list(index)
+    width = max(map(len, history), default=1) - 1
+    tails = map(itemgetter(slice(1, None)), history)
+    if all(len(snap) == width + 1 for snap in history):
+        flat = list(chain.from_iterable(tails))
+        top = max(flat, default=0)
+        pos_code, sentinel = _typecode_with_sentinel(top)
+    else:
+        # Snapshots taken before a word was added are shorter: pad them with the sentinel
+        flat = [tail + [None] * (width - len(tail)) for tail in map(list, tails)]
+        flat = list(chain.from_iterable(flat))
+        top = max((p for p in flat if p is not None), default=0)
+        pos_code, sentinel = _typecode_with_sentinel(top)
+        flat = [sentinel if p is None else p for p in flat]
+
+    state_arr = array(_typecode(len(names)), states)
+    positions = array(pos_code, flat)
+    table = json.dumps(names, separators=(",", ":")).encode("utf-8")
+    payload = b"".join((
+        _U32.pack(len(table)), table,
+        _COUNTS.pack(len(history), width),
+        state_arr.typecode.encode("ascii"), _to_le(state_arr),
+        positions.typecode.encode("ascii"), _to_le(positions),
+    ))
+    return _wrap(KIND_HISTORY, payload, compress)
+
+def decode_history(blob):
+    """
+        Decode a history blob (or legacy JSON text) back to a list of lists,
+        or to a DeltaHistory if one was encoded.
+    """
+    if not is_encoded(blob):
+        return json.loads(blob)
+    if _kind(blob) == KIND_DELTA:
+        return _decode_delta(blob)
+    data = memoryview(_unwrap(blob, KIND_HISTORY))
+    try:
+        (table_len,) = _U32.unpack_from(data, 0)
+        offset = _U32.size
+        names = json.loads(bytes(data[offset:offset + table_len]).decode("utf-8"))
+        offset += table_len
+        count, width = _COUNTS.unpack_from(data, offset)
+        offset += _COUNTS.size
+        states, offset = _read_array(data, offset, count)
+        positions, offset = _read_array(data, offset, count * width)
+    except (struct.error, IndexError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HistoryCodecError(f"Corrupt history blob: {e}") from None
+
+    # Column-wise: one slice of the flat positions per tape, zipped with the state names into rows
+    flat = positions.tolist()
+    columns = [flat[i::width] for i in range(width)]
+    with _gc_paused():
+        history = list(map(list, zip(map(names.__getitem__, states), *columns)))
+    if width:
+        # Padding sits at the end of a row, so only rows whose last position is the sentinel are stripped
+        sentinel = dict(_TYPECODES)[positions.typecode]
+        last = columns[-1]
+        if sentinel in last:
+            for i in [i for i, p in enumerate(last) if p == sentinel]:
+                snap = history[i]
+                while len(snap) > 1 and snap[-1] == sentinel:
+                    snap.pop()
+    return history
+
+@contextmanager
+def _gc_paused():
+    """
+        Pause the cyclic garbage collector while one list per snapshot is built: the rows cannot form
+        cycles, but every allocation counts towards a collection that walks all the rows built so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _encode_delta(history, compress):
+    """ Encode a DeltaHistory: its move table, explicit snapshots and one move index per snapshot. """
+    table, explicit, moves = history.to_parts()
+    code, sentinel = _typecode_with_sentinel(max(len(table) - 1, 0))
+    packed = array(code, (sentinel if m == DeltaHistory.EXPLICIT else m for m in moves))
+    header = json.dumps([[[state, list(mask)] for state, mask in table],
+                         [[i, list(snap)] for i, snap in sorted(explicit.items())]],
+                        separators=(",", ":")).encode("utf-8")
+    payload = b"".join((
+        _U32.pack(len(header)), header,
+        _U32.pack(len(moves)), packed.typecode.encode("ascii"), _to_le(packed),
+    ))
+    return _wrap(KIND_DELTA, payload, compress)
+
+def _decode_delta(blob):
+    """ Rebuild a DeltaHistory (keyframes included) from a KIND_DELTA blob. """
+    data = memoryview(_unwrap(blob, KIND_DELTA))
+    try:
+        (header_len,) = _U32.unpack_from(data, 0)
+        offset = _U32.size
+        table, explicit = json.loads(bytes(data[offset:offset + header_len]).decode("utf-8"))
+        offset += header_len
+        (count,) = _U32.unpack_from(data, offset)
+        moves, offset = _read_array(data, offset + _U32.size, count)
+        sentinel = dict(_TYPECODES)[moves.typecode]
+        return DeltaHistory.from_parts(
+            table, {i: snap for i, snap in explicit},
+            [DeltaHistory.EXPLICIT if m == sentinel else m for m in moves])
+    except (struct.error, IndexError, KeyError, TypeError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HistoryCodecError(f"Corrupt history blob: {e}") from None
+
+def encode_automaton(data, compress=True):
+    """ Encode the automaton description (any JSON-serialisable object). """
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return _wrap(KIND_JSON, payload, compress)
+
+def decode_automaton(blob):
+    """ Decode an automaton blob (or legacy JSON text). """
+    if not is_encoded(blob):
+        return json.loads(blob)
+    return json.loads(_unwrap(blob, KIND_JSON).decode("utf-8"))
+
+def _wrap(kind, payload, compress):
+    """ Prefix the header, compressing the payload if requested. """
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(MAGIC, VERSION, kind, flags) + payload
+
+def _kind(blob):
+    """ Kind byte of an encoded blob. """
+    if len(blob) < _HEADER.size:
+        raise HistoryCodecError("Blob is shorter than its header")
+    return _HEADER.unpack_from(bytes(blob[:_HEADER.size]), 0)[2]
+
+def _unwrap(blob, kind):
+    """ Validate the header and return the (decompressed) payload. """
+    blob = bytes(blob)
+    if len(blob) < _HEADER.size:
+        raise HistoryCodecError("Blob is shorter than its header")
+    _, version, blob_kind, flags = _HEADER.unpack_from(blob, 0)
+    if version > VERSION:
+        raise HistoryCodecError(f"Unsupported format version {version}")
+    if blob_kind != kind:
+        raise HistoryCodecError(f"Expected blob kind {kind}, got {blob_kind}")
+    payload = blob[_HEADER.size:]
+    if flags & FLAG_ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise HistoryCodecError(f"Corrupt compressed payload: {e}") from None
+    return payload
+
+def _typecode(count):
+    """ Smallest unsigned array typecode able to index count items. """
+    for code, limit in _TYPECODES:
+        if count <= limit + 1:
+            return code
+    raise HistoryCodecError("Too many states to encode")
+
+def _typecode_with_sentinel(top):
+    """ Smallest unsigned typecode holding values up to top, with its maximum left free as padding. """
+    for code, limit in _TYPECODES:
+        if top < limit:
+            return code, limit
+    raise HistoryCodecError("Tape position too large to encode")
+
+def _to_le(arr):
+    """ Raw little-endian bytes of an array. """
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+def _read_array(data, offset, count):
+    """ Read a typecode byte and count little-endian items starting at offset. """
+    code = bytes(data[offset:offset + 1]).decode("ascii")
+    if code not in dict(_TYPECODES):
+        raise HistoryCodecError(f"Unknown array typecode {code!r}")
+    arr = array(code)
+    end = offset + 1 + count * arr.itemsize
+    if end > len(data):
+        raise HistoryCodecError("Truncated array")
+    arr.frombytes(data[offset + 1:end])
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr, end
@@ -0,0 +1,68 @@
+"""
+Toolbar icons, pre-resized once and cached.
+
+The source PNGs in assets/ are large; resizing them with PIL on every start is slow.
+load_icon() serves a copy resized to IMG_SIZE from ICON_CACHE_DIR through tk.PhotoImage,
+which reads PNG natively, so PIL is only imported to (re)build a missing or stale cache entry.
+Loaded images are also kept in memory, so both toolbars share one PhotoImage per icon.
+
+    python -m utils.icons    # rebuild the whole cache
+"""
+import os
+import tkinter as tk
+from utils.constants import IMG_SIZE, ICON_CACHE_DIR, ASSETS_DIR
+from utils.logger import error_logger
+
+_loaded = {}    # source path -> PhotoImage
+
+def cached_path(path, size=IMG_SIZE):
+    """ Location of the resized copy of an icon. """
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(ICON_CACHE_DIR, f"{name}_{size[0]}x{size[1]}.png")
+
+def build_cached(path, size=IMG_SIZE):
+    """ Resize an icon with PIL and write it to the cache. Returns the cached path, or None if it cannot be written. """
+    from PIL import Image
+    target = cached_path(path, size)
+    with Image.open(path) as img:
+        small = img.resize(size)
+    try:
+        os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+        small.save(target)
+    except OSError as e:
+        error_logger.error("Cannot write icon cache %s: %s", target, e)
+        return None
+    return target
+
+def load_icon(path, size=IMG_SIZE):
+    """ PhotoImage of an icon resized to size, or None if it cannot be loaded. """
+    image = _loaded.get(path)
+    if image is not None:
+        return image
+    try:
+        target = cached_path(path, size)
+        if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+            target = build_cached(path, size)
+        if target is None:     # read-only install: resize in memory
+            from PIL import Image, ImageTk
+            with Image.open(path) as img:
+                image = ImageTk.PhotoImage(img.resize(size))
+        else:
+            image = tk.PhotoImage(file=target)
+    except Exception as e:
+        error_logger.error("Failed to load icon %s: %s", path, e)
+        return None
+    _loaded[path] = image
+    return image
+
+def build_cache():
+    """ Pre-resize every PNG in the assets directory. """
+    count = 0
+    for name in sorted(os.listdir(ASSETS_DIR)):
+        if name.lower().endswith(".png"):
+            if build_cached(os.path.join(ASSETS_DIR, name)):
+                count += 1
+    return count
+
+if __name__ == "__main__":
+    print(f"{build_cache()} icons written to {ICON_CACHE_DIR}")
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from backend.DeltaHistory import DeltaHistory
+from utils.constants import HISTORY_CHUNK_CACHE
+from utils.logger import get_logger
+
+operation_logger = get_logger("db")
+
+class LazyHistory:
+    """
+        Read-only, list-like view of a history saved in chunks of chunk_size snapshots.
+        fetch_chunk(start) returns the chunk beginning at snapshot start; chunks are fetched
+        on first access and the last HISTORY_CHUNK_CACHE decoded chunks are kept (LRU).
+        Prefix slices (history[:n], used when a run is edited) are materialised as a DeltaHistory.
+    """
+    def __init__(self, fetch_chunk, length, chunk_size, cache_size=HISTORY_CHUNK_CACHE):
+        self.fetch_chunk = fetch_chunk
+        self.length = length
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self.cache = OrderedDict()     # chunk number -> decoded chunk
+
+    def chunk(self, number):
+        """ Decoded chunk number, fetched if it is not cached. """
+        chunk = self.cache.get(number)
+        if chunk is not None:
+            self.cache.move_to_end(number)
+            return chunk
+        chunk = self.fetch_chunk(number * self.chunk_size)
+        self.cache[number] = chunk
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        operation_logger.debug("History chunk %s loaded (%s snapshots)", number, len(chunk))
+        return chunk
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.length)
+            if start == 0 and step == 1:
+                prefix = DeltaHistory()
+                for number in range(-(-stop // self.chunk_size)):
+                    chunk = self.chunk(number)
+                    end = min(self.chunk_size, stop - number * self.chunk_size)
+                    prefix.extend(chunk[:end])
+                return prefix
+            return [self[j] for j in range(start, stop, step)]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("history index out of range")
+        return self.chunk(i // self.chunk_size)[i % self.chunk_size]
+
+    def __iter__(self):
+        for number in range(-(-self.length // self.chunk_size)):
+            yield from self.chunk(number)
+
+    def chunks(self):
+        """ Yield the history as (start, chunk) pairs without going through the cache. """
+        for start in range(0, self.length, self.chunk_size):
+            yield start, self.cache.get(start // self.chunk_size) or self.fetch_chunk(start)
+
+    def clear(self):
+        """ Forget the history (RunManager.restart / clear_all). """
+        self.length = 0
+        self.cache.clear()
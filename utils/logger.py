@@ -1,27 +1,104 @@
+"""
+Application logging.
+
+operation_logger and error_logger are the two top-level loggers; subsystems log through
+children of operation_logger (get_logger("canvas") -> 'operation_logger.canvas'), so their
+levels can be set separately with LOG_LEVELS or the HYPER_AUTOMATA_LOG environment variable,
+e.g. HYPER_AUTOMATA_LOG="canvas=DEBUG,run=WARNING".
+
+The calling thread formats each record that passes the level check (QueueHandler.prepare
+interpolates the message and renders any traceback, so later changes to the arguments cannot
+alter it) and puts it on a queue; a QueueListener thread does the file I/O, so logging never
+blocks the Tk thread on disk. Pass arguments %-style (logger.info("State added: %s", name))
+so nothing is formatted for records below the level.
+"""
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
-from utils.constants import LOG_FORMAT, ERROR_LOG, OTHER_LOG, LOG_DIR
-
-# Ensure the logs directory exists
-os.makedirs(LOG_DIR, exist_ok=True)
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from utils.constants import LOG_FORMAT, ERROR_LOG, OTHER_LOG, LOG_DIR, LOG_LEVELS, LOG_LEVELS_ENV
 
 # Constants for log file paths
 OPERATION_LOG_FILE = os.path.join(LOG_DIR, OTHER_LOG)
 ERROR_LOG_FILE = os.path.join(LOG_DIR, ERROR_LOG)
 
-# Configure operation logger
+# Loggers are cheap to create; handlers are only attached by setup_logging(),
+# so importing a module never creates the logs directory or opens files.
 operation_logger = logging.getLogger('operation_logger')
 operation_logger.setLevel(logging.INFO)
-op_handler = RotatingFileHandler(OPERATION_LOG_FILE, maxBytes=5*1024*1024, backupCount=5)
-op_formatter = logging.Formatter(LOG_FORMAT)
-op_handler.setFormatter(op_formatter)
-operation_logger.addHandler(op_handler)
-
-# Configure error logger
 error_logger = logging.getLogger('error_logger')
 error_logger.setLevel(logging.ERROR)
-err_handler = RotatingFileHandler(ERROR_LOG_FILE, maxBytes=5*1024*1024, backupCount=5)
-err_formatter = logging.Formatter(LOG_FORMAT)
-err_handler.setFormatter(err_formatter)
-error_logger.addHandler(err_handler)
+
+_listener = None
+_queue_handler = None
+
+def get_logger(subsystem):
+    """ Operation logger of a subsystem ('canvas', 'run', 'db', ...), a child of operation_logger. """
+    return operation_logger.getChild(subsystem)
+
+def parse_levels(spec):
+    """
+        "canvas=DEBUG,run=WARNING" -> {"canvas": "DEBUG", "run": "WARNING"}; entries without a name or
+        a level are ignored. Level names are not checked here, configure_levels skips unknown ones.
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure_levels(levels):
+    """
+        Set subsystem levels from a {subsystem: level name} mapping ("" is operation_logger itself).
+        Unknown level names are skipped with a warning, so a typo in HYPER_AUTOMATA_LOG cannot stop the app.
+    """
+    for subsystem, level in levels.items():
+        if not isinstance(level, int) and not isinstance(logging.getLevelName(level), int):
+            operation_logger.warning("Ignoring unknown log level %r for %r.", level, subsystem or operation_logger.name)
+            continue
+        logger = get_logger(subsystem) if subsystem else operation_logger
+        logger.setLevel(level)
+
+def setup_logging(levels=None):
+    """
+        Route both loggers through a queue to the rotating log files (creating the logs directory)
+        and apply the subsystem levels: LOG_LEVELS, then HYPER_AUTOMATA_LOG, then levels.
+        Called once by the GUI entry point; calling it again only re-applies the levels.
+        Without it nothing is written to files and errors go to stderr.
+    """
+    global _listener, _queue_handler
+    configure_levels({**LOG_LEVELS, **parse_levels(os.environ.get(LOG_LEVELS_ENV, "")), **(levels or {})})
+    if _listener is not None:
+        return
+    os.makedirs(LOG_DIR, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+    op_handler = RotatingFileHandler(OPERATION_LOG_FILE, maxBytes=5*1024*1024, backupCount=5, delay=True)
+    op_handler.setFormatter(formatter)
+    # One queue feeds both files; each file handler only takes its own logger hierarchy
+    op_handler.addFilter(logging.Filter(operation_logger.name))
+    err_handler = RotatingFileHandler(ERROR_LOG_FILE, maxBytes=5*1024*1024, backupCount=5, delay=True)
+    err_handler.setFormatter(formatter)
+    err_handler.addFilter(logging.Filter(error_logger.name))
+
+    records = queue.SimpleQueue()
+    _queue_handler = QueueHandler(records)
+    operation_logger.addHandler(_queue_handler)
+    error_logger.addHandler(_queue_handler)
+    _listener = QueueListener(records, op_handler, err_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """ Write out the queued records, stop the listener thread and detach the queue. """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    operation_logger.removeHandler(_queue_handler)
+    error_logger.removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
@@ -0,0 +1,173 @@
+"""
+Lightweight tracing and metrics.
+
+Spans time a block of code, counters add up quantities:
+
+    with metrics.span("engine.search"):
+        history = manager.update(snapshots)
+    metrics.count("configurations_explored", len(manager.visited))
+
+Nothing is recorded until enable() is called: span() then hands out one shared no-op context
+manager, count() returns at once and traced() functions call straight through, so instrumented
+code pays a function call and a flag check and nothing else.
+setup_metrics() enables recording when HYPER_AUTOMATA_METRICS names an output file and writes it
+at exit, as Prometheus text for a .prom file and as JSON otherwise.
+Recording is thread-safe; the run writer saves on its own thread.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from utils.constants import METRICS_ENV, METRICS_PREFIX, METRICS_RECENT_SPANS
+
+_enabled = False
+_lock = threading.Lock()
+_started = time.perf_counter()
+_spans = {}         # name -> [count, total seconds, max seconds]
+_counters = {}      # name -> value
+_recent = deque(maxlen=METRICS_RECENT_SPANS)   # (name, start offset, duration, thread name)
+_NULL_SPAN = nullcontext()
+
+class _Span:
+    """ Times one block and records it under its name when the block exits. """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        record_span(self.name, self.start, end - self.start)
+        return False
+
+def enabled():
+    """ True if spans and counters are being recorded. """
+    return _enabled
+
+def enable():
+    """ Start recording (keeping anything recorded before). """
+    global _enabled
+    _enabled = True
+
+def disable():
+    """ Stop recording; what was recorded is kept until reset(). """
+    global _enabled
+    _enabled = False
+
+def reset():
+    """ Forget all recorded spans and counters. """
+    global _started
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _recent.clear()
+        _started = time.perf_counter()
+
+def span(name):
+    """ Context manager timing a block as span name; a shared no-op while recording is disabled. """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def traced(name):
+    """ Decorator recording every call of a function as span name. """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_span(name, start, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def record_span(name, start, duration):
+    """ Record a span measured elsewhere: start is a time.perf_counter() value, duration in seconds. """
+    if not _enabled:
+        return
+    with _lock:
+        entry = _spans.get(name)
+        if entry is None:
+            _spans[name] = [1, duration, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+            if duration > entry[2]:
+                entry[2] = duration
+        _recent.append((name, start - _started, duration, threading.current_thread().name))
+
+def count(name, value=1):
+    """ Add value to counter name. """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def snapshot():
+    """
+        Everything recorded so far as plain data: {"spans": {name: {count, total_s, max_s}},
+        "counters": {name: value}, "recent_spans": [{name, start_s, duration_s, thread}]}.
+    """
+    with _lock:
+        return {
+            "spans": {name: {"count": c, "total_s": total, "max_s": longest}
+                      for name, (c, total, longest) in sorted(_spans.items())},
+            "counters": dict(sorted(_counters.items())),
+            "recent_spans": [{"name": name, "start_s": start, "duration_s": duration, "thread": thread}
+                             for name, start, duration, thread in _recent],
+        }
+
+def _metric_name(name):
+    """ Prometheus-safe metric name: letters, digits and underscores. """
+    return "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in name)
+
+def prometheus_text():
+    """ The recorded spans and counters in the Prometheus text exposition format. """
+    data = snapshot()
+    span_metric = f"{METRICS_PREFIX}_span_seconds"
+    lines = [f"# HELP {span_metric} Time spent in instrumented operations.",
+             f"# TYPE {span_metric} summary"]
+    for name, s in data["spans"].items():
+        lines.append(f'{span_metric}_count{{span="{name}"}} {s["count"]}')
+        lines.append(f'{span_metric}_sum{{span="{name}"}} {s["total_s"]:.9f}')
+    lines.append(f"# HELP {span_metric}_max Longest single span.")
+    lines.append(f"# TYPE {span_metric}_max gauge")
+    for name, s in data["spans"].items():
+        lines.append(f'{span_metric}_max{{span="{name}"}} {s["max_s"]:.9f}')
+    for name, value in data["counters"].items():
+        metric = f"{METRICS_PREFIX}_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+def export(path):
+    """ Write the recorded metrics to path: Prometheus text for a .prom file, JSON otherwise. """
+    if path.endswith(".prom"):
+        text = prometheus_text()
+    else:
+        text = json.dumps(snapshot(), indent=2) + "\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def setup_metrics(path=None):
+    """
+        Enable recording if an output path is given or set in HYPER_AUTOMATA_METRICS,
+        and export to it when the interpreter exits. Returns the path, or None if disabled.
+    """
+    path = path or os.environ.get(METRICS_ENV)
+    if not path:
+        return None
+    enable()
+    atexit.register(export, path)
+    return path
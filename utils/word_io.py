@@ -0,0 +1,60 @@
+import json
+import os
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+def iter_words(path):
+    """
+        Stream words from a file without reading it whole.
+        Plain text: one word per non-empty line.
+        JSONL (.jsonl / .ndjson): each line is a string, a list of strings or {"word": ...}.
+        Raises ValueError naming the offending line for malformed JSONL.
+    """
+    jsonl = os.path.splitext(path)[1].lower() in JSONL_SUFFIXES
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if not jsonl:
+                yield line
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON ({e.msg})") from None
+            if isinstance(item, dict):
+                item = item.get("word")
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, list) and all(isinstance(w, str) for w in item):
+                yield from item
+            else:
+                raise ValueError(f"{path}:{lineno}: expected a string, a list of strings or {{\"word\": ...}}")
+
+def iter_word_tuples(lines, jsonl=False, source="<stdin>"):
+    """
+        Stream word tuples (one word per tape) from an iterable of lines, e.g. an open file or stdin.
+        Plain text: the words of a tuple separated by whitespace, one tuple per non-empty line.
+        JSONL: each line is a list of strings, a single string or {"words": [...]}.
+        Raises ValueError naming the offending line for malformed JSONL.
+    """
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if not jsonl:
+            yield line.split()
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{source}:{lineno}: invalid JSON ({e.msg})") from None
+        if isinstance(item, dict):
+            item = item.get("words")
+        if isinstance(item, str):
+            yield [item]
+        elif isinstance(item, list) and all(isinstance(w, str) for w in item):
+            yield item
+        else:
+            raise ValueError(f"{source}:{lineno}: expected a list of strings, a string or {{\"words\": [...]}}")
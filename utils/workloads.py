@@ -0,0 +1,162 @@
+"""
+Seeded synthetic workloads: random automata and word tuples for benchmarks, stress tests and headless runs.
+
+random_automaton() returns a description in the saved-run format ({"states", "transitions",
+"word_count"}), which Automata.from_description builds into the engine's Automata and
+AutomataManager.load_snapshot into the GUI model; random_automata() returns both.
+random_word_tuples() generates word tuples of which a chosen fraction is accepted: accepted
+tuples are read off random walks to an accepting state, rejected ones are random words. Both kinds
+are checked with the engine (accepts()), so the rate is what headless.py and the GUI report, even
+where the search stops early at a non-accepting configuration. Equal parameters and seed always
+give the same output.
+
+    python -m utils.workloads --states 50 --tapes 2 --count 100 --accept-rate 0.5 \\
+        --automaton-out automaton.json --words-out words.jsonl
+    python headless.py --automaton automaton.json --words words.jsonl
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from backend.Automata import Automata
+from backend.Manager import Manager
+from backend.Symbols import WILDCARD
+from backend.Tape import Tape
+from utils.constants import WORKLOAD_STATE_GAP
+
+def random_automaton(states=10, alphabet="ab", tapes=2, nondeterminism=1.0, wildcard_density=0.2,
+                     accept_ratio=0.25, seed=0):
+    """
+        Random automaton description with states q0 (start) .. q{states-1} laid out on a grid.
+        Every state has on average len(alphabet) * nondeterminism outgoing symbol vectors; each
+        vector entry is the wildcard '#' with probability wildcard_density and a random letter
+        otherwise, with at least one letter per vector. A fraction accept_ratio of the states
+        (at least one) accepts. Vectors between the same pair of states share one transition entry.
+    """
+    if states < 1 or tapes < 1 or not alphabet:
+        raise ValueError("a workload needs at least one state, one tape and one letter")
+    rng = random.Random(seed)
+    names = [f"q{i}" for i in range(states)]
+    accepting = set(rng.sample(names, max(1, round(states * accept_ratio))))
+    columns = max(1, math.isqrt(states))
+    state_data = [{
+        "name": name,
+        "x": WORKLOAD_STATE_GAP * (1 + i % columns),
+        "y": WORKLOAD_STATE_GAP * (1 + i // columns),
+        "is_start": i == 0,
+        "is_accept": name in accepting,
+    } for i, name in enumerate(names)]
+
+    fanout = len(alphabet) * nondeterminism
+    edges = {}      # (source, target) -> vectors, in creation order
+    for name in names:
+        count = int(fanout) + (rng.random() < fanout - int(fanout))
+        for _ in range(count):
+            vec = [WILDCARD if rng.random() < wildcard_density else rng.choice(alphabet) for _ in range(tapes)]
+            if all(sym == WILDCARD for sym in vec):
+                vec[rng.randrange(tapes)] = rng.choice(alphabet)
+            edges.setdefault((name, rng.choice(names)), []).append(vec)
+    transitions = [{"source": src, "target": tgt, "vectors": vectors} for (src, tgt), vectors in edges.items()]
+    return {"states": state_data, "transitions": transitions, "word_count": tapes}
+
+def random_automata(**params):
+    """ (Automata, description) of random_automaton(**params). """
+    data = random_automaton(**params)
+    return Automata.from_description(data), data
+
+def accepts(automata, words):
+    """ Whether the engine finds an accepting run of automata on the word tuple. """
+    if automata.start_state is None or not all(words):
+        return False
+    manager = Manager(automata, [Tape(w) for w in words])
+    last = manager.update([[automata.start_state] + [0] * len(words)])[-1]
+    return last[0] in automata.accept_states and all(pos >= len(w) for pos, w in zip(last[1:], words))
+
+def accepted_walk(data, length, rng, max_steps):
+    """
+        Words read along a random walk from the start state that ends in an accepting state once
+        every tape has at least length symbols, or None if the walk gets stuck or runs too long.
+    """
+    outgoing = {}
+    for tr in data["transitions"]:
+        outgoing.setdefault(tr["source"], []).extend((vec, tr["target"]) for vec in tr["vectors"])
+    accepting = {st["name"] for st in data["states"] if st["is_accept"]}
+    state = next(st["name"] for st in data["states"] if st["is_start"])
+    words = [[] for _ in range(data["word_count"])]
+    for _ in range(max_steps):
+        if state in accepting and all(len(w) >= length for w in words):
+            return ["".join(w) for w in words]
+        moves = outgoing.get(state)
+        if not moves:
+            return None
+        vec, state = rng.choice(moves)
+        for word, sym in zip(words, vec):
+            if sym != WILDCARD:
+                word.append(sym)
+    return None
+
+def random_word_tuples(data, count, length=8, accept_rate=0.5, alphabet="ab", seed=0, attempts=100):
+    """
+        Yield count word tuples (one word per tape) for the automaton description data; each is
+        accepted with probability accept_rate, as decided by the engine (accepts()). Accepted tuples
+        come from random walks, so their words may be longer than length; rejected tuples are random
+        words of exactly length symbols. Raises ValueError if no tuple of the wanted kind is found in
+        attempts tries.
+    """
+    rng = random.Random(seed)
+    automata = Automata.from_description(data)
+    tapes = data.get("word_count", 1)
+    max_steps = 8 * length * tapes + 64
+    for _ in range(count):
+        want_accept = rng.random() < accept_rate
+        for _ in range(attempts):
+            if want_accept:
+                words = accepted_walk(data, length, rng, max_steps)
+                if words is not None and accepts(automata, words):
+                    break
+            else:
+                words = ["".join(rng.choice(alphabet) for _ in range(length)) for _ in range(tapes)]
+                if not accepts(automata, words):
+                    break
+        else:
+            kind = "accepted" if want_accept else "rejected"
+            raise ValueError(f"no {kind} word tuple found in {attempts} attempts")
+        yield words
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--states", type=int, default=10)
+    parser.add_argument("--alphabet", default="ab")
+    parser.add_argument("--tapes", type=int, default=2)
+    parser.add_argument("--nondeterminism", type=float, default=1.0,
+                        help="average outgoing vectors per state and letter (default: 1.0)")
+    parser.add_argument("--wildcard-density", type=float, default=0.2)
+    parser.add_argument("--accept-ratio", type=float, default=0.25, help="fraction of accepting states")
+    parser.add_argument("--count", type=int, default=0, help="number of word tuples to generate")
+    parser.add_argument("--length", type=int, default=8, help="minimum word length")
+    parser.add_argument("--accept-rate", type=float, default=0.5, help="fraction of accepted word tuples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--automaton-out", default="-", help="automaton JSON file, - for stdout (default)")
+    parser.add_argument("--words-out", help="JSONL file of the word tuples; without it the first tuple is saved as the automaton's words")
+    args = parser.parse_args(argv)
+
+    data = random_automaton(args.states, args.alphabet, args.tapes, args.nondeterminism,
+                            args.wildcard_density, args.accept_ratio, args.seed)
+    tuples = random_word_tuples(data, args.count, args.length, args.accept_rate, args.alphabet, args.seed)
+    if args.words_out:
+        with open(args.words_out, "w", encoding="utf-8") as f:
+            for words in tuples:
+                f.write(json.dumps(words) + "\n")
+    elif args.count:
+        data["words"] = next(tuples)
+    text = json.dumps(data) + "\n"
+    if args.automaton_out == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.automaton_out, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())